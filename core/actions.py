@@ -0,0 +1,303 @@
+"""Raise actions (feed / play / train / wilderness_search) for one dinosaur.
+
+``plan_action`` works out the whole state transition in Python: new mood,
+stage and level, the trait to unlock and the outcome text for the log.
+``apply_plan`` then writes it in one transaction:
+
+* one ``UPDATE`` of the dinosaur via ``save(update_fields=...)``, with the
+  level raised in SQL as ``LEAST(level + 1, 100)`` and the action counters
+  incremented with ``F()`` so concurrent clicks cannot lose updates;
+* one ``INSERT`` for the RaiseAction log rows (bulk_create, so the counters
+  are bumped in the UPDATE above rather than by RaiseAction.save);
+* on a trait unlock, the TraitUnlock ledger row and one ``traits.add()``.
+
+``run_action`` does the reads the plan needs and both steps.
+
+``run_session`` plays a queue of actions against the same rules in memory,
+then writes the final state and the whole log in one transaction.
+"""
+import random
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
+
+from .models import Dinosaur, RaiseAction, TraitUnlock
+from .traits import get_catalog
+
+# A juvenile evolves on the feed after this many earlier feeds, i.e. the 4th,
+# as perform_action always has; the progress bar shows the 3 it must fill first.
+FEEDS_TO_EVOLVE = 3
+ACTIONS_NEEDED = 5
+MAX_LEVEL = 100
+TRAIT_LEVELS = (2, 26, 51, 76, 99)
+MAX_TRAITS = 5
+WILDERNESS_FOOD_CHANCE = 0.6
+SESSION_ACTIONS = ('feed', 'play', 'train')
+MAX_SESSION_ACTIONS = 200
+
+
+def dinosaur_progress(dino):
+    """Progress-bar values for the dinosaur page and the JSON API."""
+    feed_progress = min(dino.feed_count, FEEDS_TO_EVOLVE)
+    action_progress = min(dino.action_count, ACTIONS_NEEDED)
+    return {
+        'feed_progress': feed_progress,
+        'feeds_needed': FEEDS_TO_EVOLVE,
+        'action_progress': action_progress,
+        'actions_needed': ACTIONS_NEEDED,
+        'feed_percent': int(feed_progress / FEEDS_TO_EVOLVE * 100),
+        'action_percent': int(action_progress / ACTIONS_NEEDED * 100),
+        'feed_complete': feed_progress >= FEEDS_TO_EVOLVE,
+        'action_complete': action_progress >= ACTIONS_NEEDED,
+        'level_percent': int(dino.level / MAX_LEVEL * 100),
+    }
+
+
+class ActionPlan:
+    """The computed result of one action; ``apply_plan`` persists it."""
+
+    def __init__(self, dino, action_type):
+        self.dino = dino
+        self.action_type = action_type
+        self.mood = dino.mood
+        self.stage = dino.stage
+        self.level = dino.level
+        self.levelled = False
+        self.outcome = "Nothing happened."
+        # (messages level name, text) pairs for the view to flash
+        self.notices = []
+        self.trait = None
+
+    @property
+    def messages(self):
+        if self.trait:
+            return self.notices + [('success', f"{self.dino.name} unlocked a new trait: {self.trait.name}!")]
+        return self.notices
+
+    @property
+    def changed_fields(self):
+        fields = []
+        if self.mood != self.dino.mood:
+            fields.append('mood')
+        if self.stage != self.dino.stage:
+            fields.append('stage')
+        if self.levelled:
+            fields.append('level')
+        return fields
+
+    def log_entries(self):
+        """(action_type, outcome) rows to append to the RaiseAction log."""
+        entries = [(self.action_type, self.outcome)]
+        if self.trait:
+            entries.append((
+                'trait_unlock',
+                f"{self.dino.name} unlocked a new trait: {self.trait.name}! (level {self.level})",
+            ))
+        return entries
+
+
+def next_level(dino, action_type):
+    """The level ``dino`` will have after ``action_type``."""
+    if action_type == 'train':
+        return min(dino.level + 1, MAX_LEVEL)
+    return dino.level
+
+
+def can_unlock_trait(dino, action_type):
+    """Whether this action reaches a trait level (only training unlocks traits)."""
+    return (
+        action_type == 'train'
+        and dino.stage in ('juvenile', 'adult')
+        and next_level(dino, action_type) in TRAIT_LEVELS
+    )
+
+
+def plan_action(dino, action_type, owned_trait_ids=(), level_unlocked=True, catalog=None, rng=random):
+    """Compute the outcome of ``action_type`` on ``dino`` without touching the database.
+
+    ``owned_trait_ids`` and ``level_unlocked`` only matter when
+    ``can_unlock_trait`` is true; ``run_action`` reads them in that case.
+    """
+    plan = ActionPlan(dino, action_type)
+    name = dino.name
+    if action_type == 'feed':
+        plan.outcome = f"{name} enjoyed a tasty meal!"
+        plan.mood = 'happy'
+        # feed_count is the number of earlier feeds, before this one
+        if dino.stage != 'adult' and dino.feed_count >= FEEDS_TO_EVOLVE:
+            plan.stage = 'adult'
+            plan.outcome += f" 🦉 {name} has evolved into an Adult!"
+            plan.notices.append(('success', f"{name} evolved into an Adult!"))
+    elif action_type == 'play':
+        plan.outcome = f"{name} had fun playing!"
+        plan.mood = 'playful'
+    elif action_type == 'train':
+        plan.outcome = f"{name} trained hard and grew stronger!"
+        plan.mood = 'tired'
+        plan.level = next_level(dino, action_type)
+        plan.levelled = plan.level != dino.level
+        if plan.level == MAX_LEVEL:
+            plan.notices.append(('success', f"{name} reached the max level 100!"))
+    elif action_type == 'wilderness_search' and dino.stage == 'juvenile':
+        if rng.random() < WILDERNESS_FOOD_CHANCE:
+            plan.outcome = f"{name} found some delicious food in the wilderness!"
+            plan.mood = 'happy'
+            plan.notices.append(('success', plan.outcome))
+        else:
+            plan.outcome = f"{name} searched the wilderness but found nothing this time."
+            plan.mood = 'hungry'
+            plan.notices.append(('info', plan.outcome))
+
+    if can_unlock_trait(dino, action_type) and not level_unlocked and len(owned_trait_ids) < MAX_TRAITS:
+        catalog = catalog or get_catalog()
+        plan.trait = catalog.random_missing(owned_trait_ids, rng)
+    return plan
+
+
+def _counter_increments(entries):
+    """Dinosaur counter -> increment for these (action_type, outcome) log rows."""
+    counters = {'action_count': len(entries)}
+    for action_type, _ in entries:
+        counter = RaiseAction.COUNTER_FIELDS.get(action_type)
+        if counter:
+            counters[counter] = counters.get(counter, 0) + 1
+    return counters
+
+
+def apply_plan(plan):
+    """Persist ``plan`` in one transaction and update ``plan.dino`` to match."""
+    dino = plan.dino
+    with transaction.atomic():
+        if plan.trait:
+            try:
+                with transaction.atomic():
+                    TraitUnlock.objects.create(dinosaur=dino, trait_id=plan.trait.id, level=plan.level)
+                    dino.traits.add(plan.trait.id)
+            except IntegrityError:
+                # A concurrent request already unlocked this level
+                plan.trait = None
+
+        entries = plan.log_entries()
+        counters = _counter_increments(entries)
+        fields = plan.changed_fields
+        counted = {field: getattr(dino, field) + amount for field, amount in counters.items()}
+        dino.mood = plan.mood
+        dino.stage = plan.stage
+        if plan.levelled:
+            dino.level = Least(F('level') + 1, Value(MAX_LEVEL))
+        for field, amount in counters.items():
+            setattr(dino, field, F(field) + amount)
+        # post_save on the dinosaur bumps the owner's collection version,
+        # which also covers the bulk_created log rows below.
+        dino.save(update_fields=fields + list(counters))
+        RaiseAction.objects.bulk_create([
+            RaiseAction(dinosaur=dino, action_type=action_type, outcome=outcome)
+            for action_type, outcome in entries
+        ])
+
+    # Replace the F() expressions with the values they produced. The level is
+    # the planned one; a concurrent train may have moved the row further.
+    dino.level = plan.level
+    for field, value in counted.items():
+        setattr(dino, field, value)
+    return plan
+
+
+def run_action(dino, action_type, rng=random):
+    """Read what ``plan_action`` needs, plan ``action_type`` and apply it."""
+    owned_trait_ids = ()
+    level_unlocked = True
+    if can_unlock_trait(dino, action_type):
+        owned_trait_ids = set(dino.traits.values_list('pk', flat=True))
+        if len(owned_trait_ids) < MAX_TRAITS:
+            level_unlocked = TraitUnlock.objects.filter(
+                dinosaur=dino, level=next_level(dino, action_type),
+            ).exists()
+    plan = plan_action(dino, action_type, owned_trait_ids, level_unlocked, rng=rng)
+    return apply_plan(plan)
+
+
+class SessionState:
+    """The parts of a dinosaur ``plan_action`` reads, advanced in memory."""
+
+    def __init__(self, dino):
+        self.name = dino.name
+        self.mood = dino.mood
+        self.stage = dino.stage
+        self.level = dino.level
+        self.feed_count = dino.feed_count
+
+    def advance(self, plan):
+        self.mood = plan.mood
+        self.stage = plan.stage
+        self.level = plan.level
+        if plan.action_type == 'feed':
+            self.feed_count += 1
+
+
+def run_session(dino, action_types, rng=random):
+    """Play ``action_types`` in order on ``dino`` and persist the result.
+
+    The dinosaur row is locked for the session, so the simulation starts
+    from its committed state and the final values are written as-is. The
+    log goes in with bulk_create, which skips RaiseAction.save, so the
+    counters are set in the same UPDATE as the final state.
+
+    Returns ``{'actions', 'level', 'stage', 'mood', 'events'}`` where
+    ``events`` lists evolutions, trait unlocks and reaching the max level
+    with the 1-based position of the action that caused them.
+    """
+    action_types = list(action_types)
+    for action_type in action_types:
+        if action_type not in SESSION_ACTIONS:
+            raise ValueError(f"Unknown raise action: {action_type}")
+    if len(action_types) > MAX_SESSION_ACTIONS:
+        raise ValueError(f"A session can queue at most {MAX_SESSION_ACTIONS} actions.")
+
+    catalog = get_catalog()
+    with transaction.atomic():
+        locked = Dinosaur.objects.select_for_update().get(pk=dino.pk)
+        owned_trait_ids = set(locked.traits.values_list('pk', flat=True))
+        unlocked_levels = set(TraitUnlock.objects.filter(dinosaur=locked).values_list('level', flat=True))
+
+        state = SessionState(locked)
+        entries = []
+        unlocks = []
+        events = []
+        for position, action_type in enumerate(action_types, 1):
+            level_unlocked = next_level(state, action_type) in unlocked_levels
+            plan = plan_action(state, action_type, owned_trait_ids, level_unlocked, catalog, rng)
+            if plan.stage != state.stage:
+                events.append({'action': position, 'event': 'evolved', 'stage': plan.stage})
+            if plan.levelled and plan.level == MAX_LEVEL:
+                events.append({'action': position, 'event': 'max_level', 'level': plan.level})
+            if plan.trait:
+                owned_trait_ids.add(plan.trait.id)
+                unlocked_levels.add(plan.level)
+                unlocks.append(TraitUnlock(dinosaur=locked, trait_id=plan.trait.id, level=plan.level))
+                events.append({'action': position, 'event': 'trait_unlocked', 'level': plan.level, 'trait': plan.trait.name})
+            entries.extend(plan.log_entries())
+            state.advance(plan)
+
+        if unlocks:
+            TraitUnlock.objects.bulk_create(unlocks)
+            locked.traits.add(*[unlock.trait_id for unlock in unlocks])
+        fields = ['mood', 'stage', 'level']
+        locked.mood, locked.stage, locked.level = state.mood, state.stage, state.level
+        counters = _counter_increments(entries) if entries else {}
+        for field, amount in counters.items():
+            setattr(locked, field, getattr(locked, field) + amount)
+        locked.save(update_fields=fields + list(counters))
+        RaiseAction.objects.bulk_create(
+            [RaiseAction(dinosaur=locked, action_type=action_type, outcome=outcome) for action_type, outcome in entries],
+            batch_size=500,
+        )
+
+    return {
+        'actions': len(action_types),
+        'level': locked.level,
+        'stage': locked.stage,
+        'mood': locked.mood,
+        'events': events,
+    }
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import Egg, Dinosaur, Trait, RaiseAction, Trade
+from django.shortcuts import render
+from .models import Egg, Dinosaur, Trait, RaiseAction, Trade, TraitUnlock
+from .caching import cache_stats
+from .tracing import recent_traces
 
 
 @admin.register(Egg)
@@ -30,8 +34,44 @@ class RaiseActionAdmin(admin.ModelAdmin):
     search_fields = ("dinosaur__name", "outcome")
 
 
+@admin.register(TraitUnlock)
+class TraitUnlockAdmin(admin.ModelAdmin):
+    list_display = ("dinosaur", "trait", "level", "unlocked_at")
+    list_filter = ("level",)
+    search_fields = ("dinosaur__name", "trait__name")
+
+
 @admin.register(Trade)
 class TradeAdmin(admin.ModelAdmin):
     list_display = ("sender", "sender_egg", "sender_dinosaur", "receiver", "receiver_egg", "receiver_dinosaur", "status", "created_at")
     list_filter = ("status", "created_at")
     search_fields = ("sender__username", "receiver__username", "sender_egg__species_name", "sender_dinosaur__name", "receiver_egg__species_name", "receiver_dinosaur__name")
+
+
+def request_traces(request):
+    """Show this worker's sampled request traces and fragment cache hit rates."""
+    traces = recent_traces()
+    by_view = {}
+    for trace in traces:
+        by_view.setdefault(trace['view'], []).append(trace)
+    summary = []
+    for view, rows in sorted(by_view.items()):
+        sized = [r['response_bytes'] for r in rows if r['response_bytes'] is not None]
+        summary.append({
+            'view': view,
+            'count': len(rows),
+            'avg_ms': sum(r['duration_ms'] for r in rows) / len(rows),
+            'max_ms': max(r['duration_ms'] for r in rows),
+            'avg_queries': sum(r['queries'] for r in rows) / len(rows),
+            'avg_bytes': sum(sized) / len(sized) if sized else 0,
+        })
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Request traces',
+        'traces': traces,
+        'summary': summary,
+        'cache_stats': sorted(cache_stats().items()),
+        'sample_rate': getattr(settings, 'REQUEST_TRACE_SAMPLE_RATE', 0.1),
+        'buffer_size': getattr(settings, 'REQUEST_TRACE_BUFFER_SIZE', 500),
+    }
+    return render(request, 'admin/request_traces.html', context)
@@ -0,0 +1,129 @@
+"""JSON endpoints for dinosaur and egg state, for pages that update in place.
+
+``GET`` returns the full state with an ETag computed from it; a client that
+polls with ``If-None-Match`` gets a bodyless 304 while nothing has changed.
+``POST .../actions/`` runs one action through the same code as the HTML
+views (core.actions / core.nests) and returns only the fields it changed,
+plus the new ETag.
+"""
+import hashlib
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.templatetags.static import static
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET, require_POST
+
+from .actions import dinosaur_progress, run_action
+from .models import Dinosaur, Egg
+from .nests import EGG_ACTIONS, MATERIAL_CAP, apply_bulk_egg_action
+from .ratelimit import check_rate
+
+DINOSAUR_ACTIONS = ('feed', 'play', 'train', 'wilderness_search')
+
+
+def dinosaur_state(dino):
+    state = {
+        'id': dino.id,
+        'name': dino.name,
+        'stage': dino.stage,
+        'mood': dino.mood,
+        'level': dino.level,
+        'sprite': static(dino.get_sprite()),
+        'traits': list(dino.traits.order_by('pk').values_list('name', flat=True)),
+    }
+    state.update(dinosaur_progress(dino))
+    return state
+
+
+def egg_state(egg):
+    return {
+        'id': egg.id,
+        'name': egg.name,
+        'species_name': egg.species_name,
+        'twigs': egg.twigs,
+        'leaves': egg.leaves,
+        'is_hatched': egg.is_hatched,
+        'ready_to_hatch': egg.twigs >= MATERIAL_CAP and egg.leaves >= MATERIAL_CAP,
+    }
+
+
+def state_etag(state):
+    payload = json.dumps(state, sort_keys=True, cls=DjangoJSONEncoder)
+    return quote_etag(hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest())
+
+
+def changed_fields(before, after):
+    return {key: value for key, value in after.items() if before.get(key) != value}
+
+
+def _state_response(request, state):
+    etag = state_etag(state)
+    response = get_conditional_response(request, etag=etag) or JsonResponse(state)
+    response['ETag'] = etag
+    # Let clients keep the body but always revalidate it
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _changes_response(before, after, **extra):
+    etag = state_etag(after)
+    response = JsonResponse({'changed': changed_fields(before, after), 'etag': etag, **extra})
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+@login_required
+@require_GET
+def dinosaur_state_view(request, dino_id):
+    dino = get_object_or_404(Dinosaur, id=dino_id, owner=request.user)
+    return _state_response(request, dinosaur_state(dino))
+
+
+@login_required
+@require_POST
+def dinosaur_action_view(request, dino_id):
+    action_type = request.POST.get('action_type')
+    if action_type not in DINOSAUR_ACTIONS:
+        return JsonResponse({'error': 'Unknown action.'}, status=400)
+    dino = get_object_or_404(Dinosaur, id=dino_id, owner=request.user)
+    before = dinosaur_state(dino)
+    plan = run_action(dino, action_type)
+    trait = {'name': plan.trait.name, 'description': plan.trait.description} if plan.trait else None
+    return _changes_response(
+        before, dinosaur_state(dino),
+        outcome=plan.outcome,
+        messages=[{'level': level, 'text': text} for level, text in plan.messages],
+        new_trait=trait,
+    )
+
+
+@login_required
+@require_GET
+def egg_state_view(request, egg_id):
+    egg = get_object_or_404(Egg, id=egg_id, owner=request.user)
+    return _state_response(request, egg_state(egg))
+
+
+@login_required
+@require_POST
+def egg_action_view(request, egg_id):
+    action = request.POST.get('action')
+    if action not in EGG_ACTIONS:
+        return JsonResponse({'error': 'Unknown egg action.'}, status=400)
+    egg = get_object_or_404(Egg, id=egg_id, owner=request.user, is_hatched=False)
+    if action == 'search_wilderness' and not check_rate('egg_search', request.user).allowed:
+        return JsonResponse({'error': 'You are searching too often. Let the wilderness rest for a while.'}, status=429)
+    before = egg_state(egg)
+    results = apply_bulk_egg_action(request.user, [egg.id], action)
+    if not results:
+        # Hatched or released between the lookup above and the locked update
+        return JsonResponse({'error': 'This egg has already hatched or is gone.'}, status=409)
+    [result] = results
+    egg.twigs, egg.leaves = result['twigs'], result['leaves']
+    return _changes_response(before, egg_state(egg), message=result['message'])
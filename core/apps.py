@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import checks, signals, sprites, tracing  # noqa: F401 (checks and signals register themselves)
+        sprites.build_registry()
+        tracing.start_queue_listeners()
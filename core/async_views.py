@@ -0,0 +1,166 @@
+"""Async versions of the read-only pages.
+
+core.urls routes to these instead of their sync twins in views.py when
+settings.ASYNC_VIEWS is on, which asgi.py does by default (see "Running
+under ASGI" in the README). Touching the database from the event loop
+raises SynchronousOnlyOperation, so each view fetches what its template
+needs through the async ORM first and rendering never queries. Cached card
+fragments are checked up front for the same reason (caching.akeep_fragment).
+The trade event stream (trade_events) lives here too; its sync twin only
+tells browsers that streaming is off.
+"""
+import json
+import logging
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import Paginator
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.urls import reverse
+
+from . import views
+from .caching import acached_for_user, acollection_version, akeep_fragment
+from .conditional import collection_condition
+from .events import get_event_broker
+from .models import Dinosaur, Egg
+
+logger = logging.getLogger(__name__)
+
+# Seconds between comment lines on an idle event stream, so proxies keep it open
+EVENT_STREAM_HEARTBEAT = 25
+
+
+def async_login_required(view):
+    """login_required for async views (Django 4.2's only wraps sync ones)."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # request.user lazily loads the session and the user from the database
+        if not await sync_to_async(lambda: request.user.is_authenticated)():
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def _fetch_choices(field, queryset):
+    """Give a ModelChoiceField a fixed choice list so rendering does not query."""
+    choices = [('', field.empty_label)] if field.empty_label is not None else []
+    field.choices = choices + [(obj.pk, field.label_from_instance(obj)) async for obj in queryset]
+
+
+@async_login_required
+@collection_condition()
+async def dashboard(request):
+    user = request.user
+    try:
+        async def summary():
+            all_dinos = Dinosaur.objects.filter(owner=user)
+            return {
+                'has_egg': await Egg.objects.filter(owner=user).aexists(),
+                'has_dino': await all_dinos.aexists(),
+                'has_juvenile': await all_dinos.filter(stage='juvenile').aexists(),
+            }
+        return render(request, 'dashboard.html', await acached_for_user(user, 'dashboard', summary))
+    except Exception as e:
+        logger.error("Dashboard error: %s", e)
+        return render(request, 'dashboard.html', {'has_egg': False, 'has_juvenile': False, 'error': str(e)})
+
+
+@async_login_required
+@collection_condition()
+async def your_dinosaurs(request):
+    user = request.user
+    version = await acollection_version(user)
+    dinosaurs = Dinosaur.objects.filter(owner=user)
+    if not await akeep_fragment('dino_cards', [user.id, version], settings.FRAGMENT_CACHE_TIMEOUT):
+        dinosaurs = [dino async for dino in dinosaurs]
+    return render(request, 'your_dinosaurs.html', {
+        'dinosaurs': dinosaurs,
+        'collection_version': version,
+        'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+    })
+
+
+@async_login_required
+@collection_condition()
+async def active_nests(request):
+    user = request.user
+    version = await acollection_version(user)
+    eggs = Egg.objects.filter(owner=user, is_hatched=False).order_by('created_at')
+    has_eggs = await acached_for_user(user, 'has_nests', eggs.aexists)
+    if has_eggs and not await akeep_fragment('nest_cards', [user.id, version], settings.FRAGMENT_CACHE_TIMEOUT):
+        eggs = [egg async for egg in eggs]
+    return render(request, 'active_nests.html', {
+        'eggs': eggs,
+        'has_eggs': has_eggs,
+        'collection_version': version,
+        'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+    })
+
+
+@async_login_required
+async def trade_center(request):
+    if request.method != 'GET':
+        # Submitting an offer writes and may re-render the bound form
+        return await sync_to_async(views.trade_center)(request)
+    user = request.user
+    form = views.TradeForm(user=user)
+    await _fetch_choices(form.fields['sender_egg'], user.eggs.all())
+    await _fetch_choices(form.fields['sender_dinosaur'], user.dinosaurs.all())
+    await _fetch_choices(form.fields['receiver_egg'], Egg.objects.none())
+    await _fetch_choices(form.fields['receiver_dinosaur'], Dinosaur.objects.none())
+
+    trade_view = 'history' if request.GET.get('view') == 'history' else 'pending'
+    trades = views.user_trades(user, pending=trade_view == 'pending')
+    paginator = Paginator(trades, views.TRADES_PER_PAGE)
+    # Paginator would count synchronously on first use
+    paginator.count = await trades.acount()
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = [trade async for trade in page_obj.object_list]
+    return render(request, 'trade_center.html', {
+        'form': form,
+        'trades': page_obj,
+        'page_obj': page_obj,
+        'trade_view': trade_view,
+        'user': user,
+        'trade_events_url': reverse('trade_events'),
+    })
+
+
+def _release_connection():
+    # Never mid-transaction, as when a test case wraps the request
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+@async_login_required
+async def trade_events(request):
+    """Stream the player's trade events (core.events) as server-sent events.
+
+    The stream can stay open for hours, so the database connection used to
+    authenticate is closed first. middleware.EventStreamDisconnect ends the
+    stream when the browser goes away.
+    """
+    user_id = request.user.pk
+    await sync_to_async(_release_connection)()
+
+    async def stream():
+        subscription = await get_event_broker().subscribe(user_id)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = await subscription.get(timeout=EVENT_STREAM_HEARTBEAT)
+                if event is None:
+                    yield ': heartbeat\n\n'
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,210 @@
+"""Build the self-hosted CSS and JS bundles from the vendored assets.
+
+``build_bundles`` writes ``static/bundle/genosaur.css`` (Bootstrap, the icons
+we use, base.css and style.css, in that cascade order) and
+``static/bundle/genosaur.js`` (Bootstrap's plugins). collectstatic then
+hashes and gzip/brotli-compresses them like any other static file, and
+WhiteNoise serves the hashed names with immutable caching.
+
+Bootstrap's CSS is reduced to the rules whose class selectors all appear
+somewhere in the templates, core's Python or Bootstrap's own JS (which adds
+classes such as ``show`` and ``modal-backdrop`` at runtime). Icons are taken
+from the Bootstrap Icons sprite and inlined as CSS masks, so only the
+``bi-*`` names we reference are shipped and no icon font is downloaded.
+"""
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+
+VENDOR_DIR = 'assets/vendor'
+BOOTSTRAP_CSS = f'{VENDOR_DIR}/bootstrap-5.3.8/bootstrap.min.css'
+BOOTSTRAP_JS = f'{VENDOR_DIR}/bootstrap-5.3.8/bootstrap.min.js'
+ICON_SPRITE = f'{VENDOR_DIR}/bootstrap-icons-1.13.1/bootstrap-icons.svg'
+APP_CSS = ('static/css/base.css', 'static/css/style.css')
+
+CSS_BUNDLE = 'bundle/genosaur.css'
+JS_BUNDLE = 'bundle/genosaur.js'
+
+# At-rules whose bodies are lists of rules that can be purged individually
+NESTED_AT_RULES = ('@media', '@supports', '@container', '@layer')
+
+SOURCE_MAP = re.compile(r'/[/*]# sourceMappingURL=[^\n]*')
+WORD = re.compile(r'[A-Za-z0-9_-]+')
+ICON_NAME = re.compile(r'\bbi-([a-z0-9-]+)')
+NOT_PSEUDO = re.compile(r':not\([^()]*\)')
+CLASS_SELECTOR = re.compile(r'\.((?:[\w-]|\\.)+)')
+# Characters left unescaped in icon data URIs (inside url("..."))
+SVG_SAFE = " =/:.,-'"
+
+ICON_BASE_CSS = (
+    '.bi{display:inline-block;width:1em;height:1em;vertical-align:-.125em;'
+    'background-color:currentColor;'
+    '-webkit-mask:var(--bi-icon) center/contain no-repeat;mask:var(--bi-icon) center/contain no-repeat}'
+)
+
+
+def _read(path):
+    with open(os.path.join(settings.BASE_DIR, path), encoding='utf-8') as f:
+        return SOURCE_MAP.sub('', f.read())
+
+
+def content_words(directory, suffix):
+    """Every word-like token in the ``suffix`` files under ``directory``."""
+    words = set()
+    for root, _, files in os.walk(os.path.join(settings.BASE_DIR, directory)):
+        for filename in files:
+            if filename.endswith(suffix):
+                with open(os.path.join(root, filename), encoding='utf-8') as f:
+                    words.update(WORD.findall(f.read()))
+    return words
+
+
+def _scan(css, i, stops):
+    """Index of the first character in ``stops`` at or after ``i``, outside strings and comments."""
+    quote_char = None
+    while i < len(css):
+        c = css[i]
+        if quote_char:
+            if c == '\\':
+                i += 1
+            elif c == quote_char:
+                quote_char = None
+        elif c in '"\'':
+            quote_char = c
+        elif css.startswith('/*', i):
+            i = css.index('*/', i + 2) + 1
+        elif c in stops:
+            return i
+        i += 1
+    return len(css)
+
+
+def _matching_brace(css, i):
+    depth = 0
+    while True:
+        i = _scan(css, i, '{}')
+        if i >= len(css):
+            raise ValueError("Unbalanced braces in CSS")
+        depth += 1 if css[i] == '{' else -1
+        if depth == 0:
+            return i
+        i += 1
+
+
+def _split_selectors(prelude):
+    selectors, depth, start = [], 0, 0
+    for i, c in enumerate(prelude):
+        if c in '([':
+            depth += 1
+        elif c in ')]':
+            depth -= 1
+        elif c == ',' and depth == 0:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    selectors.append(prelude[start:])
+    return [selector.strip() for selector in selectors]
+
+
+def _selector_used(selector, words):
+    classes = CLASS_SELECTOR.findall(NOT_PSEUDO.sub('', selector))
+    return all(name.replace('\\', '') in words for name in classes)
+
+
+def purge_css(css, words):
+    """Drop the style rules (and selectors) that need a class not in ``words``.
+
+    Element, attribute and ``:root`` selectors are always kept, as are
+    ``/*!`` licence comments and at-rules other than NESTED_AT_RULES.
+    """
+    out = []
+    i = 0
+    while i < len(css):
+        if css[i].isspace():
+            i += 1
+            continue
+        if css.startswith('/*', i):
+            end = css.index('*/', i + 2) + 2
+            if css.startswith('/*!', i):
+                out.append(css[i:end] + '\n')
+            i = end
+            continue
+        stop = _scan(css, i, '{;')
+        if stop >= len(css) or css[stop] == ';':
+            out.append(css[i:stop + 1])
+            i = stop + 1
+            continue
+        prelude = css[i:stop].strip()
+        end = _matching_brace(css, stop)
+        body = css[stop + 1:end]
+        i = end + 1
+        if prelude.startswith('@'):
+            if prelude.split(None, 1)[0].split('(')[0] in NESTED_AT_RULES:
+                body = purge_css(body, words)
+                if not body:
+                    continue
+            out.append(f'{prelude}{{{body}}}')
+            continue
+        kept = [selector for selector in _split_selectors(prelude) if _selector_used(selector, words)]
+        if kept:
+            out.append(f"{','.join(kept)}{{{body}}}")
+    return ''.join(out)
+
+
+def icon_css(sprite, names):
+    """CSS mask rules for the icons ``names`` from a Bootstrap Icons sprite.
+
+    Returns ``(css, missing)`` where ``missing`` lists names not in the sprite.
+    """
+    rules, missing = [ICON_BASE_CSS], []
+    for name in sorted(names):
+        match = re.search(
+            rf'<symbol[^>]*viewBox="([^"]+)"[^>]*id="{re.escape(name)}"[^>]*>(.*?)</symbol>', sprite, re.S,
+        )
+        if not match:
+            missing.append(name)
+            continue
+        svg = f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='{match[1]}'>{match[2]}</svg>".replace('"', "'")
+        data = quote(svg, safe=SVG_SAFE)
+        rules.append(f'.bi-{name}{{--bi-icon:url("data:image/svg+xml,{data}")}}')
+    return '\n'.join(rules), missing
+
+
+def _write(path, text):
+    """Write ``text`` under static/ unless it is unchanged; return whether it was written."""
+    target = os.path.join(settings.STATICFILES_DIRS[0], path)
+    try:
+        with open(target, encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
+
+
+def build_bundles():
+    """Write the CSS and JS bundles; return a report of sizes and changes.
+
+    The report maps each bundle path to ``{'bytes', 'source_bytes',
+    'changed'}`` and has ``'missing_icons'`` for ``bi-*`` names that the
+    sprite does not contain.
+    """
+    js = _read(BOOTSTRAP_JS).strip() + '\n'
+    template_words = content_words('templates', '.html')
+    words = template_words | content_words('core', '.py') | set(WORD.findall(js))
+    bootstrap = _read(BOOTSTRAP_CSS)
+    icons, missing = icon_css(_read(ICON_SPRITE), set(ICON_NAME.findall(' '.join(template_words))))
+    app = [_read(path).strip() for path in APP_CSS]
+    css = '\n'.join([purge_css(bootstrap, words), icons, *app]) + '\n'
+    return {
+        CSS_BUNDLE: {
+            'bytes': len(css.encode()),
+            'source_bytes': len(bootstrap.encode()) + sum(len(text.encode()) for text in app),
+            'changed': _write(CSS_BUNDLE, css),
+        },
+        JS_BUNDLE: {'bytes': len(js.encode()), 'source_bytes': len(js.encode()), 'changed': _write(JS_BUNDLE, js)},
+        'missing_icons': missing,
+    }
@@ -0,0 +1,178 @@
+"""Per-user cache versioning and fragment cache backends.
+
+Every player has a *collection version*: an opaque token kept in the
+``default`` cache and replaced once a transaction that wrote one of their
+eggs, dinosaurs, actions or trades commits (see core.signals, plus explicit
+bumps where queryset.update()/bulk_update() bypass model signals). Cached fragments and
+values include the version in their key, so a write makes old entries
+unreachable and the LRU cache ages them out.
+
+The ``fragments`` cache uses one of the Counting* backends below, which
+record hit/miss counts per process for the admin request-traces page.
+"""
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+
+FRAGMENT_CACHE = 'fragments'
+
+# Backends whose entries are only seen by the process that wrote them
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+# Shared backends whose incr() is a single server-side operation. FileBasedCache
+# implements it as get() then set(), so concurrent processes lose increments.
+ATOMIC_INCR_BACKENDS = (RedisCache, BaseMemcachedCache)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class CountingCacheMixin:
+    """Count get() hits and misses for this cache alias."""
+
+    def get(self, key, default=None, version=None):
+        sentinel = object()
+        value = super().get(key, sentinel, version=version)
+        with _stats_lock:
+            counts = _stats.setdefault(self._counter_name, {'hits': 0, 'misses': 0})
+            counts['hits' if value is not sentinel else 'misses'] += 1
+        return default if value is sentinel else value
+
+    @property
+    def _counter_name(self):
+        return getattr(self, '_location_name', None) or self.__class__.__name__
+
+
+class CountingLocMemCache(CountingCacheMixin, LocMemCache):
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._location_name = name
+
+
+class CountingFileBasedCache(CountingCacheMixin, FileBasedCache):
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._location_name = dir
+
+
+class CountingRedisCache(CountingCacheMixin, RedisCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._location_name = 'redis'
+
+
+def is_shared_cache(alias):
+    """Whether every worker process sees the same entries in cache ``alias``."""
+    return not isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
+
+
+def has_atomic_incr(alias):
+    """Whether concurrent incr() calls on cache ``alias`` from any process all count."""
+    return isinstance(caches[alias], ATOMIC_INCR_BACKENDS)
+
+
+def cache_stats():
+    """Return ``{location: {'hits', 'misses', 'hit_rate'}}`` for this process."""
+    with _stats_lock:
+        snapshot = {name: dict(counts) for name, counts in _stats.items()}
+    for counts in snapshot.values():
+        total = counts['hits'] + counts['misses']
+        counts['hit_rate'] = counts['hits'] / total if total else 0.0
+    return snapshot
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _version_key(user_id):
+    return f"collection:v:{user_id}"
+
+
+def _new_version():
+    # A timestamp rather than a counter: if the key is evicted, the
+    # replacement can never collide with a version an old fragment used.
+    return f"{time.time_ns():x}"
+
+
+def collection_version(user):
+    """Return the current collection version token for ``user`` (or a user id)."""
+    user_id = getattr(user, 'pk', user)
+    cache = caches['default']
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+async def acollection_version(user):
+    """Async collection_version, for core.async_views."""
+    user_id = getattr(user, 'pk', user)
+    cache = caches['default']
+    key = _version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = _new_version()
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def bump_collection_version(*user_ids):
+    """Invalidate everything cached for these users once the current
+    transaction commits.
+
+    Bumping earlier would let a concurrent request cache the pre-commit rows
+    under the new version, where they would stay until the next write.
+    """
+    ids = {uid for uid in user_ids if uid is not None}
+    if ids:
+        def bump():
+            version = _new_version()
+            caches['default'].set_many({_version_key(uid): version for uid in ids}, timeout=None)
+
+        transaction.on_commit(bump)
+
+
+def cached_for_user(user, name, compute, timeout=None):
+    """Return ``compute()`` cached under the user's current collection version."""
+    cache = caches[FRAGMENT_CACHE]
+    key = f"{name}:{user.pk}:{collection_version(user)}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+async def acached_for_user(user, name, compute, timeout=None):
+    """Async cached_for_user; ``compute`` is a coroutine function."""
+    cache = caches[FRAGMENT_CACHE]
+    key = f"{name}:{user.pk}:{await acollection_version(user)}"
+    value = await cache.aget(key)
+    if value is None:
+        value = await compute()
+        await cache.aset(key, value, timeout)
+    return value
+
+
+async def akeep_fragment(fragment_name, vary_on, timeout):
+    """Extend a ``{% cache %}`` fragment's expiry; return whether it exists.
+
+    Async views cannot hand the template a lazy queryset to evaluate on a
+    fragment miss, so they ask first. Touching rather than just reading
+    means the fragment cannot expire between this check and the render.
+    """
+    key = make_template_fragment_key(fragment_name, vary_on)
+    return await caches[FRAGMENT_CACHE].atouch(key, timeout)
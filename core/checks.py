@@ -0,0 +1,162 @@
+"""System checks for settings that are fine in development but slow in production.
+
+They run with ``manage.py check`` like any other check, and only report
+anything when the 'prod' settings profile is active. wsgi.py and asgi.py
+call ``enforce_performance_checks`` so a prod process with an Error-level
+finding refuses to start rather than serving slowly.
+"""
+import logging
+
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+from .caching import has_atomic_incr, is_shared_cache
+
+PERFORMANCE = 'performance'
+
+logger = logging.getLogger(__name__)
+
+# Loggers whose DEBUG level makes Django format every SQL statement
+SQL_LOGGERS = ('', 'django', 'django.db', 'django.db.backends')
+
+
+def _logger_levels():
+    config = getattr(settings, 'LOGGING', {}) or {}
+    levels = {'': (config.get('root') or {}).get('level')}
+    for name, logger_config in (config.get('loggers') or {}).items():
+        levels[name] = logger_config.get('level')
+    return levels
+
+
+def _uses_cached_loader(loaders):
+    for loader in loaders:
+        name = loader[0] if isinstance(loader, (list, tuple)) else loader
+        if name == 'django.template.loaders.cached.Loader':
+            return True
+    return False
+
+
+@checks.register(PERFORMANCE)
+def check_production_settings(app_configs, **kwargs):
+    if getattr(settings, 'SETTINGS_PROFILE', None) != 'prod':
+        return []
+    messages = []
+    if settings.DEBUG:
+        messages.append(checks.Error(
+            "DEBUG is on in production.",
+            hint="Every query is kept in connection.queries and error pages expose settings. Unset it in prod.py.",
+            id='core.E001',
+        ))
+    pooler = getattr(settings, 'DATABASE_POOLER', '')
+    for alias, database in settings.DATABASES.items():
+        if pooler == 'transaction' and not database.get('DISABLE_SERVER_SIDE_CURSORS'):
+            messages.append(checks.Error(
+                f"DATABASES[{alias!r}] uses server-side cursors behind a transaction-mode pooler.",
+                hint="Set DISABLE_SERVER_SIDE_CURSORS = True; the pooler may hand the cursor's session to another client.",
+                id='core.E005',
+            ))
+        # None means "keep forever"; a missing key means Django's default of 0
+        max_age = database.get('CONN_MAX_AGE', 0)
+        if getattr(settings, 'ASYNC_VIEWS', False) and max_age != 0:
+            messages.append(checks.Warning(
+                f"DATABASES[{alias!r}] keeps persistent connections while serving async views.",
+                hint="Django's async ORM opens connections per task; set DB_CONN_MAX_AGE=0 and pool with DB_POOLER.",
+                id='core.W005',
+            ))
+        if max_age == 0 and pooler:
+            # Connecting to a local pooler is cheap; it keeps the server connections.
+            continue
+        if max_age == 0:
+            messages.append(checks.Error(
+                f"DATABASES[{alias!r}] opens a new connection for every request.",
+                hint="Set DB_CONN_MAX_AGE (and DB_CONN_HEALTH_CHECKS), or put a pooler in front (DB_POOLER).",
+                id='core.E002',
+            ))
+        elif not database.get('CONN_HEALTH_CHECKS'):
+            messages.append(checks.Warning(
+                f"DATABASES[{alias!r}] reuses connections without health checks.",
+                hint="Set DB_CONN_HEALTH_CHECKS=true so a dropped connection is replaced instead of failing the request.",
+                id='core.W001',
+            ))
+    for template_config in settings.TEMPLATES:
+        if template_config['BACKEND'] != 'django.template.backends.django.DjangoTemplates':
+            continue
+        options = template_config.get('OPTIONS', {})
+        if 'loaders' in options and not _uses_cached_loader(options['loaders']):
+            messages.append(checks.Error(
+                "Templates are re-read and re-parsed on every render.",
+                hint="Wrap the template loaders in django.template.loaders.cached.Loader.",
+                id='core.E003',
+            ))
+        if 'django.template.context_processors.debug' in options.get('context_processors', []):
+            messages.append(checks.Warning(
+                "The debug context processor is enabled.",
+                id='core.W002',
+            ))
+    levels = _logger_levels()
+    for name in SQL_LOGGERS:
+        if levels.get(name) == 'DEBUG':
+            messages.append(checks.Error(
+                f"The {name or 'root'!r} logger is at DEBUG, so every SQL statement is formatted and logged.",
+                hint="Use ERROR (or at least INFO) in prod.py.",
+                id='core.E004',
+            ))
+    if getattr(settings, 'REQUEST_TRACE_SAMPLE_RATE', 0) > 0.5:
+        messages.append(checks.Warning(
+            "More than half of all requests are traced.",
+            hint="Lower REQUEST_TRACE_SAMPLE_RATE; 0.1 is plenty for the admin summary.",
+            id='core.W003',
+        ))
+    limiter = getattr(settings, 'RATE_LIMIT_BACKEND', '')
+    limiter_cache = getattr(settings, 'RATE_LIMIT_OPTIONS', {}).get('cache_alias', 'default')
+    if limiter.endswith('LocalMemoryRateLimiter') or (
+        limiter.endswith('CacheRateLimiter') and not has_atomic_incr(limiter_cache)
+    ):
+        messages.append(checks.Error(
+            "Rate-limit counts are not shared reliably between workers.",
+            hint="Per-process counts let each worker allow the full limit, and a file cache loses "
+                 "concurrent increments; set REDIS_URL.",
+            id='core.E006',
+        ))
+    for alias in ('default', 'fragments'):
+        if alias in settings.CACHES and not is_shared_cache(alias):
+            messages.append(checks.Error(
+                f"The {alias!r} cache is per-process memory.",
+                hint="Workers would each keep their own collection versions and fragments, and serve "
+                     "stale pages after another worker's write; set REDIS_URL (or CACHE_DIR for the "
+                     "workers of a single dyno).",
+                id='core.E007',
+            ))
+    if getattr(settings, 'ASYNC_VIEWS', False) and getattr(
+        settings, 'TRADE_EVENT_BACKEND', ''
+    ).endswith('LocalMemoryEventBroker'):
+        messages.append(checks.Warning(
+            "Trade events only reach streams open in the worker that published them.",
+            hint="Use core.events.CacheEventBroker with a shared cache (the default when REDIS_URL is set).",
+            id='core.W006',
+        ))
+    options = getattr(settings, 'TRADE_EVENT_OPTIONS', {})
+    if getattr(settings, 'TRADE_EVENT_BACKEND', '').endswith('CacheEventBroker') and not has_atomic_incr(
+        options.get('cache_alias', 'default')
+    ):
+        messages.append(checks.Warning(
+            "Trade events are numbered with a non-atomic incr(), so concurrent events can overwrite each other.",
+            hint="Give the cache event broker a Redis or Memcached cache; set REDIS_URL.",
+            id='core.W007',
+        ))
+    return messages
+
+
+def enforce_performance_checks():
+    """Raise ImproperlyConfigured if a 'performance' check reports an error."""
+    messages = checks.run_checks(tags=[PERFORMANCE])
+    errors = [message for message in messages if message.is_serious()]
+    for message in messages:
+        if not message.is_serious():
+            logger.warning("%s", message)
+    if errors:
+        raise ImproperlyConfigured(
+            "Refusing to start with performance-hostile production settings:\n"
+            + "\n".join(str(error) for error in errors)
+        )
@@ -0,0 +1,130 @@
+"""Conditional GET for pages that only show one player's collection.
+
+A page like your_dinosaurs is fully determined by who is looking, whose
+collection it shows and that collection's version (core.caching), which
+every Egg/Dinosaur/RaiseAction/Trade write replaces. ``collection_condition``
+turns that into an ETag through Django's ``condition`` decorator, so a
+browser revalidating an unchanged page gets a 304 before the view queries
+anything or renders a template. (No Last-Modified: the versions are
+nanosecond timestamps, but HTTP dates only resolve whole seconds.)
+
+Pages are never answered with a 304 while flash messages are waiting to be
+shown, since the cached copy would not contain them. Nor are they when the
+``default`` cache is per-process memory: each worker would then hold its own
+versions, and one that missed a write would keep confirming the old copy.
+
+Async views (core.async_views) are supported too; Django 4.2's ``condition``
+only wraps sync views, so for those the same steps are spelled out here.
+"""
+import hashlib
+import os
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.contrib.messages import get_messages
+from django.dispatch import receiver
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.views.decorators.http import condition
+
+from .caching import collection_version, is_shared_cache
+from .traits import CATALOG_VERSION_KEY
+from .warmup import project_templates
+
+_release_tag = None
+
+
+def _release_fingerprint():
+    """Hash the project templates and the static manifest, so a deploy that
+    changes either gives new ETags without a release variable."""
+    # Relative names in sorted order, so every dyno of a release agrees
+    files = []
+    for config in settings.TEMPLATES:
+        for directory in config.get('DIRS', []):
+            files.extend((name, os.path.join(directory, name)) for name in sorted(project_templates([directory])))
+    files.append(('staticfiles.json', os.path.join(settings.STATIC_ROOT or '', 'staticfiles.json')))
+    digest = hashlib.md5(usedforsecurity=False)
+    for name, path in files:
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            continue
+        digest.update(name.encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def release_tag():
+    """``settings.ETAG_RELEASE``, or a fingerprint of this process's release."""
+    global _release_tag
+    if _release_tag is None:
+        _release_tag = settings.ETAG_RELEASE or _release_fingerprint()
+    return _release_tag
+
+
+@receiver(setting_changed)
+def _reset_release_tag(setting, **kwargs):
+    global _release_tag
+    if setting in ('ETAG_RELEASE', 'TEMPLATES', 'STATIC_ROOT'):
+        _release_tag = None
+
+
+def collection_condition(owner_func=None):
+    """Serve 304s for a view whose output depends only on one collection.
+
+    ``owner_func(request, *args, **kwargs)`` returns the user id whose
+    collection the page shows (default: the requesting user), or None to
+    skip the conditional check.
+    """
+    def etag_func(request, *args, **kwargs):
+        if not is_shared_cache('default'):
+            return None
+        if not request.user.is_authenticated or len(get_messages(request)):
+            return None
+        owner_id = owner_func(request, *args, **kwargs) if owner_func else request.user.pk
+        if owner_id is None:
+            return None
+        # The page embeds the viewer's CSRF token, so a new CSRF secret (e.g.
+        # after logging in again) must not match the old copy. get_token()
+        # returns a freshly masked token each call; the secret is stable.
+        # Trait names are shared data, so an edited Trait changes the tag too;
+        # the release salt covers template and static changes on deploy.
+        get_token(request)
+        key = ':'.join(str(part) for part in (
+            request.user.pk, owner_id, collection_version(owner_id),
+            request.META['CSRF_COOKIE'], caches['default'].get(CATALOG_VERSION_KEY), release_tag(),
+        ))
+        return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+    def revalidate(response):
+        if response.has_header('ETag'):
+            # Keep the copy, but always revalidate it with the server
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # Reads the session and cache, so it runs off the event loop
+                etag = await sync_to_async(etag_func)(request, *args, **kwargs)
+                etag = quote_etag(etag) if etag is not None else None
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                if etag and request.method in ('GET', 'HEAD'):
+                    response.headers.setdefault('ETag', etag)
+                return revalidate(response)
+            return async_wrapper
+
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return revalidate(conditional_view(request, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,224 @@
+"""Trade events pushed to players' open Trade Center pages.
+
+Trade offers, acceptances and declines are published as small events for
+the two players involved, and async_views.trade_events streams them to the
+browser as server-sent events. Delivery goes through a pluggable broker
+chosen by ``settings.TRADE_EVENT_BACKEND``:
+
+* ``LocalMemoryEventBroker`` hands events straight to the streams open in
+  the same process. Good for tests, runserver and a single ASGI worker.
+* ``CacheEventBroker`` appends events to a numbered per-player log in a
+  Django cache with an atomic incr() (Redis or Memcached). One poller task
+  per worker reads the logs of the players it has streams for, so every
+  worker sharing that cache sees every event.
+
+A stream waits on an asyncio.Queue, so an idle connection costs nothing
+until an event (or the stream's heartbeat) is due.
+"""
+import asyncio
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+TRADE_CREATED = 'trade.created'
+TRADE_ACCEPTED = 'trade.accepted'
+TRADE_DECLINED = 'trade.declined'
+TRADE_EVENTS = (TRADE_CREATED, TRADE_ACCEPTED, TRADE_DECLINED)
+
+# Events a stream may have waiting before the oldest are dropped
+SUBSCRIPTION_BUFFER = 100
+
+
+class Subscription:
+    """The queue of events for one open stream of ``user_id``'s events."""
+
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(SUBSCRIPTION_BUFFER)
+
+    def put(self, event):
+        """Queue ``event``; safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The stream's event loop has shut down
+            self.close()
+
+    def _put(self, event):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """The next event, or None if ``timeout`` seconds pass without one."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseEventBroker:
+    def publish(self, user_id, event):
+        """Send ``event`` (a JSON-serialisable dict) to ``user_id``'s open streams."""
+        raise NotImplementedError
+
+    async def subscribe(self, user_id):
+        """Open a Subscription to ``user_id``'s events; close() it when done."""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class LocalMemoryEventBroker(BaseEventBroker):
+    def __init__(self, **options):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def _deliver(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def publish(self, user_id, event):
+        self._deliver(user_id, event)
+
+    async def subscribe(self, user_id):
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.user_id, None)
+
+    def subscribed_users(self):
+        with self._lock:
+            return list(self._subscriptions)
+
+
+class CacheEventBroker(LocalMemoryEventBroker):
+    def __init__(self, cache_alias='default', key_prefix='events', poll_interval=1.0, timeout=300, **options):
+        super().__init__()
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._seen = {}  # user id -> last event number delivered
+        self._gaps = {}  # user id -> event number missing at the last poll
+        self._poller = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _counter_key(self, user_id):
+        return f"{self.key_prefix}:{user_id}:last"
+
+    def _event_key(self, user_id, number):
+        return f"{self.key_prefix}:{user_id}:{number}"
+
+    def publish(self, user_id, event):
+        counter_key = self._counter_key(user_id)
+        # add() then incr() is atomic on Redis and Memcached, so numbers are
+        # unique there (FileBasedCache's incr is a get and a set; see core.W007)
+        self.cache.add(counter_key, 0, timeout=None)
+        number = self.cache.incr(counter_key)
+        self.cache.set(self._event_key(user_id, number), event, timeout=self.timeout)
+
+    async def subscribe(self, user_id):
+        if user_id not in self._seen:
+            self._seen[user_id] = await self.cache.aget(self._counter_key(user_id), 0)
+        subscription = await super().subscribe(user_id)
+        loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+            self._poller = loop.create_task(self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        super().unsubscribe(subscription)
+        with self._lock:
+            if subscription.user_id not in self._subscriptions:
+                self._seen.pop(subscription.user_id, None)
+                self._gaps.pop(subscription.user_id, None)
+
+    async def _poll(self):
+        """Deliver new events to this worker's streams until none are open."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            user_ids = self.subscribed_users()
+            if not user_ids:
+                return
+            try:
+                await self._poll_once(user_ids)
+            except Exception:
+                logger.exception("Reading trade events from the cache failed")
+
+    async def _poll_once(self, user_ids):
+        counters = await self.cache.aget_many([self._counter_key(user_id) for user_id in user_ids])
+        for user_id in user_ids:
+            seen = self._seen.get(user_id)
+            last = counters.get(self._counter_key(user_id), 0)
+            if seen is None or last <= seen:
+                continue
+            numbers = range(seen + 1, last + 1)
+            events = await self.cache.aget_many([self._event_key(user_id, number) for number in numbers])
+            for number in numbers:
+                event = events.get(self._event_key(user_id, number))
+                if event is None and self._gaps.get(user_id) != number:
+                    # publish() stores an event just after numbering it; look again next poll
+                    self._gaps[user_id] = number
+                    break
+                if event is not None:
+                    self._deliver(user_id, event)
+                self._seen[user_id] = number
+
+
+_broker = None
+
+
+def get_event_broker():
+    global _broker
+    if _broker is None:
+        backend = getattr(settings, 'TRADE_EVENT_BACKEND', 'core.events.LocalMemoryEventBroker')
+        options = getattr(settings, 'TRADE_EVENT_OPTIONS', {})
+        _broker = import_string(backend)(**options)
+    return _broker
+
+
+@receiver(setting_changed)
+def _reset_event_broker(setting, **kwargs):
+    global _broker
+    if setting in ('TRADE_EVENT_BACKEND', 'TRADE_EVENT_OPTIONS'):
+        _broker = None
+
+
+def publish_trade_event(kind, trade_id, sender_id, receiver_id):
+    """Tell both players about a trade once the current transaction commits."""
+    event = {'type': kind, 'trade': trade_id, 'sender': sender_id, 'receiver': receiver_id}
+
+    def publish():
+        broker = get_event_broker()
+        for user_id in {sender_id, receiver_id}:
+            broker.publish(user_id, event)
+
+    # robust: the trade has been saved either way, so a broker outage is only logged
+    transaction.on_commit(publish, robust=True)
@@ -0,0 +1,46 @@
+"""Keyset pagination over a dinosaur's RaiseAction history.
+
+Pages are ordered newest first by (timestamp, id) and the cursor is the
+position of the last row returned, so each page is an index range scan on
+(dinosaur, timestamp, id) no matter how deep the player scrolls.
+"""
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+
+ACTION_PAGE_SIZE = 20
+MAX_ACTION_PAGE_SIZE = 100
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(action):
+    micros = (action.timestamp - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}-{action.id}"
+
+
+def decode_cursor(cursor):
+    """Return (timestamp, id) for a cursor, or None if it is malformed."""
+    try:
+        micros, action_id = cursor.split('-', 1)
+        return _EPOCH + timedelta(microseconds=int(micros)), int(action_id)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def action_page(dino, cursor=None, limit=ACTION_PAGE_SIZE):
+    """Return (actions, next_cursor) for the page after ``cursor``.
+
+    ``next_cursor`` is None once the oldest action has been returned.
+    """
+    limit = max(1, min(limit, MAX_ACTION_PAGE_SIZE))
+    actions = dino.actions.order_by('-timestamp', '-id')
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        timestamp, action_id = position
+        actions = actions.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=action_id))
+    rows = list(actions[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
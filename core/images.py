@@ -0,0 +1,135 @@
+"""Build resized WebP variants of the sprite images.
+
+Every PNG under ``SPRITE_SOURCE_DIRS`` (relative to ``static/``) gets one
+WebP per width in ``SPRITE_VARIANT_WIDTHS`` that is narrower than the source.
+They are written to ``static/images/variants/`` with the source's content
+hash in the file name, and ``manifest.json`` next to them maps each source
+path to its variants. core.sprites reads the manifest to emit ``srcset``.
+
+A rebuild skips any source whose hash and widths match the manifest and
+whose variant files all exist, and deletes variants of sources that changed
+or disappeared. Pillow is only needed to build; serving just reads the
+manifest.
+"""
+import hashlib
+import json
+import os
+
+from django.conf import settings
+
+VARIANTS_DIR = 'images/variants'
+MANIFEST_NAME = f'{VARIANTS_DIR}/manifest.json'
+MANIFEST_VERSION = 1
+
+DEFAULT_SOURCE_DIRS = ('images/adult_dinos', 'images/juvenile_dinos', 'images/eggs', 'images/hatching_egg')
+DEFAULT_WIDTHS = (160, 320, 640)
+DEFAULT_QUALITY = 80
+
+
+class ImagePipelineUnavailable(Exception):
+    """Pillow is not installed, so variants cannot be built here."""
+
+
+def static_source_root():
+    return str(settings.STATICFILES_DIRS[0])
+
+
+def _content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'version': MANIFEST_VERSION, 'images': {}}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {'version': MANIFEST_VERSION, 'images': {}}
+    return manifest
+
+
+def source_images(root, source_dirs):
+    for source_dir in source_dirs:
+        directory = os.path.join(root, source_dir)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if filename.lower().endswith('.png'):
+                yield f'{source_dir}/{filename}'
+
+
+def build_variants(root=None, source_dirs=None, widths=None, quality=None, force=False):
+    """Build missing or stale variants under ``root`` and rewrite the manifest.
+
+    Returns ``{'built': [...], 'skipped': [...], 'removed': [...]}`` of
+    source paths (and removed variant paths).
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImagePipelineUnavailable("Pillow is required to build image variants (pip install Pillow).")
+
+    root = root or static_source_root()
+    source_dirs = source_dirs or getattr(settings, 'SPRITE_SOURCE_DIRS', DEFAULT_SOURCE_DIRS)
+    widths = sorted(widths or getattr(settings, 'SPRITE_VARIANT_WIDTHS', DEFAULT_WIDTHS))
+    quality = quality or getattr(settings, 'SPRITE_VARIANT_QUALITY', DEFAULT_QUALITY)
+    old = read_manifest(root)['images']
+    images = {}
+    report = {'built': [], 'skipped': [], 'removed': []}
+
+    for source in source_images(root, source_dirs):
+        source_path = os.path.join(root, source)
+        digest = _content_hash(source_path)
+        entry = old.get(source)
+        if (
+            not force and entry and entry['hash'] == digest and entry['quality'] == quality
+            and entry['requested_widths'] == widths
+            and all(os.path.exists(os.path.join(root, path)) for _, path in entry['variants'])
+        ):
+            images[source] = entry
+            report['skipped'].append(source)
+            continue
+
+        stem = os.path.splitext(source[len('images/'):])[0]
+        with Image.open(source_path) as image:
+            image.load()
+            source_width, source_height = image.size
+            variants = []
+            for width in widths:
+                if width >= source_width:
+                    continue
+                height = round(source_height * width / source_width)
+                path = f'{VARIANTS_DIR}/{stem}.{digest}.{width}w.webp'
+                target = os.path.join(root, path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                image.resize((width, height), Image.LANCZOS).save(target, 'WEBP', quality=quality, method=6)
+                variants.append([width, path])
+        images[source] = {
+            'hash': digest,
+            'quality': quality,
+            'requested_widths': widths,
+            'width': source_width,
+            'height': source_height,
+            'variants': variants,
+        }
+        report['built'].append(source)
+
+    # Drop variants of sources that changed or were removed
+    keep = {path for entry in images.values() for _, path in entry['variants']}
+    for entry in old.values():
+        for _, path in entry['variants']:
+            if path not in keep and os.path.exists(os.path.join(root, path)):
+                os.remove(os.path.join(root, path))
+                report['removed'].append(path)
+
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'images': images}, f, indent=1, sort_keys=True)
+        f.write('\n')
+    return report
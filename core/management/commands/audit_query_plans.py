@@ -0,0 +1,98 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from core.models import Dinosaur, Egg, RaiseAction, Trade, TraitUnlock
+
+
+def canonical_queries(user_id, dino_id):
+    """(name, queryset) pairs for the owner-scoped queries each view runs."""
+    return [
+        ('active_nests: unhatched eggs',
+         Egg.objects.filter(owner_id=user_id, is_hatched=False).order_by('created_at')),
+        ('home: has unhatched egg',
+         Egg.objects.filter(owner_id=user_id, is_hatched=False).values('id')[:1]),
+        ('your_dinosaurs: owned dinosaurs',
+         Dinosaur.objects.filter(owner_id=user_id)),
+        ('dashboard: has juvenile dinosaur',
+         Dinosaur.objects.filter(owner_id=user_id, stage='juvenile').values('id')[:1]),
+        ('dinosaur_detail: action history page',
+         RaiseAction.objects.filter(dinosaur_id=dino_id).order_by('-timestamp', '-id')[:21]),
+        ('perform_action: trait unlocked at level',
+         TraitUnlock.objects.filter(dinosaur_id=dino_id, level=2).values('id')[:1]),
+        ('trade_center: pending trades',
+         Trade.objects.filter(Q(sender_id=user_id) | Q(receiver_id=user_id), status='pending')
+         .order_by('-created_at', '-id')[:20]),
+        ('trade_center: sent pending trades',
+         Trade.objects.filter(sender_id=user_id, status='pending').order_by('-created_at')),
+        ('trade_center: received pending trades',
+         Trade.objects.filter(receiver_id=user_id, status='pending').order_by('-created_at')),
+        ('accept_trade: competing trades',
+         Trade.objects.filter(status='pending').filter(
+             Q(sender_egg_id__in=[0]) | Q(receiver_egg_id__in=[0])
+             | Q(sender_dinosaur_id__in=[dino_id]) | Q(receiver_dinosaur_id__in=[dino_id]))),
+    ]
+
+
+# SQLite: "SCAN core_egg" is a full table scan; "SEARCH ... USING INDEX" and
+# "SCAN ... USING (COVERING) INDEX" are not flagged as sequential.
+SQLITE_SEQ_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)')
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on each view's canonical owner-scoped queries and flag "
+        "sequential scans. Works on SQLite and PostgreSQL. Planners prefer "
+        "sequential scans on tiny tables, so run it on realistic data "
+        "(see seed_world) or pass --no-seqscan on PostgreSQL to check whether "
+        "an index is usable at all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username to build the queries for (default: any user).")
+        parser.add_argument('--no-seqscan', action='store_true',
+                            help="PostgreSQL only: SET enable_seqscan = off for the session first.")
+        parser.add_argument('--fail-on-seqscan', action='store_true',
+                            help="Exit with an error if any sequential scan is found.")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every plan in full.")
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor == 'sqlite':
+            pattern = SQLITE_SEQ_SCAN
+        elif vendor == 'postgresql':
+            pattern = POSTGRES_SEQ_SCAN
+        else:
+            raise CommandError(f"Unsupported database backend: {vendor}")
+
+        User = get_user_model()
+        users = User.objects.filter(username=options['user']) if options['user'] else User.objects.all()
+        user_id = users.values_list('pk', flat=True).first() or 0
+        dino_id = Dinosaur.objects.filter(owner_id=user_id).values_list('pk', flat=True).first() or 0
+
+        if options['no_seqscan']:
+            if vendor != 'postgresql':
+                raise CommandError("--no-seqscan is only supported on PostgreSQL.")
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+        flagged = []
+        for name, queryset in canonical_queries(user_id, dino_id):
+            plan = queryset.explain()
+            scans = sorted(set(t for t in pattern.findall(plan) if t.startswith('core_')))
+            if scans:
+                flagged.append(name)
+                self.stdout.write(self.style.WARNING(f"SEQ SCAN  {name}: {', '.join(scans)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok        {name}"))
+            if options['verbose_plans'] or scans:
+                for line in plan.splitlines():
+                    self.stdout.write(f"            {line}")
+
+        self.stdout.write(f"{len(flagged)} of {len(canonical_queries(user_id, dino_id))} queries use a sequential scan ({vendor}).")
+        if flagged and options['fail_on_seqscan']:
+            raise CommandError("Sequential scans found: " + '; '.join(flagged))
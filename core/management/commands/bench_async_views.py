@@ -0,0 +1,180 @@
+import asyncio
+import statistics
+import threading
+import time
+import types
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, RequestFactory, override_settings
+
+from core import async_views, views
+from core.models import Dinosaur, Egg, Trade
+from core.urls import core_patterns
+
+PAGES = ('/dashboard/', '/your-dinosaurs/', '/active-nests/', '/trade-center/')
+
+
+def urlconf(read_views):
+    module = types.ModuleType(f'bench_urls_{read_views.__name__}')
+    module.urlpatterns = core_patterns(read_views)
+    return module
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync read-only views under Django's WSGI handler (one "
+        "thread per in-flight request, like a threaded gunicorn worker) with "
+        "their async twins under the ASGI handler (one event loop, like a "
+        "uvicorn worker), at the same concurrency. Reports req/s and p50/p99 "
+        "per page. Point DATABASE_URL at a local PostgreSQL for meaningful "
+        "numbers. Creates throwaway 'bench_async_*' players and deletes them "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help="Requests per page and mode.")
+        parser.add_argument('--concurrency', type=int, default=64, help="Requests in flight at once.")
+        parser.add_argument('--page', action='append', dest='pages', help="Page to request (repeatable).")
+        parser.add_argument(
+            '--no-fragment-cache', action='store_true',
+            help="Use a dummy 'fragments' cache so every request queries the database.",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        stamp = int(time.time())
+        user = User.objects.create_user(username=f"bench_async_{stamp}")
+        other = User.objects.create_user(username=f"bench_async_{stamp}_b")
+        caches = settings.CACHES
+        if options['no_fragment_cache']:
+            caches = {**caches, 'fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        try:
+            self.populate(user, other)
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            client.get('/dashboard/')  # picks up a CSRF cookie, as a browser would have
+            cookie = '; '.join(f"{name}={morsel.value}" for name, morsel in client.cookies.items())
+            pages = options['pages'] or PAGES
+            self.stdout.write(
+                f"backend: {connection.vendor}, concurrency: {options['concurrency']}, "
+                f"requests per page and mode: {options['requests']}, "
+                f"fragment cache: {'off' if options['no_fragment_cache'] else 'on'}"
+            )
+            with override_settings(CACHES=caches):
+                for page in pages:
+                    with override_settings(ROOT_URLCONF=urlconf(views)):
+                        self.report(page, 'sync / WSGI', *self.run_sync(page, cookie, options))
+                    with override_settings(ROOT_URLCONF=urlconf(async_views)):
+                        self.report(page, 'async / ASGI', *asyncio.run(self.run_async(page, cookie, options)))
+        finally:
+            connections.close_all()
+            user.delete()
+            other.delete()
+
+    def populate(self, user, other):
+        dinos = Dinosaur.objects.bulk_create(
+            Dinosaur(name=f"Bench {i}", species_name='Green Egg', owner=user) for i in range(12)
+        )
+        theirs = Dinosaur.objects.bulk_create(
+            Dinosaur(name=f"Other {i}", species_name='Blue Egg', owner=other) for i in range(12)
+        )
+        Egg.objects.bulk_create(
+            Egg(species_name='Orange Egg', element_type='Fire', rarity='Common', owner=user) for _ in range(6)
+        )
+        Trade.objects.bulk_create(
+            Trade(sender=other, receiver=user, sender_dinosaur=their, receiver_dinosaur=mine)
+            for mine, their in zip(dinos, theirs)
+        )
+
+    def run_sync(self, path, cookie, options):
+        handler = WSGIHandler()
+        factory = RequestFactory(HTTP_HOST='localhost', HTTP_COOKIE=cookie)
+        latencies, errors = [], []
+        lock = threading.Lock()
+        remaining = iter(range(options['requests']))
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    start = time.perf_counter()
+                    response = handler(factory.get(path).environ, lambda status, headers: None)
+                    b''.join(response)
+                    response.close()
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+                        if response.status_code != 200:
+                            errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, errors, time.perf_counter() - start
+
+    async def run_async(self, path, cookie, options):
+        handler = ASGIHandler()
+        latencies, errors = [], []
+        slots = asyncio.Semaphore(options['concurrency'])
+
+        async def one():
+            async with slots:
+                start = time.perf_counter()
+                status = await self.asgi_get(handler, path, cookie)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(status)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(options['requests'])))
+        return latencies, errors, time.perf_counter() - start
+
+    @staticmethod
+    async def asgi_get(handler, path, cookie):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+            'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        done = asyncio.Event()
+        status = None
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif not message.get('more_body'):
+                done.set()
+
+        await handler(scope, receive, send)
+        return status
+
+    def report(self, page, mode, latencies, errors, elapsed):
+        ms = sorted(x * 1000 for x in latencies)
+        self.stdout.write(
+            f"{page:<16} {mode:<13} {len(ms) / elapsed:7.1f} req/s  p50 {statistics.median(ms):7.2f} ms  "
+            f"p99 {ms[max(int(len(ms) * 0.99) - 1, 0)]:7.2f} ms"
+        )
+        if errors:
+            self.stdout.write(self.style.WARNING(f"  {len(errors)} non-200 responses, e.g. {errors[0]}"))
@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from core.models import Dinosaur, Egg, RaiseAction
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare repeat visits to the collection pages with and without "
+        "If-None-Match. Creates a throwaway 'bench_etag_*' player with the "
+        "given collection size, requests each page through the full middleware "
+        "stack with the test client, and deletes the player afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per page and mode.")
+        parser.add_argument('--dinosaurs', type=int, default=30)
+        parser.add_argument('--eggs', type=int, default=10)
+        parser.add_argument('--actions', type=int, default=50, help="Logged actions on the detail page's dinosaur.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user = User.objects.create_user(username=f"bench_etag_{int(time.time())}")
+        try:
+            dinos = Dinosaur.objects.bulk_create([
+                Dinosaur(name=f"bench-{i}", species_name='Green Egg', owner=user) for i in range(options['dinosaurs'])
+            ])
+            Egg.objects.bulk_create([
+                Egg(species_name='Blue Egg', element_type='Water', rarity='Common', owner=user)
+                for _ in range(options['eggs'])
+            ])
+            if dinos:
+                RaiseAction.objects.bulk_create([
+                    RaiseAction(dinosaur=dinos[0], action_type='play', outcome='bench') for _ in range(options['actions'])
+                ])
+            client = Client(SERVER_NAME='localhost')
+            client.force_login(user)
+            urls = ['/dashboard/', '/your-dinosaurs/', '/active-nests/']
+            if dinos:
+                urls.append(f'/dinosaur/{dinos[0].pk}/')
+            for url in urls:
+                self.bench(client, url, options['requests'])
+        finally:
+            user.delete()
+
+    def bench(self, client, url, count):
+        first = client.get(url)
+        etag = first.get('ETag')
+        if first.status_code != 200 or not etag:
+            self.stdout.write(self.style.WARNING(f"{url}: status {first.status_code}, no ETag; skipped"))
+            return
+        full = self.time_requests(client, url, count, {})
+        revalidated = self.time_requests(client, url, count, {'HTTP_IF_NONE_MATCH': etag}, expect=304)
+        full_rate = count / sum(full)
+        revalidated_rate = count / sum(revalidated)
+        self.stdout.write(
+            f"{url:<22} full render {full_rate:7.1f} req/s (p50 {statistics.median(full) * 1000:.2f} ms), "
+            f"304 {revalidated_rate:7.1f} req/s (p50 {statistics.median(revalidated) * 1000:.2f} ms), "
+            f"{revalidated_rate / full_rate:.1f}x, {len(first.content)} bytes saved per hit"
+        )
+
+    def time_requests(self, client, url, count, headers, expect=200):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get(url, **headers)
+            timings.append(time.perf_counter() - start)
+            if response.status_code != expect:
+                self.stdout.write(self.style.WARNING(f"{url}: expected {expect}, got {response.status_code}"))
+                break
+        return timings
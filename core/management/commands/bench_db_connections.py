@@ -0,0 +1,113 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client, RequestFactory
+
+from core.models import Dinosaur
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test one page through Django's WSGI handler from several worker "
+        "threads, first opening a database connection per request "
+        "(CONN_MAX_AGE=0) and then with persistent connections and health "
+        "checks, and report p50/p99 latency for each. Point DATABASE_URL at a "
+        "local PostgreSQL (or a PgBouncer in front of it, with DB_POOLER set) "
+        "for meaningful numbers; SQLite works as a stand-in. Creates a "
+        "throwaway 'bench_conn_*' player and deletes it afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Requests per mode.")
+        parser.add_argument('--threads', type=int, default=4, help="Concurrent workers, like gunicorn workers.")
+        parser.add_argument('--conn-max-age', type=int, default=600, help="CONN_MAX_AGE for the persistent run.")
+        parser.add_argument('--path', help="Page to request (default: the player's dinosaur state API).")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(username=f"bench_conn_{int(time.time())}")
+        db = connections.settings['default']
+        original = {key: db.get(key) for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        try:
+            dino = Dinosaur.objects.create(name='bench', species_name='Green Egg', owner=user)
+            client = Client()
+            client.force_login(user)
+            cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+            path = options['path'] or f'/api/dinosaurs/{dino.pk}/'
+            pooler = getattr(settings, 'DATABASE_POOLER', '') or 'none'
+            self.stdout.write(
+                f"backend: {connection.vendor}, pooler: {pooler}, path: {path}, "
+                f"threads: {options['threads']}, requests per mode: {options['requests']}"
+            )
+            modes = [
+                ('connect per request', 0, False),
+                (f"persistent ({options['conn_max_age']}s + health checks)", options['conn_max_age'], True),
+            ]
+            for label, max_age, health_checks in modes:
+                db['CONN_MAX_AGE'] = max_age
+                db['CONN_HEALTH_CHECKS'] = health_checks
+                self.report(label, *self.run(path, cookie, options['requests'], options['threads']))
+        finally:
+            db.update(original)
+            connections.close_all()
+            user.delete()
+
+    def run(self, path, cookie, count, threads):
+        handler = WSGIHandler()
+        factory = RequestFactory(HTTP_HOST='localhost', HTTP_COOKIE=cookie)
+        latencies = []
+        errors = []
+        opened = []
+        lock = threading.Lock()
+        remaining = iter(range(count))
+
+        def count_connection(sender, connection, **kwargs):
+            with lock:
+                opened.append(connection.alias)
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    start = time.perf_counter()
+                    response = handler(factory.get(path).environ, lambda status, headers: None)
+                    b''.join(response)
+                    # Sends request_finished, which closes or keeps the
+                    # connection according to CONN_MAX_AGE.
+                    response.close()
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+                        if response.status_code != 200:
+                            errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        connection_created.connect(count_connection)
+        try:
+            start = time.perf_counter()
+            workers = [threading.Thread(target=worker) for _ in range(threads)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            connection_created.disconnect(count_connection)
+        return latencies, errors, len(opened), elapsed
+
+    def report(self, label, latencies, errors, opened, elapsed):
+        ms = sorted(x * 1000 for x in latencies)
+        self.stdout.write(
+            f"{label:<36} {len(ms) / elapsed:7.1f} req/s  p50 {statistics.median(ms):6.2f} ms  "
+            f"p99 {ms[max(int(len(ms) * 0.99) - 1, 0)]:6.2f} ms  connections opened: {opened}"
+        )
+        if errors:
+            self.stdout.write(self.style.WARNING(f"  {len(errors)} non-200 responses, e.g. {errors[0]}"))
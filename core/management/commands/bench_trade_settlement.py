@@ -0,0 +1,118 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from core.models import Dinosaur, Egg, Trade
+from core.trades import TradeError, accept_trade
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark core.trades.accept_trade under a multi-threaded accept storm. "
+        "Several senders compete for each of the receiver's dinosaurs and every "
+        "trade is accepted concurrently; exactly one per dinosaur may win. "
+        "Creates throwaway 'bench_trade_*' users and deletes them afterwards. "
+        "Run against a local PostgreSQL database: SQLite has no row locks and "
+        "serialises writers, so it only checks correctness."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dinosaurs', type=int, default=50, help="Receiver dinosaurs being competed for.")
+        parser.add_argument('--competitors', type=int, default=4, help="Pending trades per dinosaur.")
+        parser.add_argument('--threads', type=int, default=16)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        prefix = f"bench_trade_{int(time.time())}"
+        receiver = User.objects.create_user(username=f"{prefix}_receiver")
+        senders = User.objects.bulk_create(
+            [User(username=f"{prefix}_sender_{i}") for i in range(options['competitors'])]
+        )
+        try:
+            trade_ids = self.create_trades(receiver, senders, options['dinosaurs'])
+            latencies, outcomes = self.storm(trade_ids, receiver, options['threads'])
+            self.report(latencies, outcomes, receiver, options['threads'])
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
+
+    def create_trades(self, receiver, senders, count):
+        dinos = Dinosaur.objects.bulk_create([
+            Dinosaur(name=f"bench-{i}", species_name='Green Egg', owner=receiver) for i in range(count)
+        ])
+        eggs = Egg.objects.bulk_create([
+            Egg(species_name='Blue Egg', element_type='Water', rarity='Common', owner=sender)
+            for sender in senders for _ in range(count)
+        ])
+        trades = []
+        for s_index, sender in enumerate(senders):
+            for d_index, dino in enumerate(dinos):
+                egg = eggs[s_index * count + d_index]
+                trades.append(Trade(sender=sender, receiver=receiver, sender_egg=egg, receiver_dinosaur=dino))
+        Trade.objects.bulk_create(trades)
+        return list(
+            Trade.objects.filter(receiver=receiver, status='pending').order_by('?').values_list('pk', flat=True)
+        )
+
+    def storm(self, trade_ids, receiver, threads):
+        latencies = []
+        outcomes = {'accepted': 0, 'rejected': 0, 'error': 0}
+        lock = threading.Lock()
+
+        def accept(trade_id):
+            start = time.perf_counter()
+            try:
+                accept_trade(trade_id, receiver)
+                outcome = 'accepted'
+            except TradeError:
+                outcome = 'rejected'
+            except Exception:
+                outcome = 'error'
+            finally:
+                connection.close()
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                outcomes[outcome] += 1
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(accept, trade_ids))
+        self.elapsed = time.perf_counter() - start
+        connections.close_all()
+        return latencies, outcomes
+
+    def report(self, latencies, outcomes, receiver, threads):
+        latencies.sort()
+        ms = [x * 1000 for x in latencies]
+        self.stdout.write(f"backend: {connection.vendor}, threads: {threads}, trades: {len(ms)}")
+        self.stdout.write(f"outcomes: {outcomes}")
+        self.stdout.write(
+            f"throughput: {len(ms) / self.elapsed:.1f} accepts/s, "
+            f"p50 {statistics.median(ms):.2f} ms, p99 {ms[int(len(ms) * 0.99) - 1]:.2f} ms"
+        )
+
+        # Every dinosaur must have been won by exactly one accepted trade, and
+        # its owner must be that trade's sender.
+        dinos = Dinosaur.objects.filter(name__startswith='bench-', received_dino_trades__receiver=receiver).distinct().prefetch_related('received_dino_trades')
+        double = 0
+        wrong_owner = 0
+        for dino in dinos:
+            accepted = [t for t in dino.received_dino_trades.all() if t.status == 'accepted']
+            if len(accepted) > 1:
+                double += 1
+            elif accepted and dino.owner_id != accepted[0].sender_id:
+                wrong_owner += 1
+        # A trade whose transaction errored (e.g. SQLite 'database is locked')
+        # is rolled back and legitimately stays pending.
+        still_pending = Trade.objects.filter(receiver=receiver, status='pending').count()
+        if double or wrong_owner or still_pending > outcomes['error']:
+            self.stdout.write(self.style.ERROR(
+                f"consistency check failed: {double} double transfers, {wrong_owner} wrong owners, "
+                f"{still_pending - outcomes['error']} trades left pending without an error"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("consistency check passed: no double transfers"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.images import ImagePipelineUnavailable, MANIFEST_NAME, build_variants
+
+
+class Command(BaseCommand):
+    help = (
+        "Write resized WebP variants of the sprite PNGs to static/images/variants "
+        "and update its manifest.json, which the sprite template tags read to "
+        "emit srcset. Only sources whose content changed are rebuilt. "
+        "collectstatic runs this first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Rebuild every variant, not just stale ones.")
+        parser.add_argument('--widths', type=int, nargs='+', help="Override SPRITE_VARIANT_WIDTHS.")
+
+    def handle(self, *args, **options):
+        try:
+            report = build_variants(widths=options['widths'], force=options['force'])
+        except ImagePipelineUnavailable as exc:
+            raise CommandError(str(exc))
+        for source in report['built']:
+            self.stdout.write(f"  built {source}")
+        for path in report['removed']:
+            self.stdout.write(f"  removed {path}")
+        self.stdout.write(
+            f"{len(report['built'])} built, {len(report['skipped'])} up to date, "
+            f"{len(report['removed'])} stale variants removed; manifest: static/{MANIFEST_NAME}"
+        )
@@ -0,0 +1,31 @@
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectStaticCommand
+
+from core.bundle import build_bundles
+from core.images import ImagePipelineUnavailable, build_variants
+
+
+class Command(CollectStaticCommand):
+    help = CollectStaticCommand.help + " Builds the front-end bundles and sprite image variants first."
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--skip-sprite-variants', action='store_true',
+            help="Do not (re)build the sprite image variants before collecting.",
+        )
+
+    def handle(self, **options):
+        if not options['dry_run']:
+            build_bundles()
+        if not options['skip_sprite_variants'] and not options['dry_run']:
+            try:
+                report = build_variants()
+            except ImagePipelineUnavailable as exc:
+                # The committed variants and manifest are still collected.
+                self.stderr.write(self.style.WARNING(f"Skipping sprite variants: {exc}"))
+            else:
+                if options['verbosity'] >= 1:
+                    self.stdout.write(
+                        f"Sprite variants: {len(report['built'])} built, {len(report['skipped'])} up to date."
+                    )
+        return super().handle(**options)
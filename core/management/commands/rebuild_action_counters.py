@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from core.models import Dinosaur, RaiseAction
+
+
+def counter_annotations():
+    """Count() expressions that recompute every Dinosaur counter column."""
+    annotations = {'calc_action_count': Count('actions')}
+    for action_type, field in RaiseAction.COUNTER_FIELDS.items():
+        annotations[f'calc_{field}'] = Count('actions', filter=Q(actions__action_type=action_type))
+    return annotations
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-dinosaur action counters from RaiseAction history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['action_count', *RaiseAction.COUNTER_FIELDS.values()]
+        ids = list(Dinosaur.objects.order_by('pk').values_list('pk', flat=True))
+        changed = 0
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            with transaction.atomic():
+                # Lock first, then count: PostgreSQL rejects FOR UPDATE on a
+                # query with GROUP BY.
+                dinos = list(
+                    Dinosaur.objects.select_for_update()
+                    .filter(pk__in=chunk)
+                    .order_by('pk')
+                    .only(*fields)
+                )
+                counts = {
+                    row.pop('pk'): row
+                    for row in Dinosaur.objects.filter(pk__in=chunk).values('pk').annotate(**counter_annotations())
+                }
+                stale = []
+                for dino in dinos:
+                    values = {f: counts[dino.pk][f'calc_{f}'] for f in fields}
+                    if any(getattr(dino, f) != v for f, v in values.items()):
+                        for f, v in values.items():
+                            setattr(dino, f, v)
+                        stale.append(dino)
+                Dinosaur.objects.bulk_update(stale, fields)
+                changed += len(stale)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt action counters for {len(ids)} dinosaurs ({changed} changed)."
+        ))
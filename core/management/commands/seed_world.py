@@ -0,0 +1,250 @@
+import random
+import string
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.actions import SESSION_ACTIONS, SessionState, next_level, plan_action
+from core.models import Dinosaur, Egg, RaiseAction, Trade, Trait, TraitUnlock
+from core.nests import MATERIAL_CAP
+from core.sprites import species_key_for
+from core.traits import get_catalog, invalidate_catalog
+
+# (species_name, element_type, rarity), as claim_egg and the wilderness hand them out
+SPECIES = (
+    ('Green Egg', 'Earth', 'Common'),
+    ('Orange Egg', 'Fire', 'Common'),
+    ('Blue Egg', 'Water', 'Common'),
+)
+NAME_CHARS = string.ascii_letters + string.digits
+
+
+class BatchWriter:
+    """Collects unsaved rows and bulk_creates them ``batch_size`` at a time."""
+
+    def __init__(self, model, batch_size):
+        self.model = model
+        self.batch_size = batch_size
+        self.rows = []
+        self.written = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.model.objects.bulk_create(self.rows)
+            self.written += len(self.rows)
+            self.rows = []
+
+
+def play_history(dino, action_count, weights, catalog, rng):
+    """Yield the plan of each of ``action_count`` random actions played on ``dino``.
+
+    The rules are core.actions' own, stepped in memory as in run_session, so
+    stages, levels, trait unlocks and outcome text match what players see.
+    """
+    state = SessionState(dino)
+    owned_trait_ids = set()
+    unlocked_levels = set()
+    for action_type in rng.choices(SESSION_ACTIONS, weights, k=action_count):
+        level_unlocked = next_level(state, action_type) in unlocked_levels
+        plan = plan_action(state, action_type, owned_trait_ids, level_unlocked, catalog, rng)
+        if plan.trait:
+            owned_trait_ids.add(plan.trait.id)
+            unlocked_levels.add(plan.level)
+        yield plan
+        state.advance(plan)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic world for load tests and benchmarks: players with "
+        "eggs part-way to hatching, dinosaurs with full raise histories (stages, "
+        "levels and trait unlocks follow the game rules) and pending and settled "
+        "trades. Per-player counts are exponentially distributed around the "
+        "given means, so a few heavy players own a large share of the rows, as "
+        "in production. Players are written a chunk at a time and rows go "
+        "through bulk_create in batches, so memory stays flat however large the "
+        "world. The same --seed gives the same world."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help="Players to create.")
+        parser.add_argument('--eggs', type=float, default=3, help="Mean unhatched eggs per player.")
+        parser.add_argument('--dinosaurs', type=float, default=4, help="Mean dinosaurs per player.")
+        parser.add_argument('--actions', type=float, default=30, help="Mean raise actions per dinosaur.")
+        parser.add_argument(
+            '--action-mix', default='4,3,3',
+            help="Relative weights of feed, play and train actions (train raises levels).",
+        )
+        parser.add_argument('--trades', type=float, default=2, help="Mean trades sent per player.")
+        parser.add_argument('--pending', type=float, default=0.3, help="Share of trades still pending.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same world.")
+        parser.add_argument('--prefix', default='world', help="Username prefix for the generated players.")
+        parser.add_argument('--password', help="Password for every player (default: unusable).")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Players generated per transaction.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per bulk_create.")
+
+    def handle(self, *args, **options):
+        try:
+            weights = [float(w) for w in options['action_mix'].split(',')]
+        except ValueError:
+            weights = []
+        if len(weights) != len(SESSION_ACTIONS) or min(weights) < 0 or not sum(weights):
+            raise CommandError("--action-mix takes three non-negative weights (feed,play,train), e.g. 4,3,3.")
+        if not 0 <= options['pending'] <= 1:
+            raise CommandError("--pending is a share between 0 and 1.")
+        User = get_user_model()
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(f"Players named '{prefix}_*' already exist; pick another --prefix.")
+        if not Trait.objects.exists():
+            # Trait unlocks need a catalog; this is the one the game ships with
+            call_command('loaddata', 'initial_data', verbosity=0)
+            # The Trait signals wait for a commit, which never comes under an outer atomic block
+            invalidate_catalog()
+
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        self.weights = weights
+        self.catalog = get_catalog()
+        self.password = make_password(options['password']) if options['password'] else make_password(None)
+        batch_size = options['batch_size']
+        self.writers = {
+            model: BatchWriter(model, batch_size)
+            for model in (RaiseAction, TraitUnlock, Dinosaur.traits.through, Trade)
+        }
+
+        start = time.perf_counter()
+        totals = {'players': 0, 'eggs': 0, 'dinosaurs': 0}
+        for first in range(0, options['users'], options['chunk_size']):
+            count = min(options['chunk_size'], options['users'] - first)
+            with transaction.atomic():
+                for name, written in self.seed_chunk(first, count).items():
+                    totals[name] += written
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"  {first + count} of {options['users']} players")
+
+        totals['raise actions'] = self.writers[RaiseAction].written
+        totals['trait unlocks'] = self.writers[TraitUnlock].written
+        totals['trades'] = self.writers[Trade].written
+        elapsed = time.perf_counter() - start
+        rows = sum(totals.values()) + self.writers[Dinosaur.traits.through].written
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {', '.join(f'{n} {name}' for name, n in totals.items())} "
+            f"in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)."
+        ))
+
+    def count(self, mean):
+        """A per-player (or per-dinosaur) count, exponentially distributed around ``mean``."""
+        return round(self.rng.expovariate(1 / mean)) if mean > 0 else 0
+
+    def egg(self, owner, **fields):
+        species_name, element_type, rarity = self.rng.choice(SPECIES)
+        return Egg(species_name=species_name, element_type=element_type, rarity=rarity, owner=owner, **fields)
+
+    def seed_chunk(self, first, count):
+        rng = self.rng
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            User(username=f"{self.options['prefix']}_{i}", password=self.password)
+            for i in range(first, first + count)
+        )
+
+        # Unhatched eggs part-way through collecting twigs and leaves, then
+        # one hatched egg per dinosaur (hatching needs the full set).
+        eggs = []
+        for user in users:
+            for _ in range(self.count(self.options['eggs'])):
+                eggs.append(self.egg(user, twigs=rng.randint(0, MATERIAL_CAP), leaves=rng.randint(0, MATERIAL_CAP)))
+            for _ in range(self.count(self.options['dinosaurs'])):
+                eggs.append(self.egg(user, twigs=MATERIAL_CAP, leaves=MATERIAL_CAP, is_hatched=True))
+        eggs = Egg.objects.bulk_create(eggs, batch_size=self.options['batch_size'])
+
+        # Play each dinosaur's history once to get its final state and
+        # counters (bulk_create skips RaiseAction.save, which keeps them),
+        # then replay it from the same seed to write the log.
+        dinos, histories = [], []
+        for egg in eggs:
+            if not egg.is_hatched:
+                continue
+            dino = Dinosaur(
+                name=f"{egg.species_name}-{''.join(rng.choices(NAME_CHARS, k=4))}",
+                species_name=egg.species_name, species_key=species_key_for(egg.species_name),
+                egg=egg, owner_id=egg.owner_id,
+            )
+            history = (rng.getrandbits(64), self.count(self.options['actions']))
+            self.play(dino, history, write=False)
+            dinos.append(dino)
+            histories.append(history)
+        dinos = Dinosaur.objects.bulk_create(dinos, batch_size=self.options['batch_size'])
+        for dino, history in zip(dinos, histories):
+            self.play(Dinosaur(pk=dino.pk, name=dino.name), history, write=True)
+
+        self.seed_trades(users, eggs, dinos)
+        for writer in self.writers.values():
+            writer.flush()
+        return {'players': len(users), 'eggs': len(eggs), 'dinosaurs': len(dinos)}
+
+    def play(self, dino, history, write):
+        """Play ``history`` (seed, action count) on ``dino``; either set its
+        final state or write its log, trait unlocks and traits."""
+        seed, action_count = history
+        plans = play_history(dino, action_count, self.weights, self.catalog, random.Random(seed))
+        for plan in plans:
+            if not write:
+                dino.mood, dino.stage, dino.level = plan.mood, plan.stage, plan.level
+                for action_type, _ in plan.log_entries():
+                    dino.action_count += 1
+                    counter = RaiseAction.COUNTER_FIELDS.get(action_type)
+                    if counter:
+                        setattr(dino, counter, getattr(dino, counter) + 1)
+                continue
+            for action_type, outcome in plan.log_entries():
+                self.writers[RaiseAction].add(RaiseAction(dinosaur_id=dino.pk, action_type=action_type, outcome=outcome))
+            if plan.trait:
+                self.writers[TraitUnlock].add(TraitUnlock(dinosaur_id=dino.pk, trait_id=plan.trait.id, level=plan.level))
+                self.writers[Dinosaur.traits.through].add(
+                    Dinosaur.traits.through(dinosaur_id=dino.pk, trait_id=plan.trait.id)
+                )
+
+    def seed_trades(self, users, eggs, dinos):
+        """Trades between players of the same chunk.
+
+        Pending and declined trades name items their parties still own. An
+        accepted trade was settled, so its items have already changed hands.
+        """
+        rng = self.rng
+        items = {user.pk: [] for user in users}
+        for egg in eggs:
+            if not egg.is_hatched:
+                items[egg.owner_id].append(('egg', egg.pk))
+        for dino in dinos:
+            items[dino.owner_id].append(('dinosaur', dino.pk))
+        if len(users) < 2:
+            return
+        for sender in users:
+            for _ in range(self.count(self.options['trades'])):
+                receiver = rng.choice(users)
+                if receiver.pk == sender.pk:
+                    continue
+                if rng.random() < self.options['pending']:
+                    status = 'pending'
+                else:
+                    status = rng.choice(('accepted', 'declined'))
+                offered_from, asked_from = (receiver, sender) if status == 'accepted' else (sender, receiver)
+                if not items[offered_from.pk] or not items[asked_from.pk]:
+                    continue
+                offered_kind, offered = rng.choice(items[offered_from.pk])
+                asked_kind, asked = rng.choice(items[asked_from.pk])
+                self.writers[Trade].add(Trade(
+                    sender_id=sender.pk, receiver_id=receiver.pk, status=status,
+                    **{f'sender_{offered_kind}_id': offered, f'receiver_{asked_kind}_id': asked},
+                ))
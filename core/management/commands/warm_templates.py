@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+from core.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile every project template and report how long each took. "
+        "Fails if any template does not compile, so it can run in the release "
+        "phase. gunicorn.conf.py runs the same warm-up in each worker at boot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slowest', type=int, default=5, help="How many of the slowest templates to list.")
+
+    def handle(self, *args, **options):
+        engine = engines['django'].engine
+        cached = any(isinstance(loader, CachedLoader) for loader in engine.template_loaders)
+        timings = warm_templates()
+        total = sum(seconds for _, seconds, _ in timings)
+        failed = [(name, error) for name, _, error in timings if error]
+
+        self.stdout.write(f"cached loader: {'on' if cached else 'off'}")
+        for name, seconds, error in sorted(timings, key=lambda t: t[1], reverse=True)[:options['slowest']]:
+            self.stdout.write(f"  {seconds * 1000:7.2f} ms  {name}")
+        self.stdout.write(f"compiled {len(timings) - len(failed)} of {len(timings)} templates in {total * 1000:.1f} ms")
+
+        # A second pass only shows the saving when the loader caches.
+        if cached:
+            again = sum(seconds for _, seconds, _ in warm_templates([name for name, _, error in timings if not error]))
+            self.stdout.write(f"second pass (from cache): {again * 1000:.1f} ms")
+        if failed:
+            raise CommandError("Templates failed to compile: " + '; '.join(f"{n}: {e}" for n, e in failed))
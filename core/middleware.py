@@ -0,0 +1,96 @@
+import asyncio
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+async def _read_chunks(file, block_size):
+    read = sync_to_async(file.read, thread_sensitive=False)
+    try:
+        while chunk := await read(block_size):
+            yield chunk
+    finally:
+        file.close()
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware that can also sit in an async middleware chain.
+
+    WhiteNoise 6.5 is sync-only, so under ASGI Django would run every
+    request, static or not, through its single thread-sensitive executor.
+    Finding a static file is a dict lookup, so the async path does that
+    inline and awaits the rest of the chain. Files are streamed through an
+    async iterator; Django would otherwise read a sync one into memory.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            response = self.serve(static_file, request)
+            file = response.file_to_stream
+            if file is not None:
+                response.streaming_content = _read_chunks(file, response.block_size)
+            return response
+        return await self.get_response(request)
+
+
+def _is_event_stream(message):
+    return any(
+        name.lower() == b'content-type' and value.startswith(b'text/event-stream')
+        for name, value in message.get('headers', ())
+    )
+
+
+class EventStreamDisconnect:
+    """ASGI wrapper that ends server-sent event streams when the client leaves.
+
+    Django 4.2 stops reading from the connection once it has the request
+    body, and uvicorn quietly drops messages sent after a disconnect, so an
+    event stream would otherwise run (and stay subscribed) forever. Once a
+    text/event-stream response has started, this waits for the disconnect
+    and cancels the request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        watcher = None
+
+        async def cancel_on_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            request.cancel()
+
+        async def watched_send(message):
+            nonlocal watcher
+            if message['type'] == 'http.response.start' and _is_event_stream(message):
+                watcher = asyncio.ensure_future(cancel_on_disconnect())
+            await send(message)
+
+        request = asyncio.ensure_future(self.app(scope, receive, watched_send))
+        try:
+            await request
+        except asyncio.CancelledError:
+            if watcher is None or not watcher.done():
+                raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
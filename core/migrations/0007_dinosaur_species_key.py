@@ -0,0 +1,29 @@
+# Generated by Django 4.2.24 on 2026-10-18 15:42
+
+from django.db import migrations, models
+
+from core.sprites import species_key_for
+
+
+def backfill_species_key(apps, schema_editor):
+    Dinosaur = apps.get_model('core', 'Dinosaur')
+    dinos = list(Dinosaur.objects.only('id', 'species_name'))
+    for dino in dinos:
+        dino.species_key = species_key_for(dino.species_name)
+    Dinosaur.objects.bulk_update(dinos, ['species_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_remove_trade_dinosaur_trade_receiver_dinosaur_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dinosaur',
+            name='species_key',
+            field=models.CharField(db_index=True, default='green', editable=False, max_length=20),
+        ),
+        migrations.RunPython(backfill_species_key, migrations.RunPython.noop),
+    ]
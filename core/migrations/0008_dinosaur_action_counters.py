@@ -0,0 +1,56 @@
+# Generated by Django 4.2.24 on 2026-10-18 15:44
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_action_counters(apps, schema_editor):
+    Dinosaur = apps.get_model('core', 'Dinosaur')
+    dinos = list(Dinosaur.objects.annotate(
+        calc_action_count=Count('actions'),
+        calc_feed_count=Count('actions', filter=Q(actions__action_type='feed')),
+        calc_play_count=Count('actions', filter=Q(actions__action_type='play')),
+        calc_train_count=Count('actions', filter=Q(actions__action_type='train')),
+        calc_trait_unlock_count=Count('actions', filter=Q(actions__action_type='trait_unlock')),
+    ))
+    fields = ['action_count', 'feed_count', 'play_count', 'train_count', 'trait_unlock_count']
+    for dino in dinos:
+        for field in fields:
+            setattr(dino, field, getattr(dino, f'calc_{field}'))
+    Dinosaur.objects.bulk_update(dinos, fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_dinosaur_species_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dinosaur',
+            name='action_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dinosaur',
+            name='feed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dinosaur',
+            name='play_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dinosaur',
+            name='train_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dinosaur',
+            name='trait_unlock_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_action_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-18 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_dinosaur_action_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='raiseaction',
+            index=models.Index(fields=['dinosaur', 'timestamp', 'id'], name='core_action_dino_ts_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-18 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_raiseaction_history_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['sender', 'status', 'created_at'], name='core_trade_sender_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['receiver', 'status', 'created_at'], name='core_trade_receiver_status_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.24 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_trade_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dinosaur',
+            index=models.Index(fields=['owner', 'stage'], name='core_dino_owner_stage_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='egg',
+            index=models.Index(fields=['owner', 'is_hatched', 'created_at'], name='core_egg_owner_hatched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='raiseaction',
+            index=models.Index(fields=['dinosaur', 'action_type', 'timestamp'], name='core_action_dino_type_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.24 on 2026-10-18 15:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import re
+
+UNLOCK_OUTCOME = re.compile(r'unlocked a new trait: (?P<trait>.+)! \(level (?P<level>\d+)\)')
+
+
+def backfill_trait_unlocks(apps, schema_editor):
+    RaiseAction = apps.get_model('core', 'RaiseAction')
+    Trait = apps.get_model('core', 'Trait')
+    TraitUnlock = apps.get_model('core', 'TraitUnlock')
+    traits = dict(Trait.objects.values_list('name', 'pk'))
+    unlocks = {}
+    rows = (
+        RaiseAction.objects.filter(action_type='trait_unlock')
+        .order_by('timestamp', 'pk')
+        .values_list('dinosaur_id', 'outcome', 'timestamp')
+    )
+    for dinosaur_id, outcome, timestamp in rows.iterator():
+        match = UNLOCK_OUTCOME.search(outcome)
+        if not match:
+            continue
+        key = (dinosaur_id, int(match['level']))
+        # keep the first unlock if a race logged the same level twice
+        if key not in unlocks:
+            unlocks[key] = TraitUnlock(
+                dinosaur_id=dinosaur_id,
+                trait_id=traits.get(match['trait']),
+                level=key[1],
+                unlocked_at=timestamp,
+            )
+    TraitUnlock.objects.bulk_create(unlocks.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_owner_scoped_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TraitUnlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveIntegerField()),
+                ('unlocked_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('dinosaur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trait_unlocks', to='core.dinosaur')),
+                ('trait', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='unlocks', to='core.trait')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='traitunlock',
+            constraint=models.UniqueConstraint(fields=('dinosaur', 'level'), name='core_traitunlock_dino_level_uniq'),
+        ),
+        migrations.RunPython(backfill_trait_unlocks, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models import F
 from django.conf import settings
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+from .sprites import species_key_for, sprite_path
+
 
 class Egg(models.Model):
     name = models.CharField(max_length=100, blank=True)
@@ -20,6 +24,12 @@ class Egg(models.Model):
     twigs = models.PositiveIntegerField(default=0)
     leaves = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            # active_nests / home: a player's unhatched eggs, oldest first
+            models.Index(fields=['owner', 'is_hatched', 'created_at'], name='core_egg_owner_hatched_idx'),
+        ]
+
     def __str__(self):
         return f"🥚 {self.species_name} Egg ({self.rarity})"
 
@@ -52,6 +62,7 @@ class Dinosaur(models.Model):
 
     name = models.CharField(max_length=100)
     species_name = models.CharField(max_length=100)
+    species_key = models.CharField(max_length=20, default='green', db_index=True, editable=False)
     stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default='juvenile')
     mood = models.CharField(max_length=20, choices=MOOD_CHOICES, default='happy')
     traits = models.ManyToManyField(Trait, blank=True, related_name='dinosaurs')
@@ -70,28 +81,37 @@ class Dinosaur(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     level = models.PositiveIntegerField(default=1)
 
+    # Denormalised RaiseAction counts, bumped by RaiseAction.save and
+    # recomputed by the rebuild_action_counters management command.
+    action_count = models.PositiveIntegerField(default=0)
+    feed_count = models.PositiveIntegerField(default=0)
+    play_count = models.PositiveIntegerField(default=0)
+    train_count = models.PositiveIntegerField(default=0)
+    trait_unlock_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # dashboard / your_dinosaurs: a player's dinosaurs by stage
+            models.Index(fields=['owner', 'stage'], name='core_dino_owner_stage_idx'),
+        ]
+
     def __str__(self):
         return f"🦕 {self.name} ({self.stage}, {self.mood})"
 
+    def save(self, *args, **kwargs):
+        self.species_key = species_key_for(self.species_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'species_name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'species_key'}
+        super().save(*args, **kwargs)
+
     def get_sprite(self):
         """Return the relative static path for the dino's current stage sprite."""
-        color = self.species_name.split()[0].lower()
-        if self.stage == "juvenile":
-            image_map = {
-                'green': 'green_rex_juvie.png',
-                'blue': 'blue_spino_juvie.png',
-                'orange': 'orange_trike_juvie.png',
-            }
-            return f"images/juvenile_dinos/{image_map.get(color, 'green_rex_juvie.png')}"
-        elif self.stage == "adult":
-            image_map = {
-                'green': 'green_rex_adult.png',
-                'blue': 'blue_spino_adult.png',
-                'orange': 'orange_trike_adult.png',
-            }
-            return f"images/adult_dinos/{image_map.get(color, 'green_rex_adult.png')}"
-        else:
-            return "images/juvenile_dinos/green_rex_juvie.png"
+        return sprite_path(self.species_key, self.stage)
+
+    @property
+    def image_path(self):
+        return self.get_sprite()
 
     def level_up(self, amount=1):
         """Increase level but cap at 100."""
@@ -111,9 +131,67 @@ class RaiseAction(models.Model):
     outcome = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a dinosaur's history (core.history)
+            models.Index(fields=['dinosaur', 'timestamp', 'id'], name='core_action_dino_ts_id_idx'),
+            # perform_action: a dinosaur's actions of one type (e.g. trait unlocks)
+            models.Index(fields=['dinosaur', 'action_type', 'timestamp'], name='core_action_dino_type_idx'),
+        ]
+
+    # action_type -> Dinosaur counter column
+    COUNTER_FIELDS = {
+        'feed': 'feed_count',
+        'play': 'play_count',
+        'train': 'train_count',
+        'trait_unlock': 'trait_unlock_count',
+    }
+
     def __str__(self):
         return f"{self.action_type} → {self.dinosaur.name}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            self.bump_dinosaur_counters()
+
+    def bump_dinosaur_counters(self):
+        """Increment the dinosaur's counters in SQL and on the cached instance."""
+        fields = ['action_count']
+        counter = self.COUNTER_FIELDS.get(self.action_type)
+        if counter:
+            fields.append(counter)
+        Dinosaur.objects.filter(pk=self.dinosaur_id).update(**{f: F(f) + 1 for f in fields})
+        # Keep an already loaded dinosaur in step so a later save() on it
+        # does not write the old counts back.
+        if self._meta.get_field('dinosaur').is_cached(self):
+            dino = self.dinosaur
+            for f in fields:
+                setattr(dino, f, getattr(dino, f) + 1)
+
+
+class TraitUnlock(models.Model):
+    """One row per trait-unlock level a dinosaur has passed.
+
+    The unique (dinosaur, level) constraint makes the "already unlocked at
+    this level?" check an index probe, and makes the database reject a
+    second unlock for the same level from a concurrent request.
+    """
+    dinosaur = models.ForeignKey(Dinosaur, on_delete=models.CASCADE, related_name='trait_unlocks')
+    trait = models.ForeignKey(Trait, null=True, blank=True, on_delete=models.SET_NULL, related_name='unlocks')
+    level = models.PositiveIntegerField()
+    # not auto_now_add, so the 0012 backfill can keep the original timestamps
+    unlocked_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dinosaur', 'level'], name='core_traitunlock_dino_level_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.dinosaur.name} unlocked {self.trait} at level {self.level}"
+
 
 class Trade(models.Model):
     STATUS_CHOICES = [
@@ -139,6 +217,12 @@ class Trade(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['sender', 'status', 'created_at'], name='core_trade_sender_status_idx'),
+            models.Index(fields=['receiver', 'status', 'created_at'], name='core_trade_receiver_status_idx'),
+        ]
+
     def clean(self):
         
         sender_items = [self.sender_egg, self.sender_dinosaur]
@@ -0,0 +1,84 @@
+"""Apply one egg action to many of a player's eggs at once.
+
+The batch locks the selected eggs with one select_for_update query, draws all
+of its random outcomes in one NumPy call, and writes twigs/leaves back with a
+single bulk_update. The outcomes follow the single-egg rules in
+views.egg_detail.
+"""
+import numpy as np
+from django.db import transaction
+
+from .caching import bump_collection_version
+from .models import Egg
+
+EGG_ACTIONS = ('search_wilderness', 'turn_egg', 'sing_egg')
+MAX_BULK_EGGS = 50
+MATERIAL_CAP = 5
+# turn_egg / sing_egg "something happened" chance
+REACTION_CHANCE = 0.3
+
+_MESSAGES = {
+    'twig': 'You found a twig!',
+    'leaf': 'You found a leaf!',
+    'nothing': 'You searched but found nothing this time.',
+    'warmer': 'You turned the egg. It feels warmer!',
+    'turned': 'You turned the egg. Nothing happened.',
+    'glow': 'You sang to the egg. It glows softly!',
+    'sang': 'You sang to the egg. No change.',
+}
+
+
+def apply_bulk_egg_action(user, egg_ids, action, rng=None):
+    """Apply ``action`` to the user's unhatched eggs in ``egg_ids``.
+
+    Returns one ``{'id', 'result', 'message', 'twigs', 'leaves',
+    'ready_to_hatch'}`` dict per egg, in id order. Eggs the user does not own
+    or that have hatched are skipped.
+    """
+    if action not in EGG_ACTIONS:
+        raise ValueError(f"Unknown egg action: {action}")
+    rng = rng or np.random.default_rng()
+    with transaction.atomic():
+        eggs = list(
+            Egg.objects.select_for_update()
+            .filter(owner=user, is_hatched=False, pk__in=list(egg_ids)[:MAX_BULK_EGGS])
+            .order_by('pk')
+        )
+        if not eggs:
+            return []
+        if action == 'search_wilderness':
+            # 0 = twig, 1 = leaf, 2/3 = nothing (a 50% chance of finding something)
+            finds = rng.integers(0, 4, size=len(eggs))
+            results = []
+            changed = []
+            for egg, find in zip(eggs, finds.tolist()):
+                if find == 0 and egg.twigs < MATERIAL_CAP:
+                    egg.twigs += 1
+                    result = 'twig'
+                elif find == 1 and egg.leaves < MATERIAL_CAP:
+                    egg.leaves += 1
+                    result = 'leaf'
+                else:
+                    result = 'nothing'
+                if result != 'nothing':
+                    changed.append(egg)
+                results.append(result)
+            Egg.objects.bulk_update(changed, ['twigs', 'leaves'])
+        else:
+            reacted = (rng.random(len(eggs)) < REACTION_CHANCE).tolist()
+            hit, miss = ('warmer', 'turned') if action == 'turn_egg' else ('glow', 'sang')
+            results = [hit if r else miss for r in reacted]
+    if action == 'search_wilderness':
+        # bulk_update skips post_save, so invalidate the player's caches here
+        bump_collection_version(user.pk)
+    return [
+        {
+            'id': egg.id,
+            'result': result,
+            'message': _MESSAGES[result],
+            'twigs': egg.twigs,
+            'leaves': egg.leaves,
+            'ready_to_hatch': egg.twigs >= MATERIAL_CAP and egg.leaves >= MATERIAL_CAP,
+        }
+        for egg, result in zip(eggs, results)
+    ]
@@ -0,0 +1,167 @@
+"""Per-user rate limiting for game actions.
+
+Limits are named in ``settings.RATE_LIMITS`` as ``name: (limit, window_seconds)``
+and checked against a pluggable backend chosen by ``settings.RATE_LIMIT_BACKEND``:
+
+* ``LocalMemoryRateLimiter`` keeps an exact sliding-window log in process
+  memory. Good for tests and single-process development servers.
+* ``CacheRateLimiter`` keeps a sliding-window counter (the current and previous
+  fixed windows, weighted by overlap) in a Django cache, so every gunicorn
+  worker sharing that cache sees the same counts. The cache must increment
+  atomically (Redis or Memcached); a file cache loses concurrent hits.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+DEFAULT_RATE_LIMITS = {
+    'wilderness_search': (5, 24 * 60 * 60),
+    'egg_search': (120, 60 * 60),
+}
+
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'remaining', 'retry_after'])
+
+
+class BaseRateLimiter:
+    def hit(self, key, limit, window, cost=1):
+        """Consume ``cost`` units for ``key`` if that keeps it within ``limit``."""
+        raise NotImplementedError
+
+    def peek(self, key, limit, window):
+        """Report the state for ``key`` without consuming anything."""
+        raise NotImplementedError
+
+
+class LocalMemoryRateLimiter(BaseRateLimiter):
+    def __init__(self, **options):
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def _window(self, key, window, now):
+        hits = self._hits.setdefault(key, deque())
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        return hits
+
+    def _result(self, hits, limit, window, now, allowed):
+        remaining = max(limit - len(hits), 0)
+        retry_after = 0 if remaining else max(hits[0] + window - now, 0)
+        return RateLimitResult(allowed, remaining, retry_after)
+
+    def hit(self, key, limit, window, cost=1):
+        now = time.time()
+        with self._lock:
+            hits = self._window(key, window, now)
+            allowed = len(hits) + cost <= limit
+            if allowed:
+                hits.extend([now] * cost)
+            return self._result(hits, limit, window, now, allowed)
+
+    def peek(self, key, limit, window):
+        now = time.time()
+        with self._lock:
+            hits = self._window(key, window, now)
+            return self._result(hits, limit, window, now, len(hits) < limit)
+
+
+class CacheRateLimiter(BaseRateLimiter):
+    def __init__(self, cache_alias='default', key_prefix='ratelimit', **options):
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _keys(self, key, window, now):
+        index = int(now // window)
+        return (
+            f"{self.key_prefix}:{key}:{window}:{index}",
+            f"{self.key_prefix}:{key}:{window}:{index - 1}",
+        )
+
+    def _estimate(self, current, previous, window, now):
+        overlap = 1 - (now % window) / window
+        return current + previous * overlap
+
+    def _result(self, current, previous, limit, window, now, allowed):
+        used = self._estimate(current, previous, window, now)
+        remaining = max(int(limit - used), 0)
+        if remaining:
+            retry_after = 0
+        elif current >= limit or not previous:
+            retry_after = window - now % window
+        else:
+            # wait until enough of the previous window has slid out
+            needed_overlap = (limit - 1 - current) / previous
+            retry_after = max((1 - needed_overlap) * window - now % window, 0)
+        return RateLimitResult(allowed, remaining, retry_after)
+
+    def hit(self, key, limit, window, cost=1):
+        now = time.time()
+        current_key, previous_key = self._keys(key, window, now)
+        values = self.cache.get_many([current_key, previous_key])
+        current, previous = values.get(current_key, 0), values.get(previous_key, 0)
+        if self._estimate(current, previous, window, now) + cost > limit:
+            return self._result(current, previous, limit, window, now, False)
+        # add() then incr() is atomic on Redis and Memcached; re-check afterwards
+        # and hand the units back if a concurrent worker got there first.
+        self.cache.add(current_key, 0, timeout=2 * window)
+        current = self.cache.incr(current_key, cost)
+        if self._estimate(current, previous, window, now) > limit:
+            current = self.cache.decr(current_key, cost)
+            return self._result(current, previous, limit, window, now, False)
+        return self._result(current, previous, limit, window, now, True)
+
+    def peek(self, key, limit, window):
+        now = time.time()
+        current_key, previous_key = self._keys(key, window, now)
+        values = self.cache.get_many([current_key, previous_key])
+        current, previous = values.get(current_key, 0), values.get(previous_key, 0)
+        allowed = self._estimate(current, previous, window, now) + 1 <= limit
+        return self._result(current, previous, limit, window, now, allowed)
+
+
+_limiter = None
+
+
+def get_rate_limiter():
+    global _limiter
+    if _limiter is None:
+        backend = getattr(settings, 'RATE_LIMIT_BACKEND', 'core.ratelimit.CacheRateLimiter')
+        options = getattr(settings, 'RATE_LIMIT_OPTIONS', {})
+        _limiter = import_string(backend)(**options)
+    return _limiter
+
+
+@receiver(setting_changed)
+def _reset_rate_limiter(setting, **kwargs):
+    global _limiter
+    if setting in ('RATE_LIMIT_BACKEND', 'RATE_LIMIT_OPTIONS'):
+        _limiter = None
+
+
+def _rate(name):
+    return getattr(settings, 'RATE_LIMITS', {}).get(name, DEFAULT_RATE_LIMITS[name])
+
+
+def _key(name, user):
+    return f"{name}:{user.pk}"
+
+
+def check_rate(name, user, cost=1):
+    """Consume ``cost`` units of the named limit for ``user``."""
+    limit, window = _rate(name)
+    return get_rate_limiter().hit(_key(name, user), limit, window, cost)
+
+
+def peek_rate(name, user):
+    """State of the named limit for ``user`` without consuming it."""
+    limit, window = _rate(name)
+    return get_rate_limiter().peek(_key(name, user), limit, window)
@@ -0,0 +1,40 @@
+"""Invalidate per-user caches when a player's collection changes."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_collection_version
+from .models import Dinosaur, Egg, RaiseAction, Trade, Trait
+from .traits import invalidate_catalog
+
+
+@receiver(post_save, sender=Egg)
+@receiver(post_delete, sender=Egg)
+@receiver(post_save, sender=Dinosaur)
+@receiver(post_delete, sender=Dinosaur)
+def owner_collection_changed(sender, instance, **kwargs):
+    bump_collection_version(instance.owner_id)
+
+
+# Only post_save: a post_delete receiver would stop Django fast-deleting a
+# dinosaur's whole action history, and the Dinosaur delete bumps anyway.
+@receiver(post_save, sender=RaiseAction)
+def action_logged(sender, instance, **kwargs):
+    if RaiseAction._meta.get_field('dinosaur').is_cached(instance):
+        owner_id = instance.dinosaur.owner_id
+    else:
+        owner_id = Dinosaur.objects.filter(pk=instance.dinosaur_id).values_list('owner_id', flat=True).first()
+    bump_collection_version(owner_id)
+
+
+@receiver(post_save, sender=Trade)
+@receiver(post_delete, sender=Trade)
+def trade_changed(sender, instance, **kwargs):
+    bump_collection_version(instance.sender_id, instance.receiver_id)
+
+
+@receiver(post_save, sender=Trait)
+@receiver(post_delete, sender=Trait)
+def trait_changed(sender, instance, **kwargs):
+    # After commit, or another worker could reload the old rows under the new version
+    transaction.on_commit(invalidate_catalog)
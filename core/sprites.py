@@ -0,0 +1,86 @@
+"""Sprite lookup for eggs and dinosaurs.
+
+The registry maps ``(species_key, stage)`` to a path under ``static/`` and is
+built once from ``CoreConfig.ready``. Dinosaurs store their ``species_key`` so
+list pages only need a dict lookup per row.
+
+``SPRITE_VARIANTS`` holds the resized WebP variants listed in the manifest
+written by ``build_sprite_variants`` (see core.images), loaded alongside the
+registry, so templates can emit ``srcset`` without touching the disk.
+"""
+from .images import read_manifest, static_source_root
+
+DEFAULT_SPECIES_KEY = 'green'
+
+# species_key -> file name prefix for each sprite family
+SPECIES_SPRITES = {
+    'green': {'dino': 'green_rex', 'egg': 'green_egg'},
+    'orange': {'dino': 'orange_trike', 'egg': 'orange_egg'},
+    'blue': {'dino': 'blue_spino', 'egg': 'blue_egg'},
+}
+
+SPRITE_REGISTRY = {}
+SPRITE_VARIANTS = {}
+
+
+def species_key_for(species_name):
+    """Normalise a free-text species name (e.g. 'Green Egg') to a species key."""
+    words = (species_name or '').strip().lower().replace('_', ' ').replace('-', ' ').split()
+    for word in words:
+        if word in SPECIES_SPRITES:
+            return word
+    return DEFAULT_SPECIES_KEY
+
+
+def build_registry():
+    """Populate SPRITE_REGISTRY for every known species and stage."""
+    registry = {}
+    for key, names in SPECIES_SPRITES.items():
+        registry[(key, 'egg')] = f"images/eggs/{names['egg']}.png"
+        registry[(key, 'hatching')] = f"images/hatching_egg/{key}_hatching_egg.png"
+        registry[(key, 'juvenile')] = f"images/juvenile_dinos/{names['dino']}_juvie.png"
+        registry[(key, 'adult')] = f"images/adult_dinos/{names['dino']}_adult.png"
+    SPRITE_REGISTRY.clear()
+    SPRITE_REGISTRY.update(registry)
+    load_variants()
+    return SPRITE_REGISTRY
+
+
+def load_variants(root=None):
+    """Populate SPRITE_VARIANTS from the variant manifest, if one was built."""
+    images = read_manifest(root or static_source_root())['images']
+    SPRITE_VARIANTS.clear()
+    for source, entry in images.items():
+        SPRITE_VARIANTS[source] = {
+            'width': entry['width'],
+            'height': entry['height'],
+            'variants': [(width, path) for width, path in entry['variants']],
+        }
+    return SPRITE_VARIANTS
+
+
+def sprite_variants(path):
+    """Return ``{'width', 'height', 'variants': [(width, path), ...]}`` or None.
+
+    Variants are ordered narrowest first; None means the image has no built
+    variants and should be served as-is.
+    """
+    if not SPRITE_REGISTRY:
+        build_registry()
+    return SPRITE_VARIANTS.get(path)
+
+
+def sprite_path(species_key, stage):
+    """Return the static path for a species key and stage.
+
+    Unknown species fall back to the default species, and any stage that is
+    not 'adult', 'egg' or 'hatching' is drawn as a juvenile.
+    """
+    if not SPRITE_REGISTRY:
+        build_registry()
+    if stage not in ('adult', 'egg', 'hatching'):
+        stage = 'juvenile'
+    path = SPRITE_REGISTRY.get((species_key, stage))
+    if path is None:
+        path = SPRITE_REGISTRY[(DEFAULT_SPECIES_KEY, stage)]
+    return path
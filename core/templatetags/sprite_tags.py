@@ -0,0 +1,42 @@
+from django import template
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from core.sprites import species_key_for, sprite_path, sprite_variants
+
+register = template.Library()
+
+# Width served to browsers that ignore srcset
+FALLBACK_WIDTH = 320
+
+
+@register.simple_tag
+def sprite_img(path, alt='', sizes='100vw', **attrs):
+    """Render an <img> for a static sprite with a srcset of its built variants.
+
+    ``sizes`` should describe the rendered width (e.g. '180px') so the browser
+    picks the smallest variant that is sharp at its pixel density. Any other
+    keyword arguments (class, style, loading...) become attributes. Images
+    without variants fall back to a plain <img> of the original file.
+    """
+    info = sprite_variants(path)
+    attrs = {'alt': alt, 'decoding': 'async', **attrs}
+    if not info or not info['variants']:
+        return format_html('<img src="{}"{}>', static(path), flatatt(attrs))
+    variants = info['variants']
+    src = next((p for width, p in variants if width >= FALLBACK_WIDTH), variants[-1][1])
+    srcset = ', '.join(f"{static(p)} {width}w" for width, p in variants)
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}"{}>', static(src), srcset, sizes, flatatt(attrs),
+    )
+
+
+@register.filter
+def egg_sprite(species_name):
+    """Static path of the egg sprite for a species name, e.g. 'Green Egg'.
+
+    Unknown species get the default species' egg; the manifest storage
+    raises for files it has never seen.
+    """
+    return sprite_path(species_key_for(species_name), 'egg')
@@ -1,7 +1,69 @@
 
-from django.test import TestCase
+from io import StringIO
+from unittest import mock, skipUnless
+import asyncio
+import os
+import tempfile
+import types
+
+import numpy as np
+
+from django.conf import settings
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from .models import Egg, Trait, Dinosaur
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from .models import Egg, Trait, Dinosaur, RaiseAction, Trade, TraitUnlock
+from django.db import IntegrityError, transaction
+from .sprites import species_key_for, sprite_path
+from .tracing import clear_traces, recent_traces
+from .history import ACTION_PAGE_SIZE, action_page
+from .trades import TradeError, accept_trade, cancel_trade
+from .nests import apply_bulk_egg_action
+from .ratelimit import CacheRateLimiter, LocalMemoryRateLimiter
+from .caching import cache_stats, collection_version, reset_cache_stats
+from .conditional import release_tag
+from .traits import get_catalog, invalidate_catalog
+from .actions import plan_action, run_action, run_session
+from .warmup import project_templates, warm_templates
+from .checks import check_production_settings, enforce_performance_checks
+from .images import build_variants
+from .bundle import icon_css, purge_css
+from .events import CacheEventBroker, LocalMemoryEventBroker, get_event_broker
+from .middleware import EventStreamDisconnect
+from . import async_views
+from .urls import core_patterns
+from django.template import Context, Template
+from asgiref.sync import sync_to_async
+
+try:
+	from PIL import Image
+except ImportError:
+	Image = None
+from django.core.exceptions import ImproperlyConfigured
+
+# View tests render base.html, which the hashed manifest storage cannot resolve
+# without a collectstatic run.
+PLAIN_STATIC = override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+
+# Conditional GET needs a default cache shared between processes
+_shared_cache_dir = tempfile.TemporaryDirectory()
+SHARED_CACHE = override_settings(CACHES={
+	**settings.CACHES,
+	'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': _shared_cache_dir.name},
+})
+
+# The caches REDIS_URL selects (nothing connects until a command is sent)
+REDIS_CACHES = {
+	'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/0'},
+	'fragments': {'BACKEND': 'core.caching.CountingRedisCache', 'LOCATION': 'redis://127.0.0.1:6379/0'},
+}
+
+# The URLconf asgi.py selects (ASYNC_VIEWS), for testing the async views
+ASYNC_URLCONF = types.ModuleType('async_urls')
+ASYNC_URLCONF.urlpatterns = core_patterns(async_views)
 
 class EggModelTest(TestCase):
 	def setUp(self):
@@ -64,3 +126,963 @@ class DinosaurModelTest(TestCase):
 	def test_dinosaur_traits(self):
 		self.assertEqual(self.dino.traits.count(), 1)
 		self.assertEqual(self.dino.traits.first().name, 'Fast Runner')
+
+	def test_dinosaur_species_key(self):
+		self.assertEqual(self.dino.species_key, 'blue')
+		self.assertEqual(self.dino.image_path, 'images/juvenile_dinos/blue_spino_juvie.png')
+
+class SpriteRegistryTest(TestCase):
+	def test_species_key_for(self):
+		self.assertEqual(species_key_for('Orange Egg'), 'orange')
+		self.assertEqual(species_key_for('blue_egg'), 'blue')
+		self.assertEqual(species_key_for('Mystery Egg'), 'green')
+
+	def test_sprite_path(self):
+		self.assertEqual(sprite_path('orange', 'adult'), 'images/adult_dinos/orange_trike_adult.png')
+		self.assertEqual(sprite_path('unknown', 'adult'), 'images/adult_dinos/green_rex_adult.png')
+		self.assertEqual(sprite_path('blue', 'hatching'), 'images/hatching_egg/blue_hatching_egg.png')
+
+	def test_egg_sprite_falls_back_for_unknown_species(self):
+		template = Template('{% load sprite_tags %}{{ name|egg_sprite }}')
+		self.assertEqual(template.render(Context({'name': 'Orange Egg'})), 'images/eggs/orange_egg.png')
+		self.assertEqual(template.render(Context({'name': 'Mystery Egg'})), 'images/eggs/green_egg.png')
+
+@PLAIN_STATIC
+@skipUnless(Image, "Pillow is not installed")
+class SpriteVariantTest(TestCase):
+	def setUp(self):
+		self.root = tempfile.TemporaryDirectory()
+		self.addCleanup(self.root.cleanup)
+		os.makedirs(os.path.join(self.root.name, 'images', 'eggs'))
+		self.save_png('red')
+
+	def save_png(self, color):
+		Image.new('RGB', (400, 400), color).save(os.path.join(self.root.name, 'images', 'eggs', 'red_egg.png'))
+
+	def build(self):
+		return build_variants(root=self.root.name, source_dirs=['images/eggs'], widths=[160, 320, 640])
+
+	def test_builds_only_narrower_widths_and_skips_unchanged(self):
+		self.assertEqual(self.build()['built'], ['images/eggs/red_egg.png'])
+		files = sorted(os.listdir(os.path.join(self.root.name, 'images', 'variants', 'eggs')))
+		self.assertEqual([name.rsplit('.', 2)[1] for name in files], ['160w', '320w'])
+		self.assertEqual(self.build()['skipped'], ['images/eggs/red_egg.png'])
+
+	def test_changed_source_replaces_old_variants(self):
+		self.build()
+		self.save_png('blue')
+		report = self.build()
+		self.assertEqual(report['built'], ['images/eggs/red_egg.png'])
+		self.assertEqual(len(report['removed']), 2)
+		self.assertEqual(len(os.listdir(os.path.join(self.root.name, 'images', 'variants', 'eggs'))), 2)
+
+	def test_sprite_img_emits_srcset(self):
+		from . import sprites
+		self.build()
+		self.addCleanup(sprites.load_variants)
+		sprites.load_variants(self.root.name)
+		template = Template('{% load sprite_tags %}{% sprite_img path "Red" sizes="150px" class="egg" %}')
+		html = template.render(Context({'path': 'images/eggs/red_egg.png'}))
+		self.assertIn('320w.webp 320w', html)
+		self.assertIn('sizes="150px"', html)
+		self.assertIn('class="egg"', html)
+		plain = template.render(Context({'path': 'images/logo/logo.png'}))
+		self.assertNotIn('srcset', plain)
+
+class FrontendBundleTest(TestCase):
+	def test_purge_keeps_only_used_classes(self):
+		css = (
+			'/*! licence */\n/* note */:root{--x:1}body{margin:0}.btn,.card .unused{color:red}'
+			'.unused{color:blue}@media (min-width:576px){.unused{a:b}.btn:not(.disabled){c:d}}'
+			'@keyframes pulse{0%{opacity:0}}'
+		)
+		purged = purge_css(css, {'btn', 'card'})
+		self.assertEqual(
+			purged,
+			'/*! licence */\n:root{--x:1}body{margin:0}.btn{color:red}'
+			'@media (min-width:576px){.btn:not(.disabled){c:d}}@keyframes pulse{0%{opacity:0}}',
+		)
+
+	def test_icon_css_inlines_used_symbols(self):
+		sprite = '<svg><symbol class="bi bi-star" viewBox="0 0 16 16" id="star"><path d="M1 1"/></symbol></svg>'
+		css, missing = icon_css(sprite, {'star', 'nope'})
+		self.assertIn(".bi-star{--bi-icon:url(\"data:image/svg+xml,%3Csvg", css)
+		self.assertIn("d='M1 1'", css)
+		self.assertEqual(missing, ['nope'])
+
+	@PLAIN_STATIC
+	def test_pages_load_self_hosted_assets(self):
+		response = self.client.get('/')
+		self.assertContains(response, '/static/bundle/genosaur.css')
+		self.assertNotContains(response, 'cdn.jsdelivr.net')
+
+@PLAIN_STATIC
+class RequestTraceTest(TestCase):
+	def setUp(self):
+		clear_traces()
+
+	@override_settings(REQUEST_TRACE_SAMPLE_RATE=1.0)
+	def test_sampled_request_is_recorded(self):
+		self.client.get('/')
+		trace = recent_traces()[0]
+		self.assertEqual(trace['view'], 'landing')
+		self.assertEqual(trace['status'], 200)
+		self.assertGreater(trace['response_bytes'], 0)
+
+	@override_settings(REQUEST_TRACE_SAMPLE_RATE=0)
+	def test_unsampled_request_is_skipped(self):
+		self.client.get('/')
+		self.assertEqual(recent_traces(), [])
+
+	@override_settings(REQUEST_TRACE_SAMPLE_RATE=1.0)
+	def test_admin_trace_page(self):
+		staff = get_user_model().objects.create_user(username='staff', password='pass', is_staff=True)
+		self.client.force_login(staff)
+		self.client.get('/')
+		response = self.client.get('/admin/request-traces/')
+		self.assertEqual(response.status_code, 200)
+		self.assertContains(response, 'landing')
+
+@PLAIN_STATIC
+class ActionCounterTest(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='counter_user', password='pass')
+		self.dino = Dinosaur.objects.create(name='Rex', species_name='Green Egg', owner=self.user)
+
+	def test_actions_bump_counters(self):
+		self.client.force_login(self.user)
+		for action_type in ['feed', 'feed', 'play', 'train']:
+			self.client.post(f'/dinosaur/{self.dino.id}/action/', {'action_type': action_type})
+		self.dino.refresh_from_db()
+		self.assertEqual(self.dino.feed_count, 2)
+		self.assertEqual(self.dino.play_count, 1)
+		self.assertEqual(self.dino.train_count, 1)
+		self.assertEqual(self.dino.action_count, self.dino.actions.count())
+
+	def test_rebuild_action_counters(self):
+		RaiseAction.objects.create(dinosaur=self.dino, action_type='feed', outcome='ok')
+		RaiseAction.objects.create(dinosaur=self.dino, action_type='trait_unlock', outcome='ok')
+		Dinosaur.objects.filter(pk=self.dino.pk).update(action_count=0, feed_count=7, trait_unlock_count=0)
+		call_command('rebuild_action_counters', stdout=StringIO())
+		self.dino.refresh_from_db()
+		self.assertEqual(self.dino.action_count, 2)
+		self.assertEqual(self.dino.feed_count, 1)
+		self.assertEqual(self.dino.trait_unlock_count, 1)
+
+class TraitUnlockTest(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='unlock_user', password='pass')
+		self.dino = Dinosaur.objects.create(name='Spike', species_name='Green Egg', owner=self.user, stage='juvenile')
+		with self.captureOnCommitCallbacks(execute=True):
+			Trait.objects.create(name='Brave', description='Fearless.')
+			Trait.objects.create(name='Swift', description='Fast.')
+
+	def train(self):
+		self.client.force_login(self.user)
+		self.client.post(f'/dinosaur/{self.dino.id}/action/', {'action_type': 'train'})
+
+	def test_unlock_recorded_once_per_level(self):
+		self.train()
+		unlock = TraitUnlock.objects.get(dinosaur=self.dino)
+		self.assertEqual(unlock.level, 2)
+		self.assertEqual(list(self.dino.traits.all()), [unlock.trait])
+		# Back at level 1, training to level 2 again must not unlock a second trait
+		Dinosaur.objects.filter(pk=self.dino.pk).update(level=1)
+		self.train()
+		self.assertEqual(TraitUnlock.objects.filter(dinosaur=self.dino).count(), 1)
+		self.assertEqual(self.dino.traits.count(), 1)
+
+	def test_database_rejects_duplicate_level(self):
+		trait = Trait.objects.get(name='Brave')
+		TraitUnlock.objects.create(dinosaur=self.dino, trait=trait, level=26)
+		with self.assertRaises(IntegrityError), transaction.atomic():
+			TraitUnlock.objects.create(dinosaur=self.dino, trait=trait, level=26)
+
+class TraitCatalogTest(TestCase):
+	def setUp(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			self.traits = [Trait.objects.create(name=f'Trait {i}', description=f'Desc {i}') for i in range(6)]
+
+	def test_catalog_loads_once(self):
+		catalog = get_catalog()
+		self.assertEqual(len(catalog), 6)
+		with self.assertNumQueries(0):
+			self.assertIs(get_catalog(), catalog)
+			self.assertEqual(catalog.get(self.traits[2].pk).name, 'Trait 2')
+
+	def test_random_missing_skips_owned_traits(self):
+		catalog = get_catalog()
+		owned = {t.pk for t in self.traits[:5]}
+		for _ in range(20):
+			self.assertEqual(catalog.random_missing(owned).id, self.traits[5].pk)
+		self.assertIsNone(catalog.random_missing({t.pk for t in self.traits}))
+
+	def test_trait_changes_invalidate_catalog(self):
+		get_catalog()
+		with self.captureOnCommitCallbacks(execute=True):
+			Trait.objects.create(name='Late', description='Added later.')
+			self.assertEqual(len(get_catalog()), 6)
+		self.assertEqual(len(get_catalog()), 7)
+		with self.captureOnCommitCallbacks(execute=True):
+			self.traits[0].delete()
+		self.assertIsNone(get_catalog().get(self.traits[0].pk))
+
+class ActionEngineTest(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='engine_user', password='pass')
+		self.dino = Dinosaur.objects.create(name='Dash', species_name='Green Egg', owner=self.user)
+		with self.captureOnCommitCallbacks(execute=True):
+			Trait.objects.create(name='Brave', description='Fearless.')
+		get_catalog()
+
+	def run_counted(self, action_type, queries):
+		with self.assertNumQueries(queries):
+			return run_action(self.dino, action_type)
+
+	def test_plan_is_pure(self):
+		self.dino.feed_count = 3
+		with self.assertNumQueries(0):
+			plan = plan_action(self.dino, 'feed')
+		self.assertEqual((plan.stage, plan.mood), ('adult', 'happy'))
+		self.assertEqual(self.dino.stage, 'juvenile')
+
+	def test_evolves_on_the_feed_after_three(self):
+		stages = [run_action(self.dino, 'feed').stage for _ in range(4)]
+		self.assertEqual(stages, ['juvenile', 'juvenile', 'juvenile', 'adult'])
+		other = Dinosaur.objects.create(name='Dot', species_name='Green Egg', owner=self.user)
+		events = run_session(other, ['feed'] * 4)['events']
+		self.assertEqual(events, [{'action': 4, 'event': 'evolved', 'stage': 'adult'}])
+
+	def test_query_counts_per_action(self):
+		# savepoint, UPDATE dinosaur, INSERT log, release
+		self.run_counted('play', 4)
+		self.run_counted('feed', 4)
+		Dinosaur.objects.filter(pk=self.dino.pk).update(level=5)
+		self.dino.refresh_from_db()
+		self.run_counted('train', 4)
+		self.dino.refresh_from_db()
+		self.assertEqual((self.dino.level, self.dino.mood), (6, 'tired'))
+		self.assertEqual((self.dino.action_count, self.dino.feed_count, self.dino.play_count, self.dino.train_count), (3, 1, 1, 1))
+
+	def test_trait_unlock_query_count(self):
+		# + owned traits, ledger check, inner savepoint, ledger insert,
+		# traits.add() (one INSERT ... ON CONFLICT DO NOTHING), inner release
+		plan = self.run_counted('train', 10)
+		self.assertEqual(plan.trait.name, 'Brave')
+		self.dino.refresh_from_db()
+		self.assertEqual((self.dino.level, self.dino.action_count, self.dino.trait_unlock_count), (2, 2, 1))
+		self.assertEqual(list(self.dino.actions.values_list('action_type', flat=True).order_by('id')), ['train', 'trait_unlock'])
+
+	def test_level_capped_in_sql(self):
+		Dinosaur.objects.filter(pk=self.dino.pk).update(level=100)
+		self.dino.refresh_from_db()
+		plan = run_action(self.dino, 'train')
+		self.dino.refresh_from_db()
+		self.assertEqual(self.dino.level, 100)
+		self.assertIn(('success', 'Dash reached the max level 100!'), plan.messages)
+
+class RaiseSessionTest(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='session_user', password='pass')
+		self.dino = Dinosaur.objects.create(name='Tank', species_name='Green Egg', owner=self.user)
+		with self.captureOnCommitCallbacks(execute=True):
+			for i in range(6):
+				Trait.objects.create(name=f'Trait {i}', description=f'Desc {i}')
+
+	def test_session_to_max_level(self):
+		summary = run_session(self.dino, ['feed'] * 4 + ['train'] * 99)
+		self.assertEqual((summary['level'], summary['stage'], summary['mood']), (100, 'adult', 'tired'))
+		unlocks = [e['level'] for e in summary['events'] if e['event'] == 'trait_unlocked']
+		self.assertEqual(unlocks, [2, 26, 51, 76, 99])
+		self.assertIn({'action': 4, 'event': 'evolved', 'stage': 'adult'}, summary['events'])
+		self.dino.refresh_from_db()
+		self.assertEqual(self.dino.level, 100)
+		self.assertEqual(self.dino.traits.count(), 5)
+		self.assertEqual(self.dino.action_count, self.dino.actions.count())
+		self.assertEqual((self.dino.feed_count, self.dino.train_count, self.dino.trait_unlock_count), (4, 99, 5))
+		self.assertEqual(TraitUnlock.objects.filter(dinosaur=self.dino).count(), 5)
+
+	def test_session_matches_single_actions(self):
+		other = Dinosaur.objects.create(name='Tank', species_name='Green Egg', owner=self.user)
+		queue = ['feed', 'play', 'feed', 'feed', 'train', 'feed', 'train', 'play']
+		run_session(self.dino, queue)
+		for action_type in queue:
+			run_action(other, action_type)
+		self.dino.refresh_from_db()
+		other.refresh_from_db()
+		fields = ['stage', 'mood', 'level', 'action_count', 'feed_count', 'play_count', 'train_count', 'trait_unlock_count']
+		self.assertEqual([getattr(self.dino, f) for f in fields], [getattr(other, f) for f in fields])
+		self.assertEqual(
+			list(self.dino.actions.order_by('id').values_list('action_type', flat=True)),
+			list(other.actions.order_by('id').values_list('action_type', flat=True)),
+		)
+
+	def test_query_count_independent_of_queue_length(self):
+		get_catalog()
+		with CaptureQueriesContext(connection) as short:
+			run_session(self.dino, ['play'] * 3)
+		with CaptureQueriesContext(connection) as long:
+			run_session(self.dino, ['play'] * 150)
+		self.assertEqual(len(short), len(long))
+
+	@PLAIN_STATIC
+	def test_endpoint(self):
+		self.client.force_login(self.user)
+		url = f'/dinosaur/{self.dino.id}/session/'
+		response = self.client.post(url, {'actions': ['train', 'train']})
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.json()['level'], 3)
+		stranger = get_user_model().objects.create_user(username='session_stranger', password='pass')
+		with self.assertLogs('django.request', 'WARNING'):
+			self.assertEqual(self.client.post(url, {'actions': ['dance']}).status_code, 400)
+			self.assertEqual(self.client.post(url).status_code, 400)
+			self.client.force_login(stranger)
+			self.assertEqual(self.client.post(url, {'actions': ['train']}).status_code, 404)
+
+@PLAIN_STATIC
+@override_settings(RATE_LIMIT_BACKEND='core.ratelimit.LocalMemoryRateLimiter')
+class StateApiTest(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='api_user', password='pass')
+		self.dino = Dinosaur.objects.create(name='Echo', species_name='Green Egg', owner=self.user, mood='hungry')
+		self.egg = Egg.objects.create(species_name='Blue Egg', element_type='Water', rarity='Common', owner=self.user)
+		self.client.force_login(self.user)
+
+	def test_dinosaur_state_etag(self):
+		url = f'/api/dinosaurs/{self.dino.id}/'
+		response = self.client.get(url)
+		self.assertEqual(response.json()['level'], 1)
+		etag = response['ETag']
+		self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+		self.client.post(f'/api/dinosaurs/{self.dino.id}/actions/', {'action_type': 'play'})
+		self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+	def test_dinosaur_action_returns_changed_fields(self):
+		response = self.client.post(f'/api/dinosaurs/{self.dino.id}/actions/', {'action_type': 'train'})
+		data = response.json()
+		self.assertEqual(data['changed']['level'], 2)
+		self.assertEqual(data['changed']['mood'], 'tired')
+		self.assertNotIn('name', data['changed'])
+		self.assertNotIn('stage', data['changed'])
+		self.assertEqual(
+			self.client.get(f'/api/dinosaurs/{self.dino.id}/', HTTP_IF_NONE_MATCH=data['etag']).status_code, 304
+		)
+
+	def test_egg_action(self):
+		response = self.client.post(f'/api/eggs/{self.egg.id}/actions/', {'action': 'turn_egg'})
+		self.assertEqual(response.json()['changed'], {})
+		self.assertIn('turned the egg', response.json()['message'])
+		with self.assertLogs('django.request', 'WARNING'):
+			response = self.client.post(f'/api/eggs/{self.egg.id}/actions/', {'action': 'hatch'})
+		self.assertEqual(response.status_code, 400)
+
+	def test_egg_action_after_concurrent_hatch(self):
+		from . import nests
+
+		def hatch_first(user, egg_ids, action):
+			Egg.objects.filter(pk__in=egg_ids).update(is_hatched=True)
+			return nests.apply_bulk_egg_action(user, egg_ids, action)
+
+		with mock.patch('core.api.apply_bulk_egg_action', hatch_first), self.assertLogs('django.request', 'WARNING'):
+			response = self.client.post(f'/api/eggs/{self.egg.id}/actions/', {'action': 'sing_egg'})
+		self.assertEqual(response.status_code, 409)
+		self.assertIn('already hatched', response.json()['error'])
+
+	def test_other_players_state_hidden(self):
+		stranger = get_user_model().objects.create_user(username='api_stranger', password='pass')
+		self.client.force_login(stranger)
+		with self.assertLogs('django.request', 'WARNING'):
+			self.assertEqual(self.client.get(f'/api/dinosaurs/{self.dino.id}/').status_code, 404)
+			self.assertEqual(self.client.get(f'/api/eggs/{self.egg.id}/').status_code, 404)
+
+@PLAIN_STATIC
+@SHARED_CACHE
+class ConditionalGetTest(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='etag_user', password='pass')
+		self.dino = Dinosaur.objects.create(name='Rex', species_name='Green Egg', owner=self.user)
+		self.client.force_login(self.user)
+
+	def revalidate(self, url):
+		etag = self.client.get(url)['ETag']
+		return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+	def test_unchanged_pages_return_304_without_queries(self):
+		for url in ['/your-dinosaurs/', '/active-nests/', '/dashboard/']:
+			etag = self.client.get(url)['ETag']
+			# session, user and the conditional check itself; no collection queries
+			with CaptureQueriesContext(connection) as queries:
+				response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+			self.assertEqual(response.status_code, 304, url)
+			self.assertFalse([q for q in queries if 'core_' in q['sql']], url)
+
+	def test_write_changes_etag(self):
+		etag = self.client.get('/your-dinosaurs/')['ETag']
+		with self.captureOnCommitCallbacks(execute=True):
+			Dinosaur.objects.create(name='Blue', species_name='Blue Egg', owner=self.user)
+		self.assertEqual(self.client.get('/your-dinosaurs/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+	def test_dinosaur_detail_follows_owner_collection(self):
+		url = f'/dinosaur/{self.dino.id}/'
+		self.assertEqual(self.revalidate(url).status_code, 304)
+		etag = self.client.get(url)['ETag']
+		with self.captureOnCommitCallbacks(execute=True):
+			run_action(self.dino, 'play')
+		self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+	def test_only_the_hatch_path_deletes_the_egg(self):
+		egg = Egg.objects.create(species_name='Green Egg', element_type='Earth', rarity='Common', owner=self.user, twigs=5, leaves=5)
+		response = self.client.get(f'/hatch/{egg.id}/', follow=True)
+		self.assertContains(response, 'Your egg is hatching')
+		self.assertFalse(Egg.objects.filter(pk=egg.pk).exists())
+		# Revalidating a dinosaur's page must not change anything, 304 or not
+		egg = Egg.objects.create(species_name='Green Egg', element_type='Earth', rarity='Common', owner=self.user)
+		Dinosaur.objects.filter(pk=self.dino.pk).update(egg=egg)
+		self.assertEqual(self.revalidate(f'/dinosaur/{self.dino.id}/').status_code, 304)
+		self.assertTrue(Egg.objects.filter(pk=egg.pk).exists())
+
+	def test_pending_messages_skip_304(self):
+		Dinosaur.objects.filter(pk=self.dino.pk).update(feed_count=3)
+		# evolving flashes "Rex evolved into an Adult!"
+		self.client.post(f'/dinosaur/{self.dino.id}/action/', {'action_type': 'feed'})
+		response = self.client.get('/your-dinosaurs/')
+		self.assertContains(response, 'evolved into an Adult')
+		self.assertFalse(response.has_header('ETag'))
+		self.assertTrue(self.client.get('/your-dinosaurs/').has_header('ETag'))
+
+	def test_release_fingerprint_without_release_variable(self):
+		with override_settings(ETAG_RELEASE='v42'):
+			self.assertEqual(release_tag(), 'v42')
+		with tempfile.TemporaryDirectory() as static_root, override_settings(ETAG_RELEASE='', STATIC_ROOT=static_root):
+			before = release_tag()
+			self.assertTrue(before)
+			with open(os.path.join(static_root, 'staticfiles.json'), 'w') as f:
+				f.write('{"paths": {"css/style.css": "css/style.1234.css"}}')
+			self.assertEqual(release_tag(), before)
+			with override_settings(STATIC_ROOT=static_root):
+				self.assertNotEqual(release_tag(), before)
+
+	def test_per_process_cache_skips_304(self):
+		with override_settings(CACHES={**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+			self.assertFalse(self.client.get('/your-dinosaurs/').has_header('ETag'))
+
+@PLAIN_STATIC
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+class AsyncViewsTest(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='async_user', password='pass')
+		self.other = get_user_model().objects.create_user(username='async_other', password='pass')
+		self.dino = Dinosaur.objects.create(name='Rexy', species_name='Green Egg', owner=self.user)
+		self.egg = Egg.objects.create(species_name='Blue Egg', element_type='Water', rarity='Common', owner=self.user)
+		other_dino = Dinosaur.objects.create(name='Spiny', species_name='Blue Egg', owner=self.other)
+		Trade.objects.create(sender=self.other, receiver=self.user, sender_dinosaur=other_dino, receiver_egg=self.egg)
+		self.async_client.force_login(self.user)
+
+	async def test_pages_render_from_async_orm(self):
+		for url, text in [
+			('/dashboard/', 'Dashboard'), ('/your-dinosaurs/', 'Rexy'),
+			('/active-nests/', 'Blue Egg'), ('/trade-center/', 'async_other'),
+		]:
+			response = await self.async_client.get(url)
+			self.assertContains(response, text, msg_prefix=url)
+		# Second visit renders the cached card fragment without refetching
+		response = await self.async_client.get('/your-dinosaurs/')
+		self.assertContains(response, 'Rexy')
+
+	async def test_trade_form_choices_are_prefetched(self):
+		response = await self.async_client.get('/trade-center/?view=pending')
+		self.assertContains(response, f'<option value="{self.dino.pk}">')
+		self.assertEqual(response.context['page_obj'].paginator.count, 1)
+
+	async def test_trade_offer_post_uses_sync_view(self):
+		response = await self.async_client.post('/trade-center/', {
+			'receiver': 'async_other', 'sender_dinosaur': self.dino.pk, 'receiver_dinosaur': '',
+			'receiver_egg': '',
+		})
+		self.assertEqual(response.status_code, 200)
+		self.assertContains(response, 'exactly one item')
+
+	@SHARED_CACHE
+	async def test_conditional_get_and_login(self):
+		etag = (await self.async_client.get('/your-dinosaurs/'))['ETag']
+		response = await self.async_client.get('/your-dinosaurs/', headers={'If-None-Match': etag})
+		self.assertEqual(response.status_code, 304)
+		response = await AsyncClient().get('/dashboard/')
+		self.assertEqual(response.status_code, 302)
+		self.assertIn('next=/dashboard/', response['Location'])
+
+	@override_settings(TRADE_EVENT_BACKEND='core.events.LocalMemoryEventBroker', TRADE_EVENT_OPTIONS={})
+	async def test_trade_event_stream(self):
+		response = await self.async_client.get('/trade-center/events/')
+		self.assertEqual(response['Content-Type'], 'text/event-stream')
+		chunks = response.streaming_content
+		self.assertEqual(await anext(chunks), b'retry: 5000\n\n')
+		waiting = asyncio.ensure_future(anext(chunks))
+		await asyncio.sleep(0.01)
+		get_event_broker().publish(self.user.pk, {'type': 'trade.created', 'trade': 1})
+		self.assertEqual(await waiting, b'event: trade.created\ndata: {"type": "trade.created", "trade": 1}\n\n')
+		# A disconnect cancels the request (EventStreamDisconnect), which unsubscribes
+		waiting = asyncio.ensure_future(anext(chunks))
+		await asyncio.sleep(0.01)
+		waiting.cancel()
+		with self.assertRaises(asyncio.CancelledError):
+			await waiting
+		self.assertEqual(get_event_broker().subscribed_users(), [])
+
+class TradeEventsTest(TestCase):
+	def setUp(self):
+		from django.core.cache import cache
+		cache.clear()
+
+	async def test_local_broker_delivers_from_other_threads(self):
+		broker = LocalMemoryEventBroker()
+		subscription = await broker.subscribe(1)
+		await sync_to_async(broker.publish, thread_sensitive=False)(1, {'type': 'trade.created'})
+		await sync_to_async(broker.publish, thread_sensitive=False)(2, {'type': 'trade.accepted'})
+		self.assertEqual(await subscription.get(timeout=1), {'type': 'trade.created'})
+		self.assertIsNone(await subscription.get(timeout=0.01))
+		subscription.close()
+		self.assertEqual(broker.subscribed_users(), [])
+
+	async def test_cache_broker_shares_events_between_workers(self):
+		publisher, streamer = CacheEventBroker(poll_interval=0.01), CacheEventBroker(poll_interval=0.01)
+		await sync_to_async(publisher.publish)(1, {'type': 'trade.created'})
+		subscription = await streamer.subscribe(1)
+		await sync_to_async(publisher.publish)(1, {'type': 'trade.accepted'})
+		# Only events published after subscribing are delivered
+		self.assertEqual(await subscription.get(timeout=1), {'type': 'trade.accepted'})
+		self.assertIsNone(await subscription.get(timeout=0.05))
+		subscription.close()
+
+	def test_settlement_publishes_after_commit(self):
+		User = get_user_model()
+		alice, bob, carol = (User.objects.create_user(username=name) for name in ('alice', 'bob', 'carol'))
+		dino = Dinosaur.objects.create(name='Wanted', species_name='Blue Egg', owner=bob)
+		trade = Trade.objects.create(
+			sender=alice, receiver=bob, sender_egg=Egg.objects.create(species_name='Green Egg', owner=alice),
+			receiver_dinosaur=dino,
+		)
+		rival = Trade.objects.create(
+			sender=carol, receiver=bob, sender_egg=Egg.objects.create(species_name='Orange Egg', owner=carol),
+			receiver_dinosaur=dino,
+		)
+		with mock.patch('core.events.get_event_broker') as get_broker:
+			with self.captureOnCommitCallbacks() as callbacks:
+				accept_trade(trade.id, bob)
+				self.assertFalse(get_broker.return_value.publish.called)
+			for callback in callbacks:
+				callback()
+		published = {(user_id, event['type'], event['trade']) for (user_id, event), _ in get_broker.return_value.publish.call_args_list}
+		self.assertEqual(published, {
+			(alice.pk, 'trade.accepted', trade.id), (bob.pk, 'trade.accepted', trade.id),
+			(carol.pk, 'trade.declined', rival.id), (bob.pk, 'trade.declined', rival.id),
+		})
+
+	async def test_disconnect_cancels_event_stream(self):
+		cancelled = asyncio.Event()
+
+		async def app(scope, receive, send):
+			await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/event-stream')]})
+			try:
+				await asyncio.Event().wait()
+			except asyncio.CancelledError:
+				cancelled.set()
+				raise
+
+		async def receive():
+			return {'type': 'http.disconnect'}
+
+		async def send(message):
+			pass
+
+		await asyncio.wait_for(EventStreamDisconnect(app)({'type': 'http'}, receive, send), 1)
+		self.assertTrue(cancelled.is_set())
+
+	def test_sync_profile_turns_streaming_off(self):
+		user = get_user_model().objects.create_user(username='wsgi_player')
+		self.client.force_login(user)
+		self.assertEqual(self.client.get('/trade-center/events/').status_code, 204)
+
+class SeedWorldTest(TestCase):
+	def seed(self, prefix, **options):
+		call_command('seed_world', users=8, seed=3, prefix=prefix, chunk_size=3, batch_size=7, stdout=StringIO(), **options)
+		dinos = Dinosaur.objects.filter(owner__username__startswith=f'{prefix}_').order_by('pk')
+		return [
+			(owner.removeprefix(prefix), *rest)
+			for owner, *rest in dinos.values_list('owner__username', 'name', 'stage', 'level', 'action_count', 'trait_unlock_count')
+		]
+
+	def test_world_follows_game_rules_and_is_reproducible(self):
+		# seed_world loads the trait fixture; forget it with the rolled-back rows
+		self.addCleanup(invalidate_catalog)
+		world = self.seed('w')
+		self.assertTrue(world)
+		out = StringIO()
+		call_command('rebuild_action_counters', stdout=out)
+		self.assertIn('(0 changed)', out.getvalue())
+		self.assertEqual(TraitUnlock.objects.count(), sum(row[-1] for row in world))
+		for trade in Trade.objects.filter(status='accepted'):
+			self.assertEqual((trade.sender_egg or trade.sender_dinosaur).owner_id, trade.receiver_id)
+		self.assertEqual(self.seed('v'), world)
+		with self.assertRaises(CommandError):
+			self.seed('w')
+
+class TemplateWarmupTest(TestCase):
+	def test_every_project_template_compiles(self):
+		names = list(project_templates())
+		self.assertIn('base.html', names)
+		self.assertIn('partials/action_items.html', names)
+		timings = warm_templates(names)
+		self.assertEqual([name for name, _, error in timings if error], [])
+
+	def test_command_reports_timings(self):
+		out = StringIO()
+		call_command('warm_templates', stdout=out)
+		self.assertIn('templates in', out.getvalue())
+
+class PerformanceChecksTest(TestCase):
+	def ids(self):
+		return {message.id for message in check_production_settings(None)}
+
+	def test_silent_outside_prod(self):
+		with override_settings(DEBUG=True):
+			self.assertEqual(self.ids(), set())
+
+	@override_settings(SETTINGS_PROFILE='prod', DEBUG=True)
+	def test_hostile_prod_settings_fail_startup(self):
+		# The test database has CONN_MAX_AGE = 0
+		self.assertTrue({'core.E001', 'core.E002'} <= self.ids())
+		# Warnings are logged rather than raised
+		with self.assertRaises(ImproperlyConfigured), self.assertLogs('core.checks', 'WARNING'):
+			enforce_performance_checks()
+
+	@override_settings(SETTINGS_PROFILE='prod')
+	def test_per_process_caches_fail_startup(self):
+		# The test caches are process-local memory
+		self.assertIn('core.E007', self.ids())
+		with self.assertRaises(ImproperlyConfigured), self.assertLogs('core.checks', 'WARNING'):
+			enforce_performance_checks()
+		shared = {alias: SHARED_CACHE.options['CACHES']['default'] for alias in ('default', 'fragments')}
+		with override_settings(CACHES=shared):
+			self.assertNotIn('core.E007', self.ids())
+
+	@override_settings(SETTINGS_PROFILE='prod')
+	def test_per_process_rate_limits_fail_startup(self):
+		# The test caches are process-local memory
+		self.assertIn('core.E006', self.ids())
+		with override_settings(RATE_LIMIT_BACKEND='core.ratelimit.LocalMemoryRateLimiter', RATE_LIMIT_OPTIONS={}):
+			self.assertIn('core.E006', self.ids())
+		# A file cache is shared, but its incr() is not atomic across processes
+		with SHARED_CACHE:
+			self.assertIn('core.E006', self.ids())
+			with override_settings(TRADE_EVENT_BACKEND='core.events.CacheEventBroker', TRADE_EVENT_OPTIONS={}):
+				self.assertIn('core.W007', self.ids())
+		with override_settings(CACHES=REDIS_CACHES):
+			self.assertNotIn('core.E006', self.ids())
+
+	@override_settings(SETTINGS_PROFILE='prod')
+	def test_sql_debug_logging_flagged(self):
+		logging_config = {'version': 1, 'loggers': {'django.db.backends': {'level': 'DEBUG'}}}
+		with override_settings(LOGGING=logging_config):
+			self.assertIn('core.E004', self.ids())
+
+class DatabaseConfigTest(TestCase):
+	def config(self, **env):
+		from genosaur_project.settings.base import database_config
+		env.setdefault('DATABASE_URL', 'postgres://u:p@localhost:5432/genosaur')
+		with mock.patch.dict(os.environ, env):
+			return database_config(conn_max_age='600', health_checks='true')
+
+	def test_profile_defaults(self):
+		config = self.config()
+		self.assertEqual((config['CONN_MAX_AGE'], config['CONN_HEALTH_CHECKS']), (600, True))
+		self.assertNotIn('DISABLE_SERVER_SIDE_CURSORS', config)
+
+	def test_env_overrides(self):
+		config = self.config(DB_CONN_MAX_AGE='none', DB_CONN_HEALTH_CHECKS='false')
+		self.assertEqual((config['CONN_MAX_AGE'], config['CONN_HEALTH_CHECKS']), (None, False))
+
+	def test_transaction_pooler_disables_server_side_cursors(self):
+		self.assertTrue(self.config(DB_POOLER='transaction')['DISABLE_SERVER_SIDE_CURSORS'])
+
+@PLAIN_STATIC
+class ActionHistoryTest(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='history_user', password='pass')
+		self.dino = Dinosaur.objects.create(name='Trike', species_name='Orange Egg', owner=self.user)
+		RaiseAction.objects.bulk_create([
+			RaiseAction(dinosaur=self.dino, action_type='train', outcome=f'train {i}') for i in range(45)
+		])
+
+	def test_keyset_pages_cover_history_once(self):
+		seen = []
+		cursor = None
+		while True:
+			actions, cursor = action_page(self.dino, cursor)
+			seen.extend(a.id for a in actions)
+			if cursor is None:
+				break
+		self.assertEqual(len(seen), 45)
+		self.assertEqual(len(set(seen)), 45)
+
+	def test_detail_caps_first_render(self):
+		self.client.force_login(self.user)
+		response = self.client.get(f'/dinosaur/{self.dino.id}/')
+		self.assertEqual(len(response.context['actions']), ACTION_PAGE_SIZE)
+		self.assertIsNotNone(response.context['next_cursor'])
+
+	def test_load_more_json(self):
+		self.client.force_login(self.user)
+		_, cursor = action_page(self.dino)
+		response = self.client.get(f'/dinosaur/{self.dino.id}/actions/', {'cursor': cursor, 'format': 'json'})
+		data = response.json()
+		self.assertEqual(len(data['actions']), ACTION_PAGE_SIZE)
+		self.assertIsNotNone(data['next_cursor'])
+
+@PLAIN_STATIC
+class TradeCenterQueryTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.alice = User.objects.create_user(username='alice', password='pass')
+		self.bob = User.objects.create_user(username='bob', password='pass')
+
+	def make_trades(self, count):
+		for i in range(count):
+			egg = Egg.objects.create(species_name='Green Egg', element_type='Earth', rarity='Common', owner=self.alice)
+			dino = Dinosaur.objects.create(name=f'Bob Dino {i}', species_name='Blue Egg', owner=self.bob)
+			Trade.objects.create(sender=self.alice, receiver=self.bob, sender_egg=egg, receiver_dinosaur=dino)
+
+	def count_queries(self, **params):
+		self.client.force_login(self.alice)
+		with CaptureQueriesContext(connection) as ctx:
+			response = self.client.get('/trade-center/', params)
+		self.assertEqual(response.status_code, 200)
+		return len(ctx.captured_queries)
+
+	def test_query_count_is_constant(self):
+		self.make_trades(1)
+		baseline = self.count_queries()
+		self.make_trades(9)
+		self.assertEqual(self.count_queries(), baseline)
+
+	def test_history_view_excludes_pending(self):
+		self.make_trades(2)
+		Trade.objects.filter(pk=Trade.objects.first().pk).update(status='accepted')
+		self.client.force_login(self.alice)
+		response = self.client.get('/trade-center/', {'view': 'history'})
+		self.assertEqual(len(response.context['trades']), 1)
+		self.assertEqual(response.context['trades'][0].status, 'accepted')
+
+class TradeSettlementTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.alice = User.objects.create_user(username='alice', password='pass')
+		self.bob = User.objects.create_user(username='bob', password='pass')
+		self.carol = User.objects.create_user(username='carol', password='pass')
+		self.bob_dino = Dinosaur.objects.create(name='Wanted', species_name='Blue Egg', owner=self.bob)
+		self.alice_egg = Egg.objects.create(species_name='Green Egg', element_type='Earth', rarity='Common', owner=self.alice)
+		self.carol_egg = Egg.objects.create(species_name='Orange Egg', element_type='Fire', rarity='Common', owner=self.carol)
+		self.trade = Trade.objects.create(sender=self.alice, receiver=self.bob, sender_egg=self.alice_egg, receiver_dinosaur=self.bob_dino)
+		self.rival = Trade.objects.create(sender=self.carol, receiver=self.bob, sender_egg=self.carol_egg, receiver_dinosaur=self.bob_dino)
+
+	def test_accept_swaps_owners_and_declines_competing_trades(self):
+		accept_trade(self.trade.id, self.bob)
+		self.bob_dino.refresh_from_db()
+		self.alice_egg.refresh_from_db()
+		self.rival.refresh_from_db()
+		self.assertEqual(self.bob_dino.owner, self.alice)
+		self.assertEqual(self.alice_egg.owner, self.bob)
+		self.assertEqual(self.rival.status, 'declined')
+		with self.assertRaises(TradeError):
+			accept_trade(self.rival.id, self.bob)
+
+	def test_cancel_cannot_undo_accepted_trade(self):
+		accept_trade(self.trade.id, self.bob)
+		with self.assertRaises(TradeError):
+			cancel_trade(self.trade.id, self.alice)
+		self.trade.refresh_from_db()
+		self.assertEqual(self.trade.status, 'accepted')
+
+	def test_accept_declines_when_item_changed_hands(self):
+		Egg.objects.filter(pk=self.alice_egg.pk).update(owner=self.carol)
+		with self.assertRaises(TradeError):
+			accept_trade(self.trade.id, self.bob)
+		self.trade.refresh_from_db()
+		self.assertEqual(self.trade.status, 'declined')
+		self.bob_dino.refresh_from_db()
+		self.assertEqual(self.bob_dino.owner, self.bob)
+
+@PLAIN_STATIC
+class TradeFormLookupTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.alice = User.objects.create_user(username='alice', password='pass')
+		self.bob = User.objects.create_user(username='bob', password='pass')
+		User.objects.create_user(username='bobby', password='pass')
+		User.objects.create_user(username='carol', password='pass')
+		self.bob_dino = Dinosaur.objects.create(name='Spike', species_name='Blue Egg', owner=self.bob)
+		self.alice_egg = Egg.objects.create(species_name='Green Egg', element_type='Earth', rarity='Common', owner=self.alice)
+		self.client.force_login(self.alice)
+
+	def test_receiver_search_is_prefix_match(self):
+		response = self.client.get('/trade-center/receivers/', {'q': 'bo'})
+		self.assertEqual(response.json()['usernames'], ['bob', 'bobby'])
+		response = self.client.get('/trade-center/receivers/', {'q': 'al'})
+		self.assertEqual(response.json()['usernames'], [])
+
+	def test_receiver_items(self):
+		data = self.client.get('/trade-center/receiver-items/', {'receiver': 'bob'}).json()
+		self.assertEqual([d['id'] for d in data['dinosaurs']], [self.bob_dino.id])
+		self.assertEqual(data['eggs'], [])
+
+	def test_page_does_not_list_other_players(self):
+		response = self.client.get('/trade-center/')
+		self.assertNotContains(response, 'carol')
+		self.assertNotContains(response, 'Spike')
+
+	def test_offer_by_username(self):
+		response = self.client.post('/trade-center/', {
+			'receiver': 'bob',
+			'sender_egg': self.alice_egg.id,
+			'receiver_dinosaur': self.bob_dino.id,
+		})
+		self.assertEqual(response.status_code, 302)
+		trade = Trade.objects.get()
+		self.assertEqual(trade.receiver, self.bob)
+		self.assertEqual(trade.receiver_dinosaur, self.bob_dino)
+
+class BulkEggActionTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username='nester', password='pass')
+		self.other = User.objects.create_user(username='other', password='pass')
+		self.eggs = [
+			Egg.objects.create(species_name='Green Egg', element_type='Earth', rarity='Common', owner=self.user)
+			for _ in range(20)
+		]
+		self.foreign_egg = Egg.objects.create(species_name='Blue Egg', element_type='Water', rarity='Common', owner=self.other)
+
+	def test_search_updates_materials_in_bulk(self):
+		ids = [egg.id for egg in self.eggs] + [self.foreign_egg.id]
+		with self.assertNumQueries(4):
+			results = apply_bulk_egg_action(self.user, ids, 'search_wilderness', rng=np.random.default_rng(7))
+		self.assertEqual(len(results), 20)
+		found = sum(1 for r in results if r['result'] in ('twig', 'leaf'))
+		stored = sum(e.twigs + e.leaves for e in Egg.objects.filter(owner=self.user))
+		self.assertEqual(found, stored)
+		self.foreign_egg.refresh_from_db()
+		self.assertEqual(self.foreign_egg.twigs + self.foreign_egg.leaves, 0)
+
+	def test_materials_are_capped(self):
+		Egg.objects.filter(owner=self.user).update(twigs=5, leaves=5)
+		results = apply_bulk_egg_action(self.user, [e.id for e in self.eggs], 'search_wilderness')
+		self.assertTrue(all(r['result'] == 'nothing' and r['ready_to_hatch'] for r in results))
+
+	def test_endpoint_rejects_unknown_action(self):
+		self.client.force_login(self.user)
+		with self.assertLogs('django.request', 'WARNING'):
+			response = self.client.post('/active-nests/bulk/', {'action': 'smash', 'egg_ids': [self.eggs[0].id]})
+		self.assertEqual(response.status_code, 400)
+		response = self.client.post('/active-nests/bulk/', {'action': 'sing_egg', 'egg_ids': [self.eggs[0].id]})
+		self.assertIn(response.json()['results'][0]['result'], ('glow', 'sang'))
+
+class RateLimiterTest(TestCase):
+	def setUp(self):
+		from django.core.cache import cache
+		cache.clear()
+
+	def check_backend(self, limiter):
+		results = [limiter.hit('user:1', 3, 60) for _ in range(4)]
+		self.assertEqual([r.allowed for r in results], [True, True, True, False])
+		self.assertEqual(results[-1].remaining, 0)
+		self.assertGreater(results[-1].retry_after, 0)
+		self.assertFalse(limiter.peek('user:1', 3, 60).allowed)
+		self.assertTrue(limiter.peek('user:2', 3, 60).allowed)
+
+	def test_local_memory_backend(self):
+		self.check_backend(LocalMemoryRateLimiter())
+
+	def test_cache_backend(self):
+		self.check_backend(CacheRateLimiter())
+
+	def test_cost_over_limit_is_rejected(self):
+		limiter = LocalMemoryRateLimiter()
+		self.assertFalse(limiter.hit('user:1', 3, 60, cost=4).allowed)
+		self.assertTrue(limiter.hit('user:1', 3, 60, cost=3).allowed)
+
+@PLAIN_STATIC
+@override_settings(RATE_LIMIT_BACKEND='core.ratelimit.LocalMemoryRateLimiter', RATE_LIMIT_OPTIONS={})
+class WildernessLimitTest(TestCase):
+	def test_searches_are_limited_per_user(self):
+		user = get_user_model().objects.create_user(username='explorer', password='pass')
+		self.client.force_login(user)
+		for _ in range(5):
+			self.client.post('/wilderness/')
+		response = self.client.post('/wilderness/')
+		self.assertFalse(response.context['can_search'])
+		self.assertContains(response, 'search limit')
+		self.assertNotIn('wilderness_searches', self.client.session)
+
+@PLAIN_STATIC
+class FragmentCacheTest(TestCase):
+	def setUp(self):
+		from django.core.cache import caches
+		caches['default'].clear()
+		caches['fragments'].clear()
+		reset_cache_stats()
+		self.user = get_user_model().objects.create_user(username='cached', password='pass')
+		self.dino = Dinosaur.objects.create(name='Cachey', species_name='Green Egg', owner=self.user)
+		self.client.force_login(self.user)
+
+	def dino_queries(self):
+		with CaptureQueriesContext(connection) as ctx:
+			response = self.client.get('/your-dinosaurs/')
+		return response, [q for q in ctx.captured_queries if 'core_dinosaur' in q['sql']]
+
+	def test_repeat_visit_skips_dinosaur_query(self):
+		_, first = self.dino_queries()
+		response, second = self.dino_queries()
+		self.assertEqual(len(first), 1)
+		self.assertEqual(second, [])
+		self.assertContains(response, 'Cachey')
+		self.assertEqual(cache_stats()['genosaur-fragments']['hits'], 1)
+
+	def test_writes_invalidate_fragment(self):
+		self.dino_queries()
+		version = collection_version(self.user)
+		with self.captureOnCommitCallbacks(execute=True):
+			RaiseAction.objects.create(dinosaur=self.dino, action_type='play', outcome='fun')
+			# still uncommitted, so readers must keep the old version
+			self.assertEqual(collection_version(self.user), version)
+		self.assertNotEqual(collection_version(self.user), version)
+		self.dino.name = 'Renamed'
+		with self.captureOnCommitCallbacks(execute=True):
+			self.dino.save()
+		response, queries = self.dino_queries()
+		self.assertEqual(len(queries), 1)
+		self.assertContains(response, 'Renamed')
+
+	def test_redis_backends_load(self):
+		from django.core.cache import caches
+		# The redis package is only imported on first use
+		with override_settings(CACHES=REDIS_CACHES):
+			for alias in REDIS_CACHES:
+				self.assertEqual(caches[alias]._cache._lib.__name__, 'redis')
+
+	def test_accepted_trade_invalidates_both_players(self):
+		bob = get_user_model().objects.create_user(username='bob', password='pass')
+		egg = Egg.objects.create(species_name='Blue Egg', element_type='Water', rarity='Common', owner=bob)
+		trade = Trade.objects.create(sender=bob, receiver=self.user, sender_egg=egg, receiver_dinosaur=self.dino)
+		before = (collection_version(self.user), collection_version(bob))
+		with self.captureOnCommitCallbacks(execute=True):
+			accept_trade(trade.id, self.user)
+		self.assertNotEqual(collection_version(self.user), before[0])
+		self.assertNotEqual(collection_version(bob), before[1])
+
+class QueryPlanAuditTest(TestCase):
+	def test_canonical_queries_use_indexes(self):
+		user = get_user_model().objects.create_user(username='auditor', password='pass')
+		Dinosaur.objects.create(name='Indexed', species_name='Green Egg', owner=user)
+		out = StringIO()
+		call_command('audit_query_plans', '--fail-on-seqscan', stdout=out)
+		self.assertIn('0 of', out.getvalue())
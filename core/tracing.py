@@ -0,0 +1,132 @@
+"""Sampled per-request tracing.
+
+RequestTraceMiddleware records view name, timing, query count and response
+size for a sample of requests into an in-memory ring buffer, which staff can
+read at /admin/request-traces/. Nothing is written to stdout on the request
+path; the trace line goes through the 'core.trace' logger, which settings
+route through a QueueHandler so the worker never blocks on the write.
+"""
+import atexit
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('core.trace')
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def trace_buffer():
+    """Return the process-wide ring buffer, creating it on first use."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = deque(maxlen=getattr(settings, 'REQUEST_TRACE_BUFFER_SIZE', 500))
+    return _buffer
+
+
+def recent_traces():
+    """Return a snapshot of the buffered traces, newest first."""
+    return list(reversed(trace_buffer()))
+
+
+def clear_traces():
+    trace_buffer().clear()
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook that counts queries (works with DEBUG off)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class RequestTraceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_TRACE_SAMPLE_RATE', 0.1)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        self.record(request, response, counter, start)
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        counter = QueryCounter()
+        start = time.perf_counter()
+        # The async ORM runs queries in a worker thread, on this same
+        # context's connection, so the wrapper still sees them.
+        with connection.execute_wrapper(counter):
+            response = await self.get_response(request)
+        self.record(request, response, counter, start)
+        return response
+
+    def record(self, request, response, counter, start):
+        duration_ms = (time.perf_counter() - start) * 1000
+        match = getattr(request, 'resolver_match', None)
+        trace = {
+            'time': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else '',
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'queries': counter.count,
+            'response_bytes': None if response.streaming else len(response.content),
+        }
+        trace_buffer().append(trace)
+        logger.debug(
+            "%(method)s %(path)s view=%(view)s status=%(status)s "
+            "%(duration_ms).2fms queries=%(queries)s bytes=%(response_bytes)s",
+            trace,
+        )
+
+
+def start_queue_listeners():
+    """Start the QueueListener behind every configured QueueHandler.
+
+    dictConfig builds the listener for a ``logging.handlers.QueueHandler``
+    entry but leaves starting it to the application.
+    """
+    loggers = [logging.getLogger()] + [
+        logging.getLogger(name) for name in logging.root.manager.loggerDict
+    ]
+    seen = set()
+    for log in loggers:
+        for handler in getattr(log, 'handlers', []):
+            listener = getattr(handler, 'listener', None)
+            if listener is None or id(listener) in seen:
+                continue
+            seen.add(id(listener))
+            if getattr(listener, '_thread', None) is None:
+                listener.start()
+                atexit.register(listener.stop)
@@ -0,0 +1,96 @@
+"""Trade settlement.
+
+Accepting or cancelling a trade runs in one transaction. Rows are locked in a
+fixed order (the trade, then eggs by id, then dinosaurs by id) so concurrent
+accepts that touch the same items queue up rather than deadlock, and
+ownership is swapped with queryset update() calls instead of full-row saves.
+Both players of every settled trade get a trade event (core.events) once the
+transaction commits.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from .caching import bump_collection_version
+from .events import TRADE_ACCEPTED, TRADE_DECLINED, publish_trade_event
+from .models import Dinosaur, Egg, Trade
+
+
+class TradeError(Exception):
+    """The trade cannot be settled; the message is safe to show the player."""
+
+
+def _lock_items(model, ids):
+    return {obj.pk: obj for obj in model.objects.select_for_update().filter(pk__in=sorted(ids)).order_by('pk')}
+
+
+def accept_trade(trade_id, user):
+    """Accept a pending trade addressed to ``user`` and swap the items.
+
+    Any other pending trade that offers or asks for one of the swapped items
+    is declined in the same transaction. Raises TradeError if the trade is no
+    longer pending or one of its items has changed hands.
+    """
+    with transaction.atomic():
+        trade = (
+            Trade.objects.select_for_update()
+            .filter(id=trade_id, receiver=user, status='pending')
+            .first()
+        )
+        if trade is None:
+            raise TradeError('This trade is no longer pending.')
+
+        affected = {trade.sender_id, trade.receiver_id}
+        egg_ids = {pk for pk in (trade.sender_egg_id, trade.receiver_egg_id) if pk}
+        dino_ids = {pk for pk in (trade.sender_dinosaur_id, trade.receiver_dinosaur_id) if pk}
+        eggs = _lock_items(Egg, egg_ids)
+        dinos = _lock_items(Dinosaur, dino_ids)
+
+        # (model, locked rows, item id, expected owner id, new owner id)
+        transfers = [
+            (Egg, eggs, trade.sender_egg_id, trade.sender_id, trade.receiver_id),
+            (Dinosaur, dinos, trade.sender_dinosaur_id, trade.sender_id, trade.receiver_id),
+            (Egg, eggs, trade.receiver_egg_id, trade.receiver_id, trade.sender_id),
+            (Dinosaur, dinos, trade.receiver_dinosaur_id, trade.receiver_id, trade.sender_id),
+        ]
+        transfers = [t for t in transfers if t[2]]
+        available = (
+            [t[3] for t in transfers] == [trade.sender_id, trade.receiver_id]
+            and all(item_id in rows and rows[item_id].owner_id == owner_id
+                    for _, rows, item_id, owner_id, _ in transfers)
+        )
+        if not available:
+            Trade.objects.filter(pk=trade.pk).update(status='declined')
+            publish_trade_event(TRADE_DECLINED, trade.pk, trade.sender_id, trade.receiver_id)
+        else:
+            for model, _, item_id, _, new_owner_id in transfers:
+                model.objects.filter(pk=item_id).update(owner_id=new_owner_id)
+            Trade.objects.filter(pk=trade.pk).update(status='accepted')
+            publish_trade_event(TRADE_ACCEPTED, trade.pk, trade.sender_id, trade.receiver_id)
+            competing = Trade.objects.filter(status='pending').exclude(pk=trade.pk).filter(
+                Q(sender_egg__in=egg_ids) | Q(receiver_egg__in=egg_ids)
+                | Q(sender_dinosaur__in=dino_ids) | Q(receiver_dinosaur__in=dino_ids)
+            )
+            for competing_id, sender_id, receiver_id in competing.values_list('id', 'sender_id', 'receiver_id'):
+                affected.update((sender_id, receiver_id))
+                publish_trade_event(TRADE_DECLINED, competing_id, sender_id, receiver_id)
+            competing.update(status='declined')
+    # update() skips model signals, so invalidate the players' caches here
+    bump_collection_version(*affected)
+    if not available:
+        raise TradeError('One of the traded items is no longer available, so the trade was declined.')
+    trade.status = 'accepted'
+    return trade
+
+
+def cancel_trade(trade_id, user):
+    """Decline a pending trade sent by ``user``.
+
+    A single conditional UPDATE, so it cannot undo a trade that an
+    accept_trade call has already settled.
+    """
+    trades = Trade.objects.filter(id=trade_id, sender=user, status='pending')
+    receiver_id = trades.values_list('receiver_id', flat=True).first()
+    if not trades.update(status='declined'):
+        raise TradeError('This trade is no longer pending.')
+    publish_trade_event(TRADE_DECLINED, trade_id, user.pk, receiver_id)
+    bump_collection_version(user.pk, receiver_id)
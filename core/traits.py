@@ -0,0 +1,94 @@
+"""Process-local catalog of every Trait, for picking trait unlocks in memory.
+
+The catalog is loaded once per process into parallel arrays (ids, names,
+descriptions) with an id -> position index, so perform_action can choose a
+trait the dinosaur lacks without re-reading the whole Trait table on every
+unlock. Trait save/delete signals (core.signals) call ``invalidate_catalog``,
+which drops this process's copy and bumps a version token in the ``default``
+cache so other workers reload on their next lookup.
+"""
+import random
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from django.core.cache import caches
+
+from .models import Trait
+
+CATALOG_VERSION_KEY = 'traits:catalog:v'
+# Rejection-sampling attempts before falling back to a linear scan
+MAX_DRAWS = 8
+
+CatalogTrait = namedtuple('CatalogTrait', ['id', 'name', 'description'])
+
+
+class TraitCatalog:
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.ids = array('q')
+        names = []
+        descriptions = []
+        for pk, name, description in rows:
+            self.ids.append(pk)
+            names.append(name)
+            descriptions.append(description)
+        self.names = tuple(names)
+        self.descriptions = tuple(descriptions)
+        self.index = {pk: i for i, pk in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _entry(self, i):
+        return CatalogTrait(self.ids[i], self.names[i], self.descriptions[i])
+
+    def get(self, trait_id):
+        i = self.index.get(trait_id)
+        return None if i is None else self._entry(i)
+
+    def random_missing(self, owned_ids, rng=random):
+        """Return a random trait whose id is not in ``owned_ids``, or None."""
+        n = len(self.ids)
+        owned = set(owned_ids)
+        if not n:
+            return None
+        # A dinosaur owns at most a handful of traits, so a random draw
+        # almost always misses them; only tiny catalogs reach the scan.
+        if len(owned) * 2 < n:
+            for _ in range(MAX_DRAWS):
+                i = rng.randrange(n)
+                if self.ids[i] not in owned:
+                    return self._entry(i)
+        candidates = [i for i, pk in enumerate(self.ids) if pk not in owned]
+        return self._entry(rng.choice(candidates)) if candidates else None
+
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def _shared_version():
+    return caches['default'].get(CATALOG_VERSION_KEY)
+
+
+def get_catalog():
+    """Return this process's catalog, reloading it if another worker changed Traits."""
+    global _catalog
+    version = _shared_version()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _lock:
+            if _catalog is None or _catalog.version != version:
+                rows = Trait.objects.order_by('pk').values_list('pk', 'name', 'description')
+                _catalog = TraitCatalog(rows, version)
+            catalog = _catalog
+    return catalog
+
+
+def invalidate_catalog():
+    global _catalog
+    with _lock:
+        _catalog = None
+    caches['default'].set(CATALOG_VERSION_KEY, f"{time.time_ns():x}", timeout=None)
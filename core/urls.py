@@ -1,22 +1,40 @@
-from . import views
+from . import api, async_views, views
+from django.conf import settings
 from django.urls import path
 
-urlpatterns = [
-    path('trade-center/cancel/<int:trade_id>/', views.cancel_trade, name='cancel_trade'),
-    path('', views.landing, name='landing'),
-    path('dashboard/', views.dashboard, name='dashboard'),
-    path('wilderness/', views.wilderness, name='wilderness'),
-    path('hatch/<int:egg_id>/', views.hatch_egg, name='hatch_egg'),
-    path('dinosaur/<int:dino_id>/', views.dinosaur_detail, name='dinosaur_detail'),
-    path('dinosaur/<int:dino_id>/action/', views.perform_action, name='perform_action'),
-    path('register/', views.register, name='register'),
-    path('login/', views.login_view, name='login'),
-    path('logout/', views.logout_view, name='logout'),
-    path('claim-egg/', views.claim_egg, name='claim_egg'),
-    path('active-nests/', views.active_nests, name='active_nests'),
-    path('egg/<int:egg_id>/', views.egg_detail, name='egg_detail'),
-    path('hatching/<int:egg_id>/', views.hatching_page, name='hatching_page'),
-    path('your-dinosaurs/', views.your_dinosaurs, name='your_dinosaurs'),
-    path('trade-center/', views.trade_center, name='trade_center'),
-    path('trade-center/accept/<int:trade_id>/', views.accept_trade, name='accept_trade'),
-]
+
+def core_patterns(read_views):
+    """URL patterns with the read-only pages and the trade event stream taken
+    from ``read_views`` (views or async_views)."""
+    return [
+        path('trade-center/cancel/<int:trade_id>/', views.cancel_trade, name='cancel_trade'),
+        path('', views.landing, name='landing'),
+        path('dashboard/', read_views.dashboard, name='dashboard'),
+        path('wilderness/', views.wilderness, name='wilderness'),
+        path('hatch/<int:egg_id>/', views.hatch_egg, name='hatch_egg'),
+        path('dinosaur/<int:dino_id>/', views.dinosaur_detail, name='dinosaur_detail'),
+        path('dinosaur/<int:dino_id>/action/', views.perform_action, name='perform_action'),
+        path('dinosaur/<int:dino_id>/session/', views.raise_session, name='raise_session'),
+        path('dinosaur/<int:dino_id>/actions/', views.dinosaur_actions, name='dinosaur_actions'),
+        path('api/dinosaurs/<int:dino_id>/', api.dinosaur_state_view, name='api_dinosaur_state'),
+        path('api/dinosaurs/<int:dino_id>/actions/', api.dinosaur_action_view, name='api_dinosaur_action'),
+        path('api/eggs/<int:egg_id>/', api.egg_state_view, name='api_egg_state'),
+        path('api/eggs/<int:egg_id>/actions/', api.egg_action_view, name='api_egg_action'),
+        path('register/', views.register, name='register'),
+        path('login/', views.login_view, name='login'),
+        path('logout/', views.logout_view, name='logout'),
+        path('claim-egg/', views.claim_egg, name='claim_egg'),
+        path('active-nests/', read_views.active_nests, name='active_nests'),
+        path('active-nests/bulk/', views.bulk_egg_action, name='bulk_egg_action'),
+        path('egg/<int:egg_id>/', views.egg_detail, name='egg_detail'),
+        path('hatching/<int:egg_id>/', views.hatching_page, name='hatching_page'),
+        path('your-dinosaurs/', read_views.your_dinosaurs, name='your_dinosaurs'),
+        path('trade-center/', read_views.trade_center, name='trade_center'),
+        path('trade-center/events/', read_views.trade_events, name='trade_events'),
+        path('trade-center/receivers/', views.trade_receiver_search, name='trade_receiver_search'),
+        path('trade-center/receiver-items/', views.trade_receiver_items, name='trade_receiver_items'),
+        path('trade-center/accept/<int:trade_id>/', views.accept_trade, name='accept_trade'),
+    ]
+
+
+urlpatterns = core_patterns(async_views if settings.ASYNC_VIEWS else views)
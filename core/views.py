@@ -1,17 +1,49 @@
 from django.contrib.auth.decorators import login_required
 @login_required
 def cancel_trade(request, trade_id):
-    trade = get_object_or_404(Trade, id=trade_id, sender=request.user, status='pending')
-    trade.status = 'declined'
-    trade.save()
-    messages.success(request, 'Trade offer cancelled.')
+    try:
+        trade_settlement.cancel_trade(trade_id, request.user)
+    except trade_settlement.TradeError as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, 'Trade offer cancelled.')
     return redirect('trade_center')
-from .models import Trade
+from .models import Trade, Egg, Dinosaur
+from . import trades as trade_settlement
+from .events import TRADE_CREATED, publish_trade_event
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, JsonResponse
 from django.db.models import Q
+from django.core.paginator import Paginator
 from django import forms
 from django.core.exceptions import ValidationError
 
+RECEIVER_SEARCH_LIMIT = 10
+
+
+def find_usernames(prefix, exclude_user=None, limit=RECEIVER_SEARCH_LIMIT):
+    """Usernames starting with ``prefix``, case-sensitively.
+
+    The range bounds let the database walk the unique username index; the
+    startswith filter then keeps only exact prefix matches.
+    """
+    User = get_user_model()
+    users = User.objects.filter(
+        username__gte=prefix, username__lt=prefix + '\U0010ffff', username__startswith=prefix
+    )
+    if exclude_user is not None:
+        users = users.exclude(pk=exclude_user.pk)
+    return list(users.order_by('username').values_list('username', flat=True)[:limit])
+
+
 class TradeForm(forms.ModelForm):
+    # Entered by username (with autocomplete) so the page never renders an
+    # <option> per user; the queryset is only hit to resolve the one name.
+    receiver = forms.ModelChoiceField(
+        queryset=get_user_model().objects.all(),
+        to_field_name='username',
+        widget=forms.TextInput(attrs={'list': 'receiverOptions', 'autocomplete': 'off'}),
+    )
 
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
@@ -19,20 +51,21 @@ class TradeForm(forms.ModelForm):
         if user:
             self.fields['sender_egg'].queryset = user.eggs.all()
             self.fields['sender_dinosaur'].queryset = user.dinosaurs.all()
-        # Dynamically filter receiver's items if receiver is selected
+            self.fields['receiver'].queryset = get_user_model().objects.exclude(pk=user.pk)
+        # Receiver item pickers start empty and are filled from
+        # trade_receiver_items; on POST they are narrowed to the named receiver.
         receiver = None
         if self.data.get('receiver'):
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            try:
-                receiver = User.objects.get(pk=self.data.get('receiver'))
-            except (User.DoesNotExist, ValueError, TypeError):
-                receiver = None
+            receiver = self.fields['receiver'].queryset.filter(username=self.data.get('receiver')).first()
         elif self.initial.get('receiver'):
             receiver = self.initial.get('receiver')
         if receiver:
             self.fields['receiver_egg'].queryset = receiver.eggs.all()
             self.fields['receiver_dinosaur'].queryset = receiver.dinosaurs.all()
+        else:
+            self.fields['receiver_egg'].queryset = Egg.objects.none()
+            self.fields['receiver_dinosaur'].queryset = Dinosaur.objects.none()
+
     class Meta:
         model = Trade
         fields = ['receiver', 'sender_egg', 'sender_dinosaur', 'receiver_egg', 'receiver_dinosaur']
@@ -47,10 +80,22 @@ class TradeForm(forms.ModelForm):
             raise ValidationError('You must request exactly one item (egg or dinosaur) in return.')
         return cleaned_data
 
+TRADES_PER_PAGE = 20
+TRADE_RELATED_FIELDS = ('sender', 'receiver', 'sender_egg', 'sender_dinosaur', 'receiver_egg', 'receiver_dinosaur')
+
+
+def user_trades(user, pending=True):
+    """Trades the user sent or received, with every row the list renders joined in."""
+    trades = Trade.objects.filter(Q(sender=user) | Q(receiver=user)).select_related(*TRADE_RELATED_FIELDS)
+    if pending:
+        trades = trades.filter(status='pending')
+    else:
+        trades = trades.exclude(status='pending')
+    return trades.order_by('-created_at', '-id')
+
+
 @login_required
 def trade_center(request):
-    # Show all pending trades involving the user
-    trades = Trade.objects.filter(Q(sender=request.user) | Q(receiver=request.user)).order_by('-created_at')
     form = TradeForm(user=request.user)
     if request.method == 'POST':
         form = TradeForm(request.POST, user=request.user)
@@ -59,29 +104,58 @@ def trade_center(request):
             trade.sender = request.user
             trade.status = 'pending'
             trade.save()
+            publish_trade_event(TRADE_CREATED, trade.pk, trade.sender_id, trade.receiver_id)
             messages.success(request, 'Trade offer submitted!')
             return redirect('trade_center')
-    return render(request, 'trade_center.html', {'form': form, 'trades': trades, 'user': request.user})
+    # Pending offers by default; ?view=history lists accepted/declined trades
+    trade_view = 'history' if request.GET.get('view') == 'history' else 'pending'
+    trades = user_trades(request.user, pending=trade_view == 'pending')
+    page_obj = Paginator(trades, TRADES_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'trade_center.html', {
+        'form': form,
+        'trades': page_obj,
+        'page_obj': page_obj,
+        'trade_view': trade_view,
+        'user': request.user,
+    })
+
+@login_required
+def trade_events(request):
+    """Trade events are streamed by async_views.trade_events under ASGI.
+
+    A worker thread per open stream is too costly, so tell EventSource
+    clients to stop reconnecting (204 No Content).
+    """
+    return HttpResponse(status=204)
+
+@login_required
+def trade_receiver_search(request):
+    """Autocomplete for the trade form's receiver field."""
+    prefix = request.GET.get('q', '').strip()
+    usernames = find_usernames(prefix, exclude_user=request.user) if prefix else []
+    return JsonResponse({'usernames': usernames})
+
+@login_required
+def trade_receiver_items(request):
+    """Eggs and dinosaurs the named receiver can be asked for, as picker options."""
+    receiver = get_user_model().objects.filter(username=request.GET.get('receiver', '')).first()
+    if receiver is None or receiver == request.user:
+        return JsonResponse({'eggs': [], 'dinosaurs': []})
+    eggs = receiver.eggs.only('id', 'species_name', 'rarity').order_by('id')
+    dinosaurs = receiver.dinosaurs.only('id', 'name', 'stage', 'mood').order_by('id')
+    return JsonResponse({
+        'eggs': [{'id': egg.id, 'label': str(egg)} for egg in eggs],
+        'dinosaurs': [{'id': dino.id, 'label': str(dino)} for dino in dinosaurs],
+    })
 
 @login_required
 def accept_trade(request, trade_id):
-    trade = get_object_or_404(Trade, id=trade_id, receiver=request.user, status='pending')
-    # Swap ownership of items
-    if trade.sender_egg:
-        trade.sender_egg.owner = trade.receiver
-        trade.sender_egg.save()
-    if trade.sender_dinosaur:
-        trade.sender_dinosaur.owner = trade.receiver
-        trade.sender_dinosaur.save()
-    if trade.receiver_egg:
-        trade.receiver_egg.owner = trade.sender
-        trade.receiver_egg.save()
-    if trade.receiver_dinosaur:
-        trade.receiver_dinosaur.owner = trade.sender
-        trade.receiver_dinosaur.save()
-    trade.status = 'accepted'
-    trade.save()
-    messages.success(request, 'Trade accepted and items swapped!')
+    try:
+        trade_settlement.accept_trade(trade_id, request.user)
+    except trade_settlement.TradeError as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, 'Trade accepted and items swapped!')
     return redirect('trade_center')
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import logout as auth_logout, login as auth_login
@@ -89,14 +163,23 @@ from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.utils.crypto import get_random_string
 from django.contrib import messages  # for toast notifications
 from django.views.decorators.csrf import csrf_protect
-from .models import Egg, Dinosaur, RaiseAction, Trait
+from .models import Egg, Dinosaur, RaiseAction
+from .sprites import species_key_for, sprite_path
+from .history import ACTION_PAGE_SIZE, action_page
+from .nests import EGG_ACTIONS, MAX_BULK_EGGS, apply_bulk_egg_action
+from .ratelimit import check_rate, peek_rate
+from .caching import cached_for_user, collection_version
+from .conditional import collection_condition
+from .actions import MAX_SESSION_ACTIONS, SESSION_ACTIONS, dinosaur_progress, run_action, run_session
+from django.conf import settings
+from django.views.decorators.http import require_POST
+from django.http import JsonResponse
 import logging
 from django.contrib.auth.decorators import login_required
 
 
+@login_required
 def wilderness(request):
-    from django.utils import timezone
-    from datetime import timedelta
     import random
     messages_list = [
         "You saw some dinosaurs but got scared and hid until it was clear.",
@@ -106,17 +189,13 @@ def wilderness(request):
         "You explored quietly, but the wilderness was empty this time."
     ]
     user = request.user
-    now = timezone.now()
-    # Store wilderness search timestamps in session
-    searches = request.session.get('wilderness_searches', [])
-    # Remove searches older than 24 hours
-    searches = [ts for ts in searches if timezone.datetime.fromisoformat(ts) > now - timedelta(hours=24)]
-    can_search = len(searches) < 5
     found_egg = None
     message = None
+    if request.method == "POST":
+        can_search = check_rate('wilderness_search', user).allowed
+    else:
+        can_search = peek_rate('wilderness_search', user).allowed
     if request.method == "POST" and can_search:
-        searches.append(now.isoformat())
-        request.session['wilderness_searches'] = searches
         if random.random() < 0.25:
             egg_color = random.choice(['green', 'orange', 'blue'])
             egg_data = {
@@ -136,13 +215,9 @@ def wilderness(request):
             message = random.choice(messages_list)
     elif request.method == "POST" and not can_search:
         message = "You have reached your search limit for today. Please come back in 24 hours."
-    print("DEBUG wilderness view:", {
-        "can_search": can_search,
-        "message": message,
-        "found_egg": found_egg,
-        "searches": searches,
-        "user": user.username if user.is_authenticated else None
-    })
+    if request.method == "POST" and can_search:
+        # Refresh the button state now that this search has been counted
+        can_search = peek_rate('wilderness_search', user).allowed
     return render(request, "wilderness.html", {"can_search": can_search, "message": message, "found_egg": found_egg})
 
 def create_dinosaur_from_egg(egg):
@@ -159,67 +234,33 @@ def create_dinosaur_from_egg(egg):
     return egg.dinosaur
 
 @login_required
+@collection_condition()
 def your_dinosaurs(request):
+    # Lazy: only queried when the cached card fragment has to be re-rendered
     dinosaurs = Dinosaur.objects.filter(owner=request.user)
-    print(f"DEBUG: Found {dinosaurs.count()} dinosaurs for user {request.user}")
-    for dino in dinosaurs:
-        raw_species = dino.species_name
-        species = raw_species.strip().lower().replace('_', ' ').replace('-', ' ')
-        is_green_egg = 'green egg' in species
-        is_orange_egg = 'orange egg' in species
-        is_blue_egg = 'blue egg' in species
-        print(f"DEBUG: {dino.name} RAW species_name='{raw_species}' PROCESSED species='{species}' is_green_egg={is_green_egg} is_orange_egg={is_orange_egg} is_blue_egg={is_blue_egg} stage='{dino.stage}'")
-        # Treat any non-adult stage as 'juvenile' for image purposes
-        if dino.stage == 'adult':
-            if is_green_egg:
-                dino.image_path = "images/adult_dinos/green_rex_adult.png"
-                print(f"DEBUG: {dino.name} assigned adult GREEN image")
-            elif is_orange_egg:
-                dino.image_path = "images/adult_dinos/orange_trike_adult.png"
-                print(f"DEBUG: {dino.name} assigned adult ORANGE image")
-            elif is_blue_egg:
-                dino.image_path = "images/adult_dinos/blue_spino_adult.png"
-                print(f"DEBUG: {dino.name} assigned adult BLUE image")
-            else:
-                dino.image_path = "images/adult_dinos/green_rex_adult.png"
-                print(f"DEBUG: {dino.name} assigned adult DEFAULT image")
-        else:
-            if is_green_egg:
-                dino.image_path = "images/juvenile_dinos/green_rex_juvie.png"
-                print(f"DEBUG: {dino.name} assigned juvenile GREEN image")
-            elif is_orange_egg:
-                dino.image_path = "images/juvenile_dinos/orange_trike_juvie.png"
-                print(f"DEBUG: {dino.name} assigned juvenile ORANGE image")
-            elif is_blue_egg:
-                dino.image_path = "images/juvenile_dinos/blue_spino_juvie.png"
-                print(f"DEBUG: {dino.name} assigned juvenile BLUE image")
-            else:
-                dino.image_path = "images/juvenile_dinos/green_rex_juvie.png"
-                print(f"DEBUG: {dino.name} assigned juvenile DEFAULT image")
-        print(f"DEBUG: {dino.name} FINAL image_path='{dino.image_path}' for RAW species_name='{raw_species}' PROCESSED species='{species}'")
-    return render(request, 'your_dinosaurs.html', {'dinosaurs': dinosaurs})
+    return render(request, 'your_dinosaurs.html', {
+        'dinosaurs': dinosaurs,
+        'collection_version': collection_version(request.user),
+        'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+    })
 from django.contrib.auth import get_user_model
 
 @login_required
+@collection_condition()
 def dashboard(request):
     import logging
     try:
-        has_egg = Egg.objects.filter(owner=request.user).exists()
-        all_dinos = Dinosaur.objects.filter(owner=request.user)
-        juvenile_dinos = all_dinos.filter(stage='juvenile')
-        has_dino = all_dinos.exists()
-        for dino in juvenile_dinos:
-            color = dino.species_name.split()[0].lower()
-            image_map = {
-                'green': 'green_rex_juvie.png',
-                'blue': 'blue_spino_juvie.png',
-                'orange': 'orange_trike_juvie.png',
+        def summary():
+            all_dinos = Dinosaur.objects.filter(owner=request.user)
+            return {
+                'has_egg': Egg.objects.filter(owner=request.user).exists(),
+                'has_dino': all_dinos.exists(),
+                'has_juvenile': all_dinos.filter(stage='juvenile').exists(),
             }
-            dino.image_path = f"images/juvenile_dinos/{image_map.get(color, 'green_rex_juvie.png')}"
-        return render(request, 'dashboard.html', {'has_egg': has_egg, 'juvenile_dinos': juvenile_dinos, 'has_dino': has_dino})
+        return render(request, 'dashboard.html', cached_for_user(request.user, 'dashboard', summary))
     except Exception as e:
         logging.error(f"Dashboard error: {e}")
-        return render(request, 'dashboard.html', {'has_egg': False, 'juvenile_dinos': [], 'error': str(e)})
+        return render(request, 'dashboard.html', {'has_egg': False, 'has_juvenile': False, 'error': str(e)})
 
 from django.views.decorators.csrf import csrf_protect
 @login_required
@@ -248,10 +289,36 @@ def claim_egg(request):
     return render(request, 'claim_egg.html')
 
 @login_required
+@collection_condition()
 def active_nests(request):
-    eggs = Egg.objects.filter(owner=request.user, is_hatched=False)
+    # Lazy: only queried when the cached nest fragment has to be re-rendered
+    eggs = Egg.objects.filter(owner=request.user, is_hatched=False).order_by('created_at')
+
+    return render(request, 'active_nests.html', {
+        'eggs': eggs,
+        'has_eggs': cached_for_user(request.user, 'has_nests', eggs.exists),
+        'collection_version': collection_version(request.user),
+        'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+    })
 
-    return render(request, 'active_nests.html', {'eggs': eggs})
+@login_required
+@require_POST
+def bulk_egg_action(request):
+    """Apply search_wilderness, turn_egg or sing_egg to the selected eggs."""
+    action = request.POST.get('action')
+    if action not in EGG_ACTIONS:
+        return JsonResponse({'error': 'Unknown egg action.'}, status=400)
+    try:
+        egg_ids = [int(pk) for pk in request.POST.getlist('egg_ids')]
+    except ValueError:
+        return JsonResponse({'error': 'Invalid egg selection.'}, status=400)
+    if not egg_ids:
+        return JsonResponse({'error': 'Select at least one egg.'}, status=400)
+    if len(egg_ids) > MAX_BULK_EGGS:
+        return JsonResponse({'error': f'You can tend at most {MAX_BULK_EGGS} eggs at once.'}, status=400)
+    if action == 'search_wilderness' and not check_rate('egg_search', request.user, cost=len(egg_ids)).allowed:
+        return JsonResponse({'error': 'You are searching too often. Let the wilderness rest for a while.'}, status=429)
+    return JsonResponse({'results': apply_bulk_egg_action(request.user, egg_ids, action)})
 
 import random
 @login_required
@@ -282,6 +349,8 @@ def egg_detail(request, egg_id):
                     message = f"Egg named '{new_name}'!"
                 else:
                     message = "Egg name cannot be empty."
+            elif 'search_wilderness' in request.POST and not check_rate('egg_search', request.user).allowed:
+                message = 'You are searching too often. Let the wilderness rest for a while.'
             elif 'search_wilderness' in request.POST:
                 found = random.choice(['twig', 'leaf', None, None])  # 50% chance
                 if found == 'twig':
@@ -355,12 +424,14 @@ def register(request):
     return render(request, 'register.html', {'form': form})
 
 def home(request):
-    eggs = Egg.objects.filter(owner=request.user) if request.user.is_authenticated else Egg.objects.none()
-    has_egg = Egg.objects.filter(owner=request.user, is_hatched=False).exists() if request.user.is_authenticated else False
-    has_dino = Dinosaur.objects.filter(owner=request.user).exists() if request.user.is_authenticated else False
-    import logging
-    logging.warning(f"DEBUG home: has_egg={has_egg}, has_dino={has_dino}, eggs={eggs.count()}")
-    return render(request, 'home.html', {'eggs': eggs, 'has_egg': has_egg, 'has_dino': has_dino})
+    if not request.user.is_authenticated:
+        return render(request, 'home.html', {'eggs': Egg.objects.none(), 'has_egg': False, 'has_dino': False})
+    eggs = Egg.objects.filter(owner=request.user).select_related('dinosaur')
+    flags = cached_for_user(request.user, 'home', lambda: {
+        'has_egg': Egg.objects.filter(owner=request.user, is_hatched=False).exists(),
+        'has_dino': Dinosaur.objects.filter(owner=request.user).exists(),
+    })
+    return render(request, 'home.html', {'eggs': eggs, **flags})
 
 def hatch_egg(request, egg_id):
     egg = get_object_or_404(Egg, id=egg_id)
@@ -371,17 +442,15 @@ def hatch_egg(request, egg_id):
     # Always redirect to hatching page
     return redirect('hatching_page', egg_id=egg_id)
 
+def dinosaur_owner(request, dino_id):
+    return Dinosaur.objects.filter(pk=dino_id).values_list('owner_id', flat=True).first()
+
 @login_required
+@collection_condition(dinosaur_owner)
 def dinosaur_detail(request, dino_id):
     import logging
     try:
         dino = get_object_or_404(Dinosaur, id=dino_id)
-        # Ensure orphaned egg is deleted if dinosaur exists and is not an egg
-        if dino.egg:
-            try:
-                dino.egg.delete()
-            except Exception:
-                pass
         if request.method == 'POST':
             if 'release_dino' in request.POST:
                 dino.delete()
@@ -398,55 +467,13 @@ def dinosaur_detail(request, dino_id):
                 else:
                     from django.contrib import messages
                     messages.error(request, "Dinosaur name cannot be empty.")
-        actions = dino.actions.order_by('-timestamp')
-        total_actions = dino.actions.count()
-        feed_actions = dino.actions.filter(action_type="feed").count()
-        feeds_needed = 3
-        actions_needed = 5
-        feed_progress = min(feed_actions, feeds_needed)
-        action_progress = min(total_actions, actions_needed)
-        # Calculate percent for progress bars
-        feed_percent = int((feed_progress / feeds_needed) * 100) if feeds_needed else 0
-        action_percent = int((action_progress / actions_needed) * 100) if actions_needed else 0
-        feed_complete = feed_progress >= feeds_needed
-        action_complete = action_progress >= actions_needed
-        level_percent = int((dino.level / 100) * 100)
-        # Image mapping logic (same as inventory)
-        raw_species = dino.species_name
-        species = raw_species.strip().lower().replace('_', ' ').replace('-', ' ')
-        is_green_egg = 'green egg' in species
-        is_orange_egg = 'orange egg' in species
-        is_blue_egg = 'blue egg' in species
-        if dino.stage == 'adult':
-            if is_green_egg:
-                dino.image_path = "images/adult_dinos/green_rex_adult.png"
-            elif is_orange_egg:
-                dino.image_path = "images/adult_dinos/orange_trike_adult.png"
-            elif is_blue_egg:
-                dino.image_path = "images/adult_dinos/blue_spino_adult.png"
-            else:
-                dino.image_path = "images/adult_dinos/green_rex_adult.png"
-        else:
-            if is_green_egg:
-                dino.image_path = "images/juvenile_dinos/green_rex_juvie.png"
-            elif is_orange_egg:
-                dino.image_path = "images/juvenile_dinos/orange_trike_juvie.png"
-            elif is_blue_egg:
-                dino.image_path = "images/juvenile_dinos/blue_spino_juvie.png"
-            else:
-                dino.image_path = "images/juvenile_dinos/green_rex_juvie.png"
+        actions, next_cursor = action_page(dino)
         return render(request, 'dinosaur_detail.html', {
             'dino': dino,
             'actions': actions,
-            'feed_progress': feed_progress,
-            'feeds_needed': feeds_needed,
-            'action_progress': action_progress,
-            'actions_needed': actions_needed,
-            'feed_percent': feed_percent,
-            'action_percent': action_percent,
-            'feed_complete': feed_complete,
-            'action_complete': action_complete,
-            'level_percent': level_percent,
+            'next_cursor': next_cursor,
+            **dinosaur_progress(dino),
+            'max_session_actions': MAX_SESSION_ACTIONS,
         })
     except Exception as e:
         logging.error(f"Error in dinosaur_detail view: {e}")
@@ -456,141 +483,77 @@ def dinosaur_detail(request, dino_id):
             'error': str(e),
         })
 
+@login_required
+def dinosaur_actions(request, dino_id):
+    """Return the next page of a dinosaur's action history for "Load more".
+
+    Responds with the <li> fragment (cursor in the X-Next-Cursor header), or
+    JSON when called with ?format=json.
+    """
+    dino = get_object_or_404(Dinosaur, id=dino_id)
+    try:
+        limit = int(request.GET.get('limit', ACTION_PAGE_SIZE))
+    except ValueError:
+        limit = ACTION_PAGE_SIZE
+    actions, next_cursor = action_page(dino, request.GET.get('cursor'), limit)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'actions': [
+                {
+                    'id': action.id,
+                    'action_type': action.action_type,
+                    'action_type_display': action.get_action_type_display(),
+                    'outcome': action.outcome,
+                    'timestamp': action.timestamp.isoformat(),
+                }
+                for action in actions
+            ],
+            'next_cursor': next_cursor,
+        })
+    response = render(request, 'partials/action_items.html', {'actions': actions})
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
 from django.conf import settings
 @login_required
 def hatching_page(request, egg_id):
     egg = get_object_or_404(Egg, id=egg_id, owner=request.user)
-    # Determine image path based on egg color/species
-    color = egg.species_name.split()[0].lower()  # e.g., 'green', 'blue', 'orange'
-    image_path = f"images/hatching_egg/{color}_hatching_egg.png"
+    image_path = sprite_path(species_key_for(egg.species_name), 'hatching')
     message = "Congratulations! Your egg is hatching!"
     # Delete the egg immediately after hatching page is shown
     egg.delete()
     return render(request, "hatching_page.html", {"egg": None, "image_path": image_path, "message": message})
-    feed_progress = min(feed_actions, feeds_needed)
-    action_progress = min(total_actions, actions_needed)
-    # Calculate percent for progress bars
-    feed_percent = int((feed_progress / feeds_needed) * 100) if feeds_needed else 0
-    action_percent = int((action_progress / actions_needed) * 100) if actions_needed else 0
-    feed_complete = feed_progress >= feeds_needed
-    action_complete = action_progress >= actions_needed
-    level_percent = int((dino.level / 100) * 100)
-    return render(request, 'dinosaur_detail.html', {
-        'dino': dino,
-        'actions': actions,
-        'feed_progress': feed_progress,
-        'feeds_needed': feeds_needed,
-        'action_progress': action_progress,
-        'actions_needed': actions_needed,
-        'feed_percent': feed_percent,
-        'action_percent': action_percent,
-        'feed_complete': feed_complete,
-        'action_complete': action_complete,
-        'level_percent': level_percent,
-    })
+
+@login_required
+@require_POST
+def raise_session(request, dino_id):
+    """Run a queue of feed/play/train actions in one request and summarise them."""
+    dino = get_object_or_404(Dinosaur, id=dino_id, owner=request.user)
+    action_types = request.POST.getlist('actions')
+    if not action_types:
+        return JsonResponse({'error': 'Queue at least one action.'}, status=400)
+    if any(action_type not in SESSION_ACTIONS for action_type in action_types):
+        return JsonResponse({'error': 'Unknown action in the queue.'}, status=400)
+    if len(action_types) > MAX_SESSION_ACTIONS:
+        return JsonResponse({'error': f'You can queue at most {MAX_SESSION_ACTIONS} actions at once.'}, status=400)
+    return JsonResponse(run_session(dino, action_types))
 
 def perform_action(request, dino_id):
     dino = get_object_or_404(Dinosaur, id=dino_id)
     if request.method == "POST":
-        action_type = request.POST.get("action_type")
-        outcome = "Nothing happened."
-        total_actions = dino.actions.count()
-        feed_actions = dino.actions.filter(action_type="feed").count()
-
-        if action_type == "feed":
-            outcome = f"{dino.name} enjoyed a tasty meal!"
-            dino.mood = "happy"
-            # If dino is juvenile and has enough feed actions, evolve to adult
-            feeds_needed = 3
-            evolved = False
-            # Evolve if feed_actions >= feeds_needed and not already adult
-            if dino.stage != "adult" and feed_actions >= feeds_needed:
-                dino.stage = "adult"
-                outcome += f" 🦉 {dino.name} has evolved into an Adult!"
-                messages.success(request, f"{dino.name} evolved into an Adult!")
-                evolved = True
-            # Apply image mapping logic after possible evolution
-            raw_species = dino.species_name
-            species = raw_species.strip().lower().replace('_', ' ').replace('-', ' ')
-            is_green_egg = 'green egg' in species
-            is_orange_egg = 'orange egg' in species
-            is_blue_egg = 'blue egg' in species
-            if dino.stage == 'adult':
-                if is_green_egg:
-                    dino.image_path = "images/adult_dinos/green_rex_adult.png"
-                elif is_orange_egg:
-                    dino.image_path = "images/adult_dinos/orange_trike_adult.png"
-                elif is_blue_egg:
-                    dino.image_path = "images/adult_dinos/blue_spino_adult.png"
-                else:
-                    dino.image_path = "images/adult_dinos/green_rex_adult.png"
-            else:
-                if is_green_egg:
-                    dino.image_path = "images/juvenile_dinos/green_rex_juvie.png"
-                elif is_orange_egg:
-                    dino.image_path = "images/juvenile_dinos/orange_trike_juvie.png"
-                elif is_blue_egg:
-                    dino.image_path = "images/juvenile_dinos/blue_spino_juvie.png"
-                else:
-                    dino.image_path = "images/juvenile_dinos/green_rex_juvie.png"
-        elif action_type == "play":
-            outcome = f"{dino.name} had fun playing!"
-            dino.mood = "playful"
-        elif action_type == "train":
-            outcome = f"{dino.name} trained hard and grew stronger!"
-            dino.mood = "tired"
-            dino.level_up()  # training increases level
-            if dino.level == 100:
-                messages.success(request, f"{dino.name} reached the max level 100!")
-        elif action_type == "wilderness_search" and dino.stage == "juvenile":
-            # If twigs or leaves is already 5, always return 'didn't find anything'
-            if dino.twigs >= 5 or dino.leaves >= 5:
-                outcome = f"{dino.name} searched the wilderness but didn't find anything (max resources reached)."
-                dino.mood = "hungry"
-                messages.info(request, outcome)
-            else:
-                import random
-                if random.random() < 0.6:
-                    outcome = f"{dino.name} found some delicious food in the wilderness!"
-                    dino.mood = "happy"
-                    messages.success(request, outcome)
-                else:
-                    outcome = f"{dino.name} searched the wilderness but found nothing this time."
-                    dino.mood = "hungry"
-                    messages.info(request, outcome)
-        dino.save()
-        RaiseAction.objects.create(
-            dinosaur=dino,
-            action_type=action_type,
-            outcome=outcome
-        )
-        # Only unlock trait when level matches trait_levels and not just on evolution
-        trait_levels = [2, 26, 51, 76, 99]
-        # Only check for trait unlock if action_type is "train" (level up), not "feed" (evolution)
-        if action_type == "train" and dino.stage in ["juvenile", "adult"] and dino.level in trait_levels and dino.traits.count() < 5:
-            trait_action_exists = RaiseAction.objects.filter(dinosaur=dino, action_type="trait_unlock", outcome__icontains=f"level {dino.level}").exists()
-            if not trait_action_exists:
-                import random
-                all_traits = list(Trait.objects.exclude(pk__in=dino.traits.values_list('pk', flat=True)))
-                if all_traits:
-                    trait = random.choice(all_traits)
-                    dino.traits.add(trait)
-                    dino.save()
-                    outcome_text = f"{dino.name} unlocked a new trait: {trait.name}! (level {dino.level})"
-                    RaiseAction.objects.create(
-                        dinosaur=dino,
-                        action_type="trait_unlock",
-                        outcome=outcome_text
-                    )
-                    messages.success(request, f"{dino.name} unlocked a new trait: {trait.name}!")
-                    # Redirect with trait info for modal
-                    from django.urls import reverse
-                    from django.utils.http import urlencode
-                    params = urlencode({
-                        'trait_unlocked': 1,
-                        'trait_name': trait.name,
-                        'trait_description': trait.description
-                    })
-                    url = reverse("dinosaur_detail", args=[dino.id]) + f"?{params}"
-                    return redirect(url)
-        return redirect("dinosaur_detail", dino_id=dino.id)
+        plan = run_action(dino, request.POST.get("action_type"))
+        for level, text in plan.messages:
+            getattr(messages, level)(request, text)
+        if plan.trait:
+            # Redirect with trait info for modal
+            from django.urls import reverse
+            from django.utils.http import urlencode
+            params = urlencode({
+                'trait_unlocked': 1,
+                'trait_name': plan.trait.name,
+                'trait_description': plan.trait.description
+            })
+            url = reverse("dinosaur_detail", args=[dino.id]) + f"?{params}"
+            return redirect(url)
+    return redirect("dinosaur_detail", dino_id=dino.id)
@@ -0,0 +1,49 @@
+"""Compile the project's templates ahead of the first request.
+
+With the cached template loader each process parses a template once, on
+the first render that needs it. ``warm_templates`` loads every template
+under the project template directories up front so that cost is paid at
+worker boot (see gunicorn.conf.py) instead of by the first players to hit
+a fresh dyno.
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+def project_templates(directories=None):
+    """Template names under ``directories`` (default: the DIRS of each
+    DjangoTemplates backend)."""
+    if directories is None:
+        directories = [directory for config in settings.TEMPLATES for directory in config.get('DIRS', [])]
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if filename.endswith(('.html', '.txt')):
+                    path = os.path.join(root, filename)
+                    yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def warm_templates(names=None):
+    """Load ``names`` (default: all project templates) into the loader cache.
+
+    Returns ``[(name, seconds, error)]`` in load order; ``error`` is None for
+    templates that compiled.
+    """
+    engine = engines['django']
+    timings = []
+    for name in names if names is not None else project_templates():
+        start = time.perf_counter()
+        try:
+            engine.get_template(name)
+            error = None
+        except TemplateSyntaxError as exc:
+            error = str(exc)
+            logger.error("Template %s failed to compile: %s", name, exc)
+        timings.append((name, time.perf_counter() - start, error))
+    return timings
@@ -12,5 +12,18 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'genosaur_project.settings')
+# Route the read-only pages to their async views (core.async_views)
+os.environ.setdefault('ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
+
+# End trade event streams (core.async_views.trade_events) when the browser leaves
+from core.middleware import EventStreamDisconnect  # noqa: E402
+
+application = EventStreamDisconnect(application)
+
+# Refuse to serve with performance-hostile prod settings (DEBUG, no
+# persistent connections, ...); a no-op outside the prod profile.
+from core.checks import enforce_performance_checks  # noqa: E402
+
+enforce_performance_checks()
@@ -0,0 +1,22 @@
+"""
+Settings profiles for genosaur_project.
+
+DJANGO_ENV picks the profile: 'dev' (the default locally) or 'prod' (the
+default on a Heroku dyno, where DYNO is set). Both start from base.py.
+DJANGO_SETTINGS_MODULE stays 'genosaur_project.settings'.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+if os.path.isfile("env.py"):
+   import env  # noqa: F401 (sets os.environ)
+
+SETTINGS_PROFILE = os.environ.get('DJANGO_ENV') or ('prod' if os.environ.get('DYNO') else 'dev')
+
+if SETTINGS_PROFILE == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif SETTINGS_PROFILE == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f"Unknown DJANGO_ENV {SETTINGS_PROFILE!r}; expected 'dev' or 'prod'.")
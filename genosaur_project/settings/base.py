@@ -0,0 +1,288 @@
+ 
+LOGIN_URL = '/login/'
+from pathlib import Path
+import os
+import dj_database_url
+
+"""
+Django settings for genosaur_project project: shared by every profile.
+dev.py and prod.py build on this module; see __init__.py.
+
+Generated by 'django-admin startproject' using Django 4.2.24.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/4.2/ref/settings/
+"""
+
+ 
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+
+ 
+
+ 
+SECRET_KEY = os.environ.get('SECRET_KEY')
+
+
+ 
+DEBUG = False
+
+ 
+ALLOWED_HOSTS = ['genosaur-individual-project-1a19b4196747.herokuapp.com', 'localhost', '127.0.0.1']
+
+
+ 
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    # Before staticfiles so core's collectstatic (which builds the sprite
+    # variants first) takes precedence over the stock command.
+    'core',
+    'django.contrib.staticfiles',
+    'cloudinary_storage',
+    'cloudinary',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.AsyncWhiteNoiseMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.tracing.RequestTraceMiddleware',
+]
+
+# Serve the read-only pages from core.async_views; asgi.py turns this on
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'false').lower() == 'true'
+
+# Fraction of requests recorded by core.tracing.RequestTraceMiddleware
+REQUEST_TRACE_SAMPLE_RATE = float(os.environ.get('REQUEST_TRACE_SAMPLE_RATE', '0.1'))
+REQUEST_TRACE_BUFFER_SIZE = int(os.environ.get('REQUEST_TRACE_BUFFER_SIZE', '500'))
+
+# Caches. 'default' holds rate-limit counters and per-user collection
+# versions (core.caching); 'fragments' holds rendered template fragments and
+# reports hit/miss counts. Both are LRU-bounded process memory by default; set
+# REDIS_URL (shared by every dyno) or CACHE_DIR (shared by the workers on one
+# host) when running more than one process. The prod profile refuses to start
+# on process memory (core.E007).
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', '600'))
+# Mixed into the collection ETags (core.conditional) so browsers drop pages
+# rendered by an older release. Heroku sets HEROKU_RELEASE_VERSION when the
+# dyno metadata lab feature is enabled. Left empty, each process uses a hash of
+# the project templates and staticfiles.json instead.
+ETAG_RELEASE = os.environ.get('RELEASE_VERSION', os.environ.get('HEROKU_RELEASE_VERSION', ''))
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+        'fragments': {
+            'BACKEND': 'core.caching.CountingRedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': 'fragments',
+            'TIMEOUT': FRAGMENT_CACHE_TIMEOUT,
+        },
+    }
+elif os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(os.environ['CACHE_DIR'], 'default'),
+        },
+        'fragments': {
+            'BACKEND': 'core.caching.CountingFileBasedCache',
+            'LOCATION': os.path.join(os.environ['CACHE_DIR'], 'fragments'),
+            'TIMEOUT': FRAGMENT_CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'genosaur-default',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+        'fragments': {
+            'BACKEND': 'core.caching.CountingLocMemCache',
+            'LOCATION': 'genosaur-fragments',
+            'TIMEOUT': FRAGMENT_CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 2000},
+        },
+    }
+
+# Per-user action limits (core.ratelimit): name -> (max actions, window seconds).
+# The cache backend counts in the 'default' cache, so workers only share counts
+# when REDIS_URL is set (CACHE_DIR's file cache cannot increment atomically); a
+# prod process refuses to start without it (core.E006).
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'core.ratelimit.CacheRateLimiter')
+RATE_LIMIT_OPTIONS = {'cache_alias': 'default'} if RATE_LIMIT_BACKEND.endswith('CacheRateLimiter') else {}
+RATE_LIMITS = {
+    'wilderness_search': (5, 24 * 60 * 60),
+    'egg_search': (120, 60 * 60),
+}
+
+# Trade event delivery (core.events). The cache broker shares events between
+# workers through CACHES, so it is the default wherever Redis is configured.
+TRADE_EVENT_BACKEND = os.environ.get(
+    'TRADE_EVENT_BACKEND',
+    'core.events.CacheEventBroker' if os.environ.get('REDIS_URL') else 'core.events.LocalMemoryEventBroker',
+)
+TRADE_EVENT_OPTIONS = {'cache_alias': 'default'} if TRADE_EVENT_BACKEND.endswith('CacheEventBroker') else {}
+
+ROOT_URLCONF = 'genosaur_project.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'genosaur_project.wsgi.application'
+
+
+ 
+
+ 
+
+ 
+def database_config(conn_max_age='0', health_checks='false'):
+    """The 'default' database from DATABASE_URL plus the connection settings.
+
+    DB_CONN_MAX_AGE: seconds a worker keeps its connection open between
+    requests (0 closes it after each request, 'none' keeps it forever).
+    DB_CONN_HEALTH_CHECKS: ping a reused connection before its first query in
+    a request and reconnect if it has dropped.
+    DB_POOLER: 'transaction' when DATABASE_URL points at an external pooler
+    (e.g. PgBouncer) in transaction mode, which cannot keep the server-side
+    cursors QuerySet.iterator() uses; 'session' for session mode.
+    The arguments are the defaults for the env vars the profile leaves unset.
+    """
+    max_age = os.environ.get('DB_CONN_MAX_AGE', conn_max_age).lower()
+    config = dj_database_url.parse(
+        os.environ.get("DATABASE_URL"),
+        conn_max_age=None if max_age == 'none' else int(max_age),
+    )
+    config['CONN_HEALTH_CHECKS'] = os.environ.get('DB_CONN_HEALTH_CHECKS', health_checks).lower() in ('1', 'true', 'yes')
+    if os.environ.get('DB_POOLER', '').lower() == 'transaction':
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return config
+
+
+DATABASE_POOLER = os.environ.get('DB_POOLER', '').lower()
+DATABASES = {
+   'default': database_config()
+}
+
+
+ 
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+ 
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+ 
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+ 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+ 
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+ 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Resized WebP copies of the sprites, built by collectstatic (core.images)
+SPRITE_VARIANT_WIDTHS = [160, 320, 640]
+
+ 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        # Request threads only enqueue records; a listener thread started in
+        # CoreConfig.ready does the (blocking) write to the console.
+        'queue': {
+            'class': 'logging.handlers.QueueHandler',
+            'handlers': ['console'],
+            'respect_handler_level': True,
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'INFO',
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        # SQL statements are logged at DEBUG; keep them out of the log stream.
+        'django.db.backends': {
+            'level': 'WARNING',
+        },
+        'core.trace': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+X_FRAME_OPTIONS = 'ALLOWALL'
\ No newline at end of file
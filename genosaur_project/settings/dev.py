@@ -0,0 +1,15 @@
+"""Local development: debug pages, template autoreload, verbose app logs."""
+import sys
+
+from .base import *  # noqa: F401,F403
+from .base import LOGGING
+
+DEBUG = True
+
+LOGGING['root']['level'] = 'DEBUG'
+# Trace lines for runserver; the test run samples requests too, but its
+# output should only show test results (the traces still reach the buffer).
+LOGGING['loggers']['core.trace']['level'] = 'WARNING' if sys.argv[1:2] == ['test'] else 'DEBUG'
+# Pillow logs every PNG chunk at DEBUG, asyncio the selector of every new loop
+LOGGING['loggers']['PIL'] = {'level': 'INFO'}
+LOGGING['loggers']['asyncio'] = {'level': 'WARNING'}
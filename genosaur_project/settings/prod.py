@@ -0,0 +1,31 @@
+"""
+Production (Heroku). core.checks refuses to start a prod process whose
+settings drift from this: see the 'performance' system checks.
+"""
+from .base import *  # noqa: F401,F403
+from .base import LOGGING, TEMPLATES, database_config
+
+DEBUG = False
+
+# Reuse each worker's database connection across requests instead of
+# opening one per request, and check it is still alive before reusing it.
+# DB_CONN_MAX_AGE / DB_CONN_HEALTH_CHECKS / DB_POOLER override these.
+DATABASES = {
+    'default': database_config(conn_max_age='600', health_checks='true'),
+}
+
+# Spell out the cached loader (parse each template once per process) rather
+# than relying on the implicit default, and drop the debug context
+# processor. Workers compile everything at boot, see gunicorn.conf.py and
+# the warm_templates command.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'].remove('django.template.context_processors.debug')
+
+LOGGING['root']['level'] = 'ERROR'
+LOGGING['loggers']['django']['level'] = 'ERROR'
@@ -18,8 +18,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.admin import request_traces
 
 urlpatterns = [
+    path('admin/request-traces/', admin.site.admin_view(request_traces), name='request_traces'),
     path('admin/', admin.site.urls),
     path('', include('core.urls'), name='home'),
 ]
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'genosaur_project.settings')
 
 application = get_wsgi_application()
+
+# Refuse to serve with performance-hostile prod settings (DEBUG, no
+# persistent connections, ...); a no-op outside the prod profile.
+from core.checks import enforce_performance_checks  # noqa: E402
+
+enforce_performance_checks()
@@ -0,0 +1,16 @@
+# Loaded automatically by `gunicorn genosaur_project.wsgi` (Procfile) from the
+# working directory. Anything not set here keeps gunicorn's default or comes
+# from GUNICORN_CMD_ARGS / WEB_CONCURRENCY as before.
+
+
+def post_worker_init(worker):
+    """Compile the project's templates once the worker has loaded Django,
+    before it accepts its first connection."""
+    from core.warmup import warm_templates
+
+    timings = warm_templates()
+    failed = sum(1 for _, _, error in timings if error)
+    worker.log.info(
+        "worker %s compiled %d templates in %.1f ms (%d failed)",
+        worker.pid, len(timings) - failed, sum(seconds for _, seconds, _ in timings) * 1000, failed,
+    )